@@ -1,6 +1,10 @@
+import argparse
 import json
+import sys
 import numpy as np
-from pod_predictor.inference import PODPredictor
+from pod_predictor.registry import get_predictor
+from pod_predictor.rendering import OUTPUT_FORMATS, format_predictions, render_reports
+from pod_predictor.utils import load_input, preprocess_json
 
 
 def load_X_test_from_json(file_path):
@@ -16,17 +20,16 @@ def load_X_test_from_json(file_path):
     with open(file_path, 'r') as file:
         X_test = json.load(file)
 
-    for key in X_test:
-        X_test[key] = [np.nan if x is None else x for x in X_test[key]]
-        X_test[key] = [np.nan] if X_test[key] == [] else X_test[key]
-
-    return X_test
+    return preprocess_json(X_test)
 
 
 def pod_prediction(X_test):
     """
     Predict the probability of postoperative delirium (POD) for the given test data.
 
+    The calibrated model is taken from the process-wide registry, so it is only built on the first call (or after the
+    calibration dataset changed on disk).
+
     Args:
     X_test (np.ndarray, pd.DataFrame, or dict): The test data to predict the probability of POD for.
 
@@ -35,28 +38,40 @@ def pod_prediction(X_test):
                       along with the feature importance.
     """
 
-    model = PODPredictor(calibration='va')
+    model = get_predictor(calibration='va')
     report = model.get_report(X_test)
+    formatted = format_predictions(report)
     report = np.round(report, 2)
-    report['Delirium Probability'] = report.apply(
-        lambda row: f"{row.iloc[0]*100:.0f}% [{row.iloc[1]*100:.0f}-{row.iloc[2]*100:.0f}%]", axis=1)
+    report['Delirium Probability'] = formatted
 
     return report
 
 
 def main():
     """
-    Load test data, predict the probability of postoperative delirium (POD), and print the results, along with the feature importance.
+    Load test data, predict the probability of postoperative delirium (POD), and print the results, along with the most
+    important features of each patient (as a text table, JSON Lines, or CSV; see pod_predictor.rendering).
 
     Returns:
     None
     """
 
-    X_test = load_X_test_from_json('./data/X_test.json')
-    report = pod_prediction(X_test)
-    for _, row in report.iterrows():
-        print(row[:1].to_frame(name='Prediction [CI]'))
-        print(row[3:].sort_values(ascending=False).to_frame(name='Feature Importance'))
+    parser = argparse.ArgumentParser(description='POD prediction with feature importance.')
+    parser.add_argument('input', nargs='?', default='./data/X_test.json',
+                        help='JSON, CSV, Parquet, Arrow IPC or .npy file with the test data')
+    parser.add_argument('--format', default='text', choices=OUTPUT_FORMATS)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--output', default=None, help='Output file (default: standard output)')
+    args = parser.parse_args()
+
+    X_test = load_X_test_from_json(args.input) if args.input.endswith('.json') else load_input(args.input)
+    report = get_predictor(calibration='va').get_report(X_test)
+
+    if args.output is None:
+        render_reports(report, sys.stdout, output_format=args.format, top_k=args.top_k)
+    else:
+        with open(args.output, 'w', newline='') as file:
+            render_reports(report, file, output_format=args.format, top_k=args.top_k)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,2 @@
+# This file marks the 'benchmarks' directory as a Python package.
+# Run the benchmarks from the repository root, e.g. `python -m benchmarks.predictor`.
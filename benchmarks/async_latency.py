@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import time
+import warnings
+import numpy as np
+from benchmarks.data import as_input_type, synthetic_features
+from pod_predictor.aio import AsyncPredictor
+from pod_predictor.inference import PODPredictor
+
+
+async def monitor_lag(interval, lags, stop):
+    """
+    Measure the event loop lag, i.e. how late a periodic sleep wakes up.
+
+    Args:
+    interval (float): The sleep interval (in seconds).
+    lags (list): The list to append the lags (in milliseconds) to.
+    stop (asyncio.Event): The event ending the measurement.
+
+    Returns:
+    None
+    """
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_scenario(model, predictor, mode, inputs, n_clients, duration, interval):
+    """
+    Run concurrent clients requesting reports for a fixed duration while measuring the event loop lag.
+
+    Args:
+    model (PODPredictor): The predictor (used directly in the 'blocking' mode).
+    predictor (AsyncPredictor): The asynchronous predictor (used in the 'async' mode).
+    mode (str): 'idle' (no clients), 'async' (await AsyncPredictor.get_report) or 'blocking' (call
+        PODPredictor.get_report in the event loop).
+    inputs (list): The inputs of the requests (one patient each).
+    n_clients (int): The number of concurrent clients.
+    duration (float): The duration (in seconds).
+    interval (float): The sleep interval of the lag monitor (in seconds).
+
+    Returns:
+    dict: The completed requests per second and the p50, p99 and maximal event loop lag (in milliseconds).
+    """
+
+    lags, completed = [], [0]
+    stop = asyncio.Event()
+
+    async def client(i):
+        while not stop.is_set():
+            X_test = inputs[(i + completed[0]) % len(inputs)]
+            if mode == 'async':
+                await predictor.get_report(X_test)
+            else:
+                model.get_report(X_test)
+                await asyncio.sleep(0)
+            completed[0] += 1
+
+    tasks = [asyncio.create_task(monitor_lag(interval, lags, stop))]
+    if mode != 'idle':
+        tasks += [asyncio.create_task(client(i)) for i in range(n_clients)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    lags = np.array(lags)
+    return {
+        'requests_per_s': completed[0] / duration,
+        'lag_p50_ms': float(np.percentile(lags, 50)),
+        'lag_p99_ms': float(np.percentile(lags, 99)),
+        'lag_max_ms': float(lags.max()),
+    }
+
+
+async def run(args):
+    """
+    Run the scenarios for all client counts and print the results.
+
+    Args:
+    args (argparse.Namespace): The command line arguments.
+
+    Returns:
+    None
+    """
+
+    model = PODPredictor(calibration=None if args.calibration == 'none' else args.calibration)
+    features = synthetic_features(1000, rng=np.random.default_rng(0))
+    inputs = [as_input_type(features[i:i + 1], 'dict') for i in range(len(features))]
+
+    async with AsyncPredictor(model, max_batch_size=args.max_batch_size, max_wait=args.max_wait,
+                              max_workers=args.max_workers, processes=args.processes) as predictor:
+        print(f"{'mode':>8} {'clients':>7} {'requests/s':>11} {'lag p50 (ms)':>13} {'lag p99 (ms)':>13} "
+              f"{'lag max (ms)':>13}")
+        for mode in args.modes:
+            for n_clients in ([0] if mode == 'idle' else args.clients):
+                result = await run_scenario(model, predictor, mode, inputs, n_clients, args.duration, args.interval)
+                print(f"{mode:>8} {n_clients:>7} {result['requests_per_s']:11.0f} {result['lag_p50_ms']:13.3f} "
+                      f"{result['lag_p99_ms']:13.3f} {result['lag_max_ms']:13.3f}", flush=True)
+        print(f"mean batch size (async): {predictor.metrics.to_dict()['mean_batch_size']:.1f} calls")
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark the event loop lag under load.
+
+    The lag of the event loop (the delay of a periodic sleep) should stay flat with AsyncPredictor as the number of
+    concurrent clients grows, whereas blocking calls in the event loop delay it by the scoring time.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Event loop latency benchmark for AsyncPredictor.')
+    parser.add_argument('--modes', nargs='+', default=['idle', 'async', 'blocking'],
+                        choices=['idle', 'async', 'blocking'])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--interval', type=float, default=0.001)
+    parser.add_argument('--calibration', default='va', choices=['none', 'platt', 'va'])
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait', type=float, default=0.005)
+    parser.add_argument('--max-workers', type=int, default=1)
+    parser.add_argument('--processes', action='store_true', help='Score in worker processes instead of threads')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+
+KEY = ('operation', 'calibration', 'imputation', 'calibration_size', 'input_type', 'batch_size')
+
+
+def load_results(path_to_file):
+    """
+    Load benchmark results written by benchmarks.predictor.
+
+    Args:
+    path_to_file (str): The file path of the JSON file.
+
+    Returns:
+    dict: The metadata.
+    dict: The results keyed by (operation, calibration, imputation, calibration_size, input_type, batch_size).
+    """
+
+    with open(path_to_file, 'r') as file:
+        content = json.load(file)
+    return content['metadata'], {tuple(result[key] for key in KEY): result for result in content['results']}
+
+
+def main():
+    """
+    Compare two benchmark result files and report the change of the p50 latency for each benchmark.
+
+    The exit code is 1 if any benchmark is slower than the threshold allows.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Compare two PODPredictor benchmark result files.')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Maximal allowed ratio of candidate to baseline p50 latency')
+    args = parser.parse_args()
+
+    baseline_meta, baseline = load_results(args.baseline)
+    candidate_meta, candidate = load_results(args.candidate)
+    print(f"baseline {baseline_meta.get('commit')} vs candidate {candidate_meta.get('commit')}")
+
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys(), key=str):
+        ratio = candidate[key]['p50_ms'] / baseline[key]['p50_ms']
+        flag = 'REGRESSION' if ratio > args.threshold else ''
+        regressions += bool(flag)
+        print(f"{' '.join(str(k) for k in key):<70} {baseline[key]['p50_ms']:10.3f} ms -> "
+              f"{candidate[key]['p50_ms']:10.3f} ms  x{ratio:6.2f} {flag}")
+
+    print(f"{regressions} regression(s) above x{args.threshold}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from pod_predictor import COEFFICIENTS, DEFAULT_VALUES, NORMALIZATION_MEAN_SD
+from pod_predictor.schema import FEATURE_RANGES
+
+# Features that are often missing in practice (GFR, MoCA subscores, Clinical Frailty Scale)
+MISSING_FEATURES = [
+    'GFR (Cockcroft-Gault, ml/min)',
+    'MoCA Orientation (subscore)',
+    'MoCA Memory (subscore)',
+    'Clinical Frailty Scale (score)',
+    'MoCA Verbal Fluency (subscore)'
+]
+
+
+def synthetic_features(n_rows, missing_rate=0.1, rng=None):
+    """
+    Generate synthetic input data from the normalization statistics and default values.
+
+    Continuous features are drawn from normal distributions with the means and standard deviations in
+    NORMALIZATION_MEAN_SD (rounded to integers for scores) and clipped to the allowed ranges of the schema. Binary
+    features are drawn with a probability of 0.2 (the default value 0 being the most common). Values of the often
+    missing features are removed with the given rate.
+
+    Args:
+    n_rows (int): The number of rows.
+    missing_rate (float, optional): The probability of a value of an often missing feature being missing. Defaults to
+        0.1.
+    rng (numpy.random.Generator, optional): The random number generator. Defaults to a generator with seed 0.
+
+    Returns:
+    pandas.DataFrame: The input data with the columns in the order of COEFFICIENTS.
+    """
+
+    rng = np.random.default_rng(0) if rng is None else rng
+    data = {}
+    for key in DEFAULT_VALUES:
+        if key in NORMALIZATION_MEAN_SD:
+            mean, sd = NORMALIZATION_MEAN_SD[key]
+            values = rng.normal(mean, sd, n_rows)
+            if '(score)' in key or '(subscore)' in key or '(n)' in key:
+                values = np.round(values)
+            values = np.clip(values, *FEATURE_RANGES[key])
+        elif key == 'MoCA Verbal Fluency (subscore)':
+            values = (rng.random(n_rows) < 0.5).astype(float)
+        else:
+            values = (rng.random(n_rows) < 0.2).astype(float)
+        if key in MISSING_FEATURES:
+            values[rng.random(n_rows) < missing_rate] = np.nan
+        data[key] = values
+
+    return pd.DataFrame(data)
+
+
+def synthetic_calibration(n_rows, path_to_file, rng=None):
+    """
+    Generate a synthetic calibration dataset and save it in the format of data/calibration_template.csv.
+
+    The outcome is drawn from the naive model probability of each row, so that the calibration is meaningful.
+
+    Args:
+    n_rows (int): The number of rows.
+    path_to_file (str): The file path of the CSV file to write.
+    rng (numpy.random.Generator, optional): The random number generator. Defaults to a generator with seed 0.
+
+    Returns:
+    str: The file path of the CSV file.
+    """
+
+    rng = np.random.default_rng(0) if rng is None else rng
+    data = synthetic_features(n_rows, rng=rng)
+
+    mean = np.array([NORMALIZATION_MEAN_SD.get(key, (0, 1))[0] for key in data.columns])
+    sd = np.array([NORMALIZATION_MEAN_SD.get(key, (0, 1))[1] for key in data.columns])
+    X = (data.fillna(DEFAULT_VALUES).to_numpy() - mean) / sd
+    z = X @ np.array(list(COEFFICIENTS.values())) - 0.61
+    proba = 1 / (1 + np.exp(-0.97 * z + 1.07))
+    data['Delirium'] = rng.random(n_rows) < proba
+
+    data.to_csv(path_to_file, index=False)
+    return path_to_file
+
+
+def as_input_type(X, input_type):
+    """
+    Convert input data to one of the input types accepted by PODPredictor.
+
+    Args:
+    X (pandas.DataFrame): The input data.
+    input_type (str): The input type. Can be 'ndarray', 'dict', or 'DataFrame'.
+
+    Returns:
+    numpy.ndarray, dict, or pandas.DataFrame: The converted input data.
+    """
+
+    if input_type == 'ndarray':
+        return X.to_numpy()
+    if input_type == 'dict':
+        return X.to_dict(orient='list')
+    return X
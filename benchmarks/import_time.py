@@ -0,0 +1,88 @@
+import argparse
+import json
+import subprocess
+import sys
+import numpy as np
+
+# Each scenario runs in a fresh interpreter, which measures the import and the first call and reports the heavy
+# dependencies loaded on the way.
+SCENARIO_CODE = {
+    'import pod_predictor': "import pod_predictor",
+    'core.predict_proba': "from pod_predictor import core\ncore.predict_proba([[float('nan')] * 15])",
+    'PODPredictor naive': ("from pod_predictor.inference import PODPredictor\n"
+                           "PODPredictor().predict_proba_array([[float('nan')] * 15])"),
+}
+HEAVY_MODULES = ['pandas', 'sklearn', 'scipy']
+# The heavy modules each scenario may import (the uncalibrated PODPredictor needs pandas, but not sklearn or scipy)
+ALLOWED_MODULES = {
+    'import pod_predictor': [],
+    'core.predict_proba': [],
+    'PODPredictor naive': ['pandas'],
+}
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'modules': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_scenario(code, repeats):
+    """
+    Measure the cold import and first call time of a code snippet in fresh interpreters.
+
+    Args:
+    code (str): The code to run.
+    repeats (int): The number of interpreters to start.
+
+    Returns:
+    dict: The median time (in milliseconds) and the heavy modules imported by the code.
+    """
+
+    times, modules = [], []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', CHILD_TEMPLATE.format(code=code, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['ms'])
+        modules = result['modules']
+
+    return {'median_ms': float(np.median(times)), 'modules': modules}
+
+
+def main():
+    """
+    Measure the import time of pod_predictor and of the uncalibrated scoring paths, and check them against a budget.
+
+    Every scenario must stay within its time budget and must not import heavy modules other than those allowed in
+    ALLOWED_MODULES (the lightweight paths, 'import pod_predictor' and pod_predictor.core, must not import pandas,
+    sklearn or scipy). The exit status is 1 if a budget is exceeded.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Import time budget check for pod_predictor.')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--package-budget-ms', type=float, default=50)
+    parser.add_argument('--core-budget-ms', type=float, default=300)
+    parser.add_argument('--predictor-budget-ms', type=float, default=1500)
+    args = parser.parse_args()
+
+    budgets = {'import pod_predictor': args.package_budget_ms, 'core.predict_proba': args.core_budget_ms,
+               'PODPredictor naive': args.predictor_budget_ms}
+    failed = False
+    for (name, code) in SCENARIO_CODE.items():
+        result = measure_scenario(code, args.repeats)
+        unexpected = [module for module in result['modules'] if module not in ALLOWED_MODULES[name]]
+        ok = result['median_ms'] <= budgets[name] and not unexpected
+        failed |= not ok
+        print(f"{name:>22}  {result['median_ms']:9.1f} ms  heavy modules: {', '.join(result['modules']) or '-':<22} "
+              f"budget {budgets[name]:.0f} ms: {'ok' if ok else 'EXCEEDED'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
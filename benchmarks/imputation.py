@@ -0,0 +1,77 @@
+import argparse
+import time
+import numpy as np
+from sklearn.impute import KNNImputer
+from pod_predictor.imputation import NearestNeighbourImputer
+
+# Features that are often missing in practice (MoCA subscores, GFR, Clinical Frailty Scale)
+MISSING_FEATURES = [2, 4, 5, 8, 9]
+
+
+def synthetic_data(n_rows, missing_rate, rng):
+    """
+    Generate normalized synthetic data with missing values in the often missing features.
+
+    Args:
+    n_rows (int): The number of rows.
+    missing_rate (float): The probability of a value of an often missing feature being missing.
+    rng (numpy.random.Generator): The random number generator.
+
+    Returns:
+    numpy.ndarray: The data of shape (n_rows, 15).
+    """
+
+    X = rng.normal(size=(n_rows, 15))
+    mask = np.zeros(X.shape, dtype=bool)
+    mask[:, MISSING_FEATURES] = rng.random((n_rows, len(MISSING_FEATURES))) < missing_rate
+    X[mask] = np.nan
+    return X
+
+
+def main():
+    """
+    Time NearestNeighbourImputer against sklearn's KNNImputer for several calibration set sizes.
+
+    The cold query includes building the KD-trees for feature subsets on first use; the warm query reuses them.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Imputation benchmark.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--brute-force-max', type=int, default=100000,
+                        help='Largest calibration set size to time KNNImputer for')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X_test = synthetic_data(args.queries, 0.3, rng)
+    print(f"{'calibration rows':>16} {'index fit (s)':>14} {'index cold (s)':>15} {'index warm (s)':>15} "
+          f"{'KNNImputer (s)':>15} {'max abs diff':>13}")
+    for n in args.sizes:
+        X_cal = synthetic_data(n, 0.1, rng)
+
+        start = time.perf_counter()
+        imputer = NearestNeighbourImputer(n_neighbors=5).fit(X_cal)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        imputed = imputer.transform(X_test)
+        cold_time = time.perf_counter() - start
+        start = time.perf_counter()
+        imputer.transform(X_test)
+        warm_time = time.perf_counter() - start
+
+        brute_time, diff = float('nan'), float('nan')
+        if n <= args.brute_force_max:
+            knn = KNNImputer(n_neighbors=5).fit(X_cal)
+            start = time.perf_counter()
+            expected = knn.transform(X_test)
+            brute_time = time.perf_counter() - start
+            diff = np.abs(imputed - expected).max()
+
+        print(f"{n:>16} {fit_time:>14.3f} {cold_time:>15.3f} {warm_time:>15.3f} {brute_time:>15.3f} {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from benchmarks.data import as_input_type, synthetic_calibration, synthetic_features
+from pod_predictor.inference import PODPredictor
+
+INPUT_TYPES = ['ndarray', 'dict', 'DataFrame']
+
+
+def measure(func, repeats):
+    """
+    Measure the latency and peak memory of a function.
+
+    The function is timed repeatedly; the peak memory is traced in one additional call (tracing slows down the
+    execution, so it is not combined with the timing).
+
+    Args:
+    func (callable): The function to measure (without arguments).
+    repeats (int): The number of timed calls.
+
+    Returns:
+    dict: The p50 and p99 latency (in milliseconds) and the peak memory (in MiB).
+    """
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'repeats': repeats,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'peak_memory_mib': peak / 2 ** 20,
+    }
+
+
+def repeats_for(batch_size, max_repeats):
+    """
+    Choose the number of timed calls for a batch size (fewer calls for larger batches).
+
+    Args:
+    batch_size (int): The number of rows per call.
+    max_repeats (int): The number of calls for a single row.
+
+    Returns:
+    int: The number of timed calls (at least 3).
+    """
+
+    return int(max(3, min(max_repeats, 100000 // batch_size)))
+
+
+def metadata():
+    """
+    Collect metadata identifying the benchmark run.
+
+    Returns:
+    dict: Git commit, timestamp and versions of Python, numpy and pandas.
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run(calibration_sizes, batch_sizes, input_types, calibrations, imputations, max_repeats, directory):
+    """
+    Run the benchmark grid.
+
+    For each calibration set size, calibration method and imputation method, the construction of PODPredictor is
+    timed. For each input type and batch size, predict_proba and get_report are timed.
+
+    Args:
+    calibration_sizes (list): The calibration set sizes (synthetic data, or the shipped dataset for 0).
+    batch_sizes (list): The numbers of rows per call.
+    input_types (list): The input types ('ndarray', 'dict', 'DataFrame').
+    calibrations (list): The calibration methods.
+    imputations (list): The imputation methods.
+    max_repeats (int): The number of timed calls for a single row.
+    directory (str): The directory for the synthetic calibration datasets.
+
+    Yields:
+    dict: The result of one benchmark.
+    """
+
+    rng = np.random.default_rng(0)
+    inputs = {n: synthetic_features(n, rng=rng) for n in batch_sizes}
+
+    for calibration_size in calibration_sizes:
+        if calibration_size:
+            path_to_file = synthetic_calibration(
+                calibration_size, os.path.join(directory, f'calibration_{calibration_size}.csv'), rng=rng)
+        else:
+            path_to_file = './data/calibration.csv'
+            calibration_size = len(pd.read_csv(path_to_file))
+
+        for (calibration, imputation) in itertools.product(calibrations, imputations):
+            config = {
+                'calibration': calibration,
+                'imputation': imputation,
+                'calibration_size': calibration_size,
+            }
+
+            def build():
+                return PODPredictor(path_to_file=path_to_file, calibration=calibration, imputation=imputation)
+
+            yield {'operation': '__init__', **config, 'input_type': None, 'batch_size': None,
+                   **measure(build, repeats=3)}
+            model = build()
+
+            for (input_type, batch_size) in itertools.product(input_types, batch_sizes):
+                X_test = as_input_type(inputs[batch_size], input_type)
+                repeats = repeats_for(batch_size, max_repeats)
+                for operation in ('predict_proba', 'get_report'):
+                    result = measure(lambda: getattr(model, operation)(X_test), repeats)
+                    result['rows_per_s'] = batch_size / (result['p50_ms'] / 1000)
+                    yield {'operation': operation, **config, 'input_type': input_type, 'batch_size': batch_size,
+                           **result}
+
+
+def parse_mode(value):
+    """
+    Convert a calibration or imputation method given on the command line ('none' for None).
+    """
+
+    return None if value == 'none' else value
+
+
+def main():
+    """
+    Parse the command line arguments, run the benchmarks and write the results to a JSON file.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='PODPredictor benchmark suite.')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--calibration-sizes', type=int, nargs='+', default=[0, 10000, 100000],
+                        help='Synthetic calibration set sizes (0 uses data/calibration.csv)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 10000, 1000000])
+    parser.add_argument('--input-types', nargs='+', default=INPUT_TYPES, choices=INPUT_TYPES)
+    parser.add_argument('--calibrations', nargs='+', default=['none', 'platt', 'va'],
+                        choices=['none', 'platt', 'va'])
+    parser.add_argument('--imputations', nargs='+', default=['none', 'knn'], choices=['none', 'knn'])
+    parser.add_argument('--max-repeats', type=int, default=100)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for result in run(args.calibration_sizes, args.batch_sizes, args.input_types,
+                          [parse_mode(c) for c in args.calibrations], [parse_mode(i) for i in args.imputations],
+                          args.max_repeats, directory):
+            results.append(result)
+            print(f"{result['operation']:>13} cal={str(result['calibration']):>5} imp={str(result['imputation']):>4} "
+                  f"n_cal={result['calibration_size']:>7} {str(result['input_type']):>9} "
+                  f"batch={str(result['batch_size']):>7}  p50 {result['p50_ms']:10.3f} ms  "
+                  f"p99 {result['p99_ms']:10.3f} ms  peak {result['peak_memory_mib']:8.2f} MiB", flush=True)
+
+    with open(args.output, 'w') as file:
+        json.dump({'metadata': metadata(), 'results': results}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
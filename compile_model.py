@@ -0,0 +1,31 @@
+import argparse
+from pod_predictor.artifact import save_model
+from pod_predictor.inference import PODPredictor
+
+
+def main():
+    """
+    Parse the command line arguments, fit a PODPredictor and save it as a compiled model artifact.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Compile a fitted POD predictor into a memory-mappable artifact.')
+    parser.add_argument('output', help='Artifact file (e.g. model.pod)')
+    parser.add_argument('--calibration-file', default='./data/calibration.csv')
+    parser.add_argument('--calibration', default='va', choices=['none', 'platt', 'va'])
+    parser.add_argument('--imputation', default='none', choices=['none', 'knn'])
+    args = parser.parse_args()
+
+    model = PODPredictor(
+        path_to_file=args.calibration_file,
+        calibration=None if args.calibration == 'none' else args.calibration,
+        imputation=None if args.imputation == 'none' else args.imputation
+    )
+    save_model(model, args.output)
+    print(f"Model artifact written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import pandas as pd
+from pod_predictor.evaluation import evaluate
+from pod_predictor.inference import PODPredictor
+
+
+def main():
+    """
+    Parse the command line arguments and compare the calibration methods on the calibration dataset by
+    cross-validation and bootstrap, printing the estimates and confidence intervals.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Cross-validated evaluation of the POD calibration methods.')
+    parser.add_argument('--calibration-file', default='./data/calibration.csv')
+    parser.add_argument('--imputation', default='none', choices=['none', 'knn', 'iterative'])
+    parser.add_argument('--calibrations', nargs='+', default=['none', 'platt', 'va'], choices=['none', 'platt', 'va'])
+    parser.add_argument('--n-splits', type=int, default=5)
+    parser.add_argument('--n-replicates', type=int, default=2000)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--random-state', type=int, default=0)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    model = PODPredictor(
+        path_to_file=args.calibration_file,
+        calibration='va',
+        imputation=None if args.imputation == 'none' else args.imputation
+    )
+    result = evaluate(
+        model,
+        calibrations=[None if calibration == 'none' else calibration for calibration in args.calibrations],
+        n_splits=args.n_splits,
+        n_replicates=args.n_replicates,
+        alpha=args.alpha,
+        random_state=args.random_state,
+        n_jobs=args.n_jobs
+    )
+
+    with pd.option_context('display.float_format', '{:.3f}'.format):
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import threading
+import time
+import urllib.request
+import numpy as np
+
+
+def post_json(url, content):
+    """
+    Send a POST request with JSON content and return the decoded response.
+
+    Args:
+    url (str): The URL to send the request to.
+    content (dict): The JSON content.
+
+    Returns:
+    dict: The decoded JSON response.
+    """
+
+    request = urllib.request.Request(url, data=json.dumps(content).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def get_json(url):
+    """
+    Send a GET request and return the decoded JSON response.
+
+    Args:
+    url (str): The URL to send the request to.
+
+    Returns:
+    dict: The decoded JSON response.
+    """
+
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def run_load_test(url, X_test, n_clients=16, n_requests=100):
+    """
+    Send concurrent single-patient requests to the scoring service and measure the latency.
+
+    Args:
+    url (str): The base URL of the scoring service.
+    X_test (dict): The test data sent with each request.
+    n_clients (int, optional): The number of concurrent clients. Defaults to 16.
+    n_requests (int, optional): The number of requests per client. Defaults to 100.
+
+    Returns:
+    dict: Request count, errors, throughput and latency percentiles (in milliseconds).
+    """
+
+    latencies = [[] for _ in range(n_clients)]
+    errors = [0] * n_clients
+
+    def client(i):
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            try:
+                post_json(url + '/predict', X_test)
+            except Exception:
+                errors[i] += 1
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'requests_per_s': len(latencies) / elapsed,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    """
+    Run a load test against a local scoring service (see server.py) and print the client and server metrics.
+
+    If no URL is given, a scoring service is started in this process on a free port.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Load test for the local POD scoring service.')
+    parser.add_argument('--url', default=None, help='Base URL of a running service, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--input', default='./data/X_test.json')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as file:
+        X_test = json.load(file)
+
+    server = batcher = None
+    url = args.url
+    if url is None:
+        from server import make_server
+        server, batcher = make_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    try:
+        print('Client:', json.dumps(run_load_test(url, X_test, args.clients, args.requests), indent=2))
+        print('Server:', json.dumps(get_json(url + '/metrics'), indent=2))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import asyncio
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+from pod_predictor import parallel
+from pod_predictor.batching import BatchMetrics
+
+
+def _score_inputs(model, method, inputs):
+    """
+    Validate the inputs of several callers and score them with one vectorized call.
+
+    The inputs are validated individually, so that an invalid input only fails its own caller. The valid inputs are
+    concatenated, scored, and the result is split by rows.
+
+    Args:
+    model (PODPredictor): The predictor.
+    method (str): The method to call ('predict_proba' or 'get_report').
+    inputs (list): The input data of the callers.
+
+    Returns:
+    list: The result or the raised exception for each input.
+    """
+
+    results = [None] * len(inputs)
+    frames = []
+    for (i, X_test) in enumerate(inputs):
+        try:
+            frames.append((i, model.preprocess_input(X_test)))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            results[i] = e
+
+    if not frames:
+        return results
+
+    try:
+        output = getattr(model, method)(pd.concat([X for (_, X) in frames], ignore_index=True))
+    except Exception as e:
+        for (i, _) in frames:
+            results[i] = e
+        return results
+
+    offset = 0
+    for (i, X) in frames:
+        if isinstance(output, pd.DataFrame):
+            # Each caller gets the index of its own input data, as from PODPredictor.get_report
+            results[i] = output.iloc[offset:offset + len(X)].set_axis(X.index)
+        else:
+            results[i] = output[offset:offset + len(X)]
+        offset += len(X)
+
+    return results
+
+
+def _score_inputs_worker(method, inputs):
+    """
+    Score the inputs of several callers in a worker process (see _score_inputs and parallel._init_worker).
+    """
+
+    return _score_inputs(parallel._worker_model, method, inputs)
+
+
+class AsyncPredictor:
+    def __init__(self, model, max_batch_size=64, max_wait=0.005, max_pending=1024, max_workers=1, processes=False):
+        """
+        Initialize a new AsyncPredictor instance.
+
+        This class provides awaitable counterparts of PODPredictor.predict_proba and PODPredictor.get_report for
+        asyncio applications. Awaiting callers are queued, and the queued calls are coalesced into batches of at most
+        max_batch_size calls (waiting at most max_wait seconds for further callers). Validation and scoring of a batch
+        (one vectorized call per method) are offloaded to an executor, so the event loop only queues the calls and
+        hands back the results. At most max_workers batches are scored at a time; calls arriving meanwhile are batched
+        together. At most max_pending calls are queued; further callers wait until the queue has room (backpressure).
+
+        Threads share the interpreter lock with the event loop, which then waits for the scoring code from time to
+        time. With processes=True, the batches are scored in worker processes instead (with the calibration and
+        imputation arrays shared as memory-mapped files, see ParallelPredictor), which keeps the event loop latency
+        independent of the load.
+
+        Args:
+        model (PODPredictor): The fitted predictor.
+        max_batch_size (int, optional): The maximal number of calls per batch. Defaults to 64.
+        max_wait (float, optional): The maximal time (in seconds) to wait for further callers. Defaults to 0.005.
+        max_pending (int, optional): The maximal number of queued calls. Defaults to 1024.
+        max_workers (int, optional): The maximal number of batches scored at a time. Defaults to 1.
+        processes (bool, optional): Whether to score in worker processes instead of threads. Defaults to False.
+        """
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.max_workers = max_workers
+        self.metrics = BatchMetrics()
+        self.directory = None
+
+        if processes:
+            self.directory = tempfile.mkdtemp(prefix='pod_predictor_')
+            template, shared = parallel._share_arrays(model, self.directory)
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=parallel._init_worker, initargs=(template, shared))
+            self.score = _score_inputs_worker
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+            self.score = lambda method, inputs: _score_inputs(model, method, inputs)
+
+        # Created in the running event loop on first use
+        self.queue = None
+        self.slots = None
+        self.task = None
+
+    def _start(self):
+        """
+        Create the queue and start the batching task in the running event loop.
+
+        Returns:
+        None
+        """
+
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self.slots = asyncio.Semaphore(self.max_workers)
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _submit(self, method, X_test):
+        """
+        Queue a call and await its result.
+
+        Args:
+        method (str): The method to call ('predict_proba' or 'get_report').
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data.
+
+        Returns:
+        The result of the method for the input data.
+        """
+
+        if self.task is None:
+            self._start()
+        elif self.task.done():
+            raise RuntimeError("AsyncPredictor is closed.")
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((method, X_test, future, time.perf_counter()))
+        return await future
+
+    async def predict_proba(self, X_test):
+        """
+        Predict the probability of postoperative delirium for the given input data (see PODPredictor.predict_proba).
+
+        Args:
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data to predict probabilities for.
+
+        Returns:
+        numpy.ndarray: A 2D numpy array containing the predicted probabilities for the given input data.
+        """
+
+        return await self._submit('predict_proba', X_test)
+
+    async def get_report(self, X_test):
+        """
+        Generate the report (see PODPredictor.get_report) for the given input data.
+
+        Args:
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data.
+
+        Returns:
+        pandas.DataFrame: The report with one row per patient.
+        """
+
+        return await self._submit('get_report', X_test)
+
+    async def _next_batch(self):
+        """
+        Wait for the next batch of queued calls.
+
+        Returns:
+        list: The calls of the batch, or None if the predictor is closed and no calls are pending.
+        """
+
+        item = await self.queue.get()
+        if item is None:
+            return None
+
+        batch = [item]
+        deadline = item[3] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if self.queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self.queue.get_nowait()
+            if item is None:
+                self.queue.put_nowait(None)  # Close after this batch
+                break
+            batch.append(item)
+
+        return batch
+
+    async def _run(self):
+        """
+        Batch the queued calls and dispatch them to the executor until the predictor is closed.
+
+        Returns:
+        None
+        """
+
+        loop = asyncio.get_running_loop()
+        pending = set()
+        while True:
+            await self.slots.acquire()
+            batch = await self._next_batch()
+            if batch is None:
+                self.slots.release()
+                break
+
+            futures = []
+            for method in {item[0] for item in batch}:
+                calls = [item for item in batch if item[0] == method]
+                self.metrics.record_batch(len(calls))
+                future = loop.run_in_executor(self.executor, self.score, method, [item[1] for item in calls])
+                future.add_done_callback(lambda f, calls=calls: self._complete(f, calls))
+                futures.append(future)
+
+            # The slot is released when all calls of the batch are scored
+            done = asyncio.gather(*futures, return_exceptions=True)
+            done.add_done_callback(lambda f: self.slots.release())
+            pending = {f for f in pending if not f.done()} | {done}
+
+        if pending:
+            await asyncio.wait(pending)
+
+    def _complete(self, future, calls):
+        """
+        Hand back the results of a scored batch to the awaiting callers.
+
+        Args:
+        future (asyncio.Future): The future of the executor call.
+        calls (list): The calls of the batch.
+
+        Returns:
+        None
+        """
+
+        try:
+            results = future.result()
+        except Exception as e:
+            results = [e] * len(calls)
+
+        for ((_, _, caller, submitted), result) in zip(calls, results):
+            error = isinstance(result, Exception)
+            if not caller.done():
+                if error:
+                    caller.set_exception(result)
+                else:
+                    caller.set_result(result)
+            self.metrics.record_request(0 if error else len(result), time.perf_counter() - submitted, error=error)
+
+    async def aclose(self):
+        """
+        Score the queued calls, then stop the batching task and shut down the executor.
+
+        Returns:
+        None
+        """
+
+        if self.task is not None and not self.task.done():
+            await self.queue.put(None)
+            await self.task
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
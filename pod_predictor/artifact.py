@@ -0,0 +1,274 @@
+import hashlib
+import json
+import numpy as np
+from pod_predictor import core
+from pod_predictor.calibration import VennAbersIndex
+from pod_predictor.imputation import NearestNeighbourImputer
+
+MAGIC = b'PODMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Fitted attributes of the imputer and calibrators stored in the artifact
+IMPUTER_ARRAYS = ['fit_X', 'col_means', 'patterns', 'group_ids', 'order', 'group_starts']
+VENN_ABERS_ARRAYS = ['c', 'p0', 'p1']
+
+
+def _padding(offset):
+    return (-offset) % ALIGNMENT
+
+
+def save_model(model, path_to_file):
+    """
+    Save a fitted PODPredictor as a compiled model artifact.
+
+    The artifact is a binary file with a fixed header (magic bytes, format version, header length), a JSON header
+    describing the model configuration and the stored arrays, and the arrays themselves, aligned for memory mapping.
+    The header contains the SHA-256 checksum of the array data. The calibration dataset itself is not stored; only the
+    coefficients, normalization vectors, Platt parameters, the Venn-ABERS index and the imputation index are.
+
+    Args:
+    model (PODPredictor): The fitted predictor.
+    path_to_file (str): The file path of the artifact.
+
+    Raises:
+    ValueError: If the predictor uses an imputation method other than KNN.
+
+    Returns:
+    None
+    """
+
+    if model.imputer is not None and not isinstance(model.imputer, NearestNeighbourImputer):
+        raise ValueError("Only predictors without imputation or with KNN imputation can be compiled.")
+
+    arrays = {
+        'coefficients': model.coefficients,
+        'normalization_mean': model.normalization_mean,
+        'normalization_sd': model.normalization_sd,
+        'default_array': model.default_array,
+    }
+    config = {'features': list(model.features), 'imputation': None, 'calibration': None}
+
+    if model.imputer is not None:
+        config['imputation'] = 'knn'
+        config['n_neighbors'] = model.imputer.n_neighbors
+        config['brute_force_max'] = model.imputer.brute_force_max
+        for name in IMPUTER_ARRAYS:
+            arrays[f'imputer.{name}'] = getattr(model.imputer, name)
+
+    if isinstance(model.calibrator, VennAbersIndex):
+        config['calibration'] = 'va'
+        for name in VENN_ABERS_ARRAYS:
+            arrays[f'calibrator.{name}'] = getattr(model.calibrator, name)
+    elif model.calibrator is not None:
+        config['calibration'] = 'platt'
+        arrays['calibrator.coef'] = model.calibrator.coef_.ravel()
+        arrays['calibrator.intercept'] = model.calibrator.intercept_.ravel()
+
+    # Array layout (offsets relative to the start of the data section)
+    layout, offset = {}, 0
+    for (name, array) in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        offset += _padding(offset)
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+
+    sha = hashlib.sha256()
+    data = bytearray(offset)
+    for (name, array) in arrays.items():
+        start = layout[name]['offset']
+        data[start:start + array.nbytes] = array.tobytes()
+    sha.update(data)
+
+    header = json.dumps({'config': config, 'arrays': layout, 'sha256': sha.hexdigest()}).encode('utf-8')
+    prefix = MAGIC + np.array([FORMAT_VERSION], dtype='<u4').tobytes() + np.array([len(header)], dtype='<u8').tobytes()
+    header += b' ' * _padding(len(prefix) + len(header))
+
+    with open(path_to_file, 'wb') as file:
+        file.write(prefix)
+        file.write(header)
+        file.write(data)
+
+
+def load_model(path_to_file, verify=True):
+    """
+    Load a compiled model artifact for scoring.
+
+    The arrays are memory-mapped from the file, so loading is almost instant and several processes share the same
+    physical memory.
+
+    Args:
+    path_to_file (str): The file path of the artifact.
+    verify (bool, optional): Whether to verify the checksum of the array data. Defaults to True.
+
+    Raises:
+    ValueError: If the file is not a model artifact, has an unsupported format version or a wrong checksum.
+
+    Returns:
+    CompiledPredictor: The predictor.
+    """
+
+    with open(path_to_file, 'rb') as file:
+        prefix = file.read(len(MAGIC) + 12)
+        if prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path_to_file}' is not a model artifact.")
+        version = int(np.frombuffer(prefix, dtype='<u4', count=1, offset=len(MAGIC))[0])
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported model artifact version {version} (expected {FORMAT_VERSION}).")
+        header_length = int(np.frombuffer(prefix, dtype='<u8', count=1, offset=len(MAGIC) + 4)[0])
+        header = json.loads(file.read(header_length))
+
+    data_offset = len(prefix) + header_length
+    data_offset += _padding(data_offset)
+    buffer = np.memmap(path_to_file, dtype=np.uint8, mode='r', offset=data_offset)
+
+    if verify and hashlib.sha256(buffer).hexdigest() != header['sha256']:
+        raise ValueError(f"Checksum mismatch in model artifact '{path_to_file}'.")
+
+    arrays = {}
+    for (name, spec) in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape']))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=spec['offset']).reshape(spec['shape'])
+
+    return CompiledPredictor(header['config'], arrays)
+
+
+class CompiledPredictor:
+    def __init__(self, config, arrays):
+        """
+        Initialize a new CompiledPredictor instance.
+
+        This class scores numpy arrays with a predictor loaded from a compiled model artifact (see load_model). It only
+        depends on numpy; pandas, sklearn and the calibration dataset are not needed. Large imputation groups (more
+        than brute_force_max calibration rows with the same missingness pattern) use sklearn's KDTree, which is
+        imported on first use.
+
+        Args:
+        config (dict): The model configuration from the artifact header.
+        arrays (dict): The arrays from the artifact.
+        """
+
+        self.config = config
+        self.features = config['features']
+        self.coefficients = arrays['coefficients']
+        self.normalization_mean = arrays['normalization_mean']
+        self.normalization_sd = arrays['normalization_sd']
+        self.default_array = arrays['default_array']
+        self.normalized_default_array = (self.default_array - self.normalization_mean) / self.normalization_sd
+
+        if config['imputation'] == 'knn':
+            self.imputer = NearestNeighbourImputer(config['n_neighbors'], config['brute_force_max'])
+            for name in IMPUTER_ARRAYS:
+                setattr(self.imputer, name, arrays[f'imputer.{name}'])
+            self.imputer.n_features = len(self.features)
+            self.imputer.trees = {}
+        else:
+            self.imputer = None
+
+        if config['calibration'] == 'va':
+            self.calibrator = VennAbersIndex.__new__(VennAbersIndex)
+            for name in VENN_ABERS_ARRAYS:
+                setattr(self.calibrator, name, arrays[f'calibrator.{name}'])
+        elif config['calibration'] == 'platt':
+            self.calibrator = (float(arrays['calibrator.coef'][0]), float(arrays['calibrator.intercept'][0]))
+        else:
+            self.calibrator = None
+
+    def decision_function(self, X):
+        """
+        Calculate the decision function for the given input data (normalized with imputed values, modified in place).
+
+        Args:
+        X (numpy.ndarray): The raw input data of shape (n, 15).
+
+        Returns:
+        numpy.ndarray: The decision function values.
+        """
+
+        X -= self.normalization_mean
+        X /= self.normalization_sd
+        if self.imputer is None:
+            np.copyto(X, self.normalized_default_array, where=np.isnan(X))
+        else:
+            X = self.imputer.transform(X)
+
+        return core.decision_function(X, self.coefficients)
+
+    def predict_proba(self, X_test, p0_p1_output=False):
+        """
+        Predict the probability of postoperative delirium for the given input data.
+
+        Args:
+        X_test (numpy.ndarray or dict): The input data of shape (n, 15) or (15,) with the columns in the order of
+            COEFFICIENTS, or a dictionary of feature values.
+        p0_p1_output (bool, optional): Whether to also return the Venn-ABERS probability bounds (None for other
+            calibration methods). Defaults to False.
+
+        Returns:
+        numpy.ndarray: A 2D numpy array containing the predicted probabilities for the given input data.
+        numpy.ndarray: A 2D numpy array containing the lower and upper probability bounds (if p0_p1_output is True).
+        """
+
+        z = self.decision_function(core.as_array(X_test))
+        p0_p1 = None
+
+        if isinstance(self.calibrator, tuple):
+            (coef, intercept) = self.calibrator
+            probas = np.empty((len(z), 2))
+            probas[:, 1] = 1 / (1 + np.exp(-(z * coef + intercept)))
+            probas[:, 0] = 1 - probas[:, 1]
+        else:
+            probas = core.naive_proba(z)
+
+        if isinstance(self.calibrator, VennAbersIndex):
+            probas, p0_p1 = self.calibrator.predict_proba(probas, p0_p1_output=True)
+
+        if p0_p1_output:
+            return probas, p0_p1
+        return probas
+
+    def feature_importance(self, X_test):
+        """
+        Calculate the feature importance for the given input data (missing values are not imputed and remain NaN).
+
+        Args:
+        X_test (numpy.ndarray or dict): The input data of shape (n, 15) or (15,) with the columns in the order of
+            COEFFICIENTS, or a dictionary of feature values.
+
+        Returns:
+        numpy.ndarray: The feature importance values of shape (n, 15).
+        """
+
+        X = core.as_array(X_test)
+        X -= self.normalization_mean
+        X /= self.normalization_sd
+        X *= self.coefficients
+        return X
+
+    def get_report(self, X_test):
+        """
+        Generate the report (see PODPredictor.get_report) for the given input data as a dictionary of numpy arrays.
+
+        Args:
+        X_test (numpy.ndarray or dict): The input data of shape (n, 15) or (15,) with the columns in the order of
+            COEFFICIENTS, or a dictionary of feature values.
+
+        Returns:
+        dict: The predicted probabilities, the confidence interval bounds (None if not available) and the feature
+              importance of each feature.
+        """
+
+        probas, p0_p1 = self.predict_proba(X_test, p0_p1_output=True)
+        report = {
+            'Delirium Probability': probas[:, 1],
+            'Confidence Interval (lower bound)': None if p0_p1 is None else p0_p1[:, 0],
+            'Confidence Interval (upper bound)': None if p0_p1 is None else p0_p1[:, 1],
+        }
+        feature_importance = self.feature_importance(X_test)
+        for (i, key) in enumerate(self.features):
+            report[key] = feature_importance[:, i]
+
+        return report
@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+
+class BatchMetrics:
+    def __init__(self, window=10000):
+        """
+        Initialize a new BatchMetrics instance.
+
+        This class collects throughput and latency metrics of a MicroBatcher. Latencies are kept for the most recent
+        requests only.
+
+        Args:
+        window (int, optional): The number of recent request latencies to keep. Defaults to 10000.
+        """
+
+        self.lock = threading.Lock()
+        self.start_time = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+
+    def record_batch(self, n_rows):
+        """
+        Record a processed batch.
+
+        Args:
+        n_rows (int): The number of rows in the batch.
+
+        Returns:
+        None
+        """
+
+        with self.lock:
+            self.batches += 1
+            self.batch_sizes.append(n_rows)
+
+    def record_request(self, n_rows, latency, error=False):
+        """
+        Record a completed request.
+
+        Args:
+        n_rows (int): The number of rows in the request.
+        latency (float): The time (in seconds) from submission to completion.
+        error (bool, optional): Whether the request failed. Defaults to False.
+
+        Returns:
+        None
+        """
+
+        with self.lock:
+            self.requests += 1
+            self.rows += n_rows
+            self.errors += int(error)
+            self.latencies.append(latency)
+
+    def to_dict(self):
+        """
+        Export the collected metrics.
+
+        Returns:
+        dict: Request, row, batch and error counts, throughput (per second since start), mean batch size and latency
+              percentiles (in milliseconds).
+        """
+
+        with self.lock:
+            elapsed = time.perf_counter() - self.start_time
+            latencies = np.array(self.latencies) * 1000
+            batch_sizes = np.array(self.batch_sizes)
+            return {
+                'uptime_s': elapsed,
+                'requests': self.requests,
+                'rows': self.rows,
+                'batches': self.batches,
+                'errors': self.errors,
+                'requests_per_s': self.requests / elapsed if elapsed else 0.0,
+                'rows_per_s': self.rows / elapsed if elapsed else 0.0,
+                'mean_batch_size': float(batch_sizes.mean()) if len(batch_sizes) else 0.0,
+                'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            }
+
+
+class MicroBatcher:
+    def __init__(self, func, max_batch_size=64, max_wait=0.005):
+        """
+        Initialize a new MicroBatcher instance.
+
+        This class coalesces concurrently submitted DataFrames into micro-batches, which are passed to a single call of
+        the given function (e.g., PODPredictor.get_report) by a background thread. A batch is closed when it contains
+        at least max_batch_size rows or when max_wait seconds passed since its first submission. The result is split
+        by rows and handed back to the submitting callers in order.
+
+        Args:
+        func (callable): The function to apply to a batch. It takes a pandas.DataFrame and returns an array or DataFrame
+                         with one row per input row.
+        max_batch_size (int, optional): The maximal number of rows per batch. Defaults to 64.
+        max_wait (float, optional): The maximal time (in seconds) to wait for further submissions. Defaults to 0.005.
+        """
+
+        self.func = func
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.metrics = BatchMetrics()
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, X):
+        """
+        Submit a DataFrame for batched processing.
+
+        Args:
+        X (pandas.DataFrame): The (validated) input data.
+
+        Returns:
+        concurrent.futures.Future: A future resolving to the rows of the result that belong to the input data.
+        """
+
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("MicroBatcher is closed.")
+            self.queue.append((X, future, time.perf_counter()))
+            self.condition.notify()
+        return future
+
+    def __call__(self, X):
+        """
+        Submit a DataFrame for batched processing and wait for the result.
+
+        Args:
+        X (pandas.DataFrame): The (validated) input data.
+
+        Returns:
+        The rows of the result that belong to the input data.
+        """
+
+        return self.submit(X).result()
+
+    def close(self):
+        """
+        Stop the background thread after the pending submissions were processed.
+
+        Returns:
+        None
+        """
+
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _next_batch(self):
+        """
+        Wait for the next batch of submissions.
+
+        Returns:
+        list: The submissions of the batch, or None if the batcher is closed and no submissions are pending.
+        """
+
+        with self.condition:
+            while not self.queue and not self.closed:
+                self.condition.wait()
+            if not self.queue:
+                return None
+
+            deadline = self.queue[0][2] + self.max_wait
+            while True:
+                n_rows = sum(len(item[0]) for item in self.queue)
+                remaining = deadline - time.perf_counter()
+                if n_rows >= self.max_batch_size or remaining <= 0 or self.closed:
+                    break
+                self.condition.wait(remaining)
+
+            batch, n_rows = [], 0
+            while self.queue and (not batch or n_rows + len(self.queue[0][0]) <= self.max_batch_size):
+                item = self.queue.popleft()
+                batch.append(item)
+                n_rows += len(item[0])
+            return batch
+
+    def _run(self):
+        """
+        Process batches in the background thread until the batcher is closed.
+
+        Returns:
+        None
+        """
+
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            sizes = [len(X) for (X, _, _) in batch]
+            self.metrics.record_batch(sum(sizes))
+            try:
+                X = pd.concat([X for (X, _, _) in batch], ignore_index=True)
+                result = self.func(X)
+            except Exception as e:
+                for (X, future, submitted) in batch:
+                    future.set_exception(e)
+                    self.metrics.record_request(len(X), time.perf_counter() - submitted, error=True)
+                continue
+
+            offset = 0
+            for (size, (X, future, submitted)) in zip(sizes, batch):
+                if isinstance(result, pd.DataFrame):
+                    # Each caller gets the index of its own input data (see PODPredictor.get_report)
+                    part = result.iloc[offset:offset + size].set_axis(X.index)
+                else:
+                    part = result[offset:offset + size]
+                offset += size
+                future.set_result(part)
+                self.metrics.record_request(size, time.perf_counter() - submitted)
@@ -0,0 +1,177 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+class ResultCache:
+    def __init__(self, max_size=1024, ttl=None):
+        """
+        Initialize a new ResultCache instance.
+
+        This class caches prediction results per patient in a bounded LRU cache. The key of a patient is a canonical
+        hash of the preprocessed feature vector (float64 values in the order of COEFFICIENTS, with a single NaN and
+        zero representation), combined with a namespace (e.g., the method and the calibration version). Entries
+        expire after ttl seconds, and the least recently used entries are evicted when the cache is full.
+
+        Args:
+        max_size (int, optional): The maximal number of cached patients. Defaults to 1024.
+        ttl (float, optional): The time to live of an entry (in seconds). Defaults to None (no expiry).
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (value, expiry time)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def row_keys(X, namespace):
+        """
+        Calculate the cache keys of the rows of a preprocessed feature matrix.
+
+        Args:
+        X (pandas.DataFrame): The preprocessed input data (see PODPredictor.preprocess_input).
+        namespace (tuple): The namespace of the keys.
+
+        Returns:
+        list: The cache keys, one per row.
+        """
+
+        values = X.to_numpy(dtype=np.float64, copy=True)
+        values[np.isnan(values)] = np.nan
+        values += 0.0  # -0.0 -> 0.0
+        return [(namespace, hashlib.blake2b(row.tobytes(), digest_size=16).digest()) for row in values]
+
+    def get(self, key):
+        """
+        Get a cached value.
+
+        Args:
+        key (hashable): The cache key.
+
+        Returns:
+        The cached value, or None if the key is not cached or expired.
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and entry[1] <= time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Cache a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+        key (hashable): The cache key.
+        value: The value to cache.
+
+        Returns:
+        None
+        """
+
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[key] = (value, expiry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def cached_rows(self, X, namespace, func):
+        """
+        Apply a function row-wise with caching: cached rows are looked up, and the function is called once for the
+        remaining rows.
+
+        Args:
+        X (pandas.DataFrame): The preprocessed input data (see PODPredictor.preprocess_input).
+        namespace (tuple): The namespace of the keys (e.g., the method and the calibration version).
+        func (callable): The function to apply. It takes a DataFrame and returns a numpy array or DataFrame with one row
+                         per input row.
+
+        Returns:
+        numpy.ndarray or pandas.DataFrame: The result for all rows, in the order of the input data (a DataFrame with
+                                           the index of the input data).
+        """
+
+        if not len(X):
+            return func(X)
+
+        keys = self.row_keys(X, namespace)
+        rows = [self.get(key) for key in keys]
+        missing = [i for (i, row) in enumerate(rows) if row is None]
+
+        if missing:
+            result = func(X.iloc[missing].reset_index(drop=True))
+            if isinstance(result, pd.DataFrame):
+                # Rows are cached as object arrays with the column names and dtypes of the result
+                layout = (result.columns, result.dtypes)
+                values = result.to_numpy(dtype=object)
+                computed = [(values[j], layout) for j in range(len(missing))]
+            else:
+                computed = list(np.asarray(result))
+            for (i, row) in zip(missing, computed):
+                rows[i] = row
+                self.put(keys[i], row)
+
+        if isinstance(rows[0], tuple):
+            (columns, dtypes) = rows[0][1]
+            values = np.array([row[0] for row in rows], dtype=object)
+            return pd.DataFrame({column: values[:, j].astype(dtype) if dtype != object else values[:, j]
+                                 for (j, (column, dtype)) in enumerate(zip(columns, dtypes))}, index=X.index)
+        return np.array(rows)
+
+    def clear(self):
+        """
+        Remove all entries (e.g., after the calibration changed).
+
+        Returns:
+        None
+        """
+
+        with self.lock:
+            self.entries.clear()
+
+    def to_dict(self):
+        """
+        Export the cache counters.
+
+        Returns:
+        dict: The number of entries, hits, misses, evictions (of least recently used entries) and expirations, and
+              the hit rate.
+        """
+
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,274 @@
+import numpy as np
+
+
+def _cross(a, b, c):
+    """
+    Calculate the cross product of the vectors a->b and a->c.
+
+    For points with increasing x-coordinates, the result is positive if b lies strictly below the line from a to c.
+
+    Args:
+    a, b, c (tuple): Points (x, y) of the cumulative sum diagram.
+
+    Returns:
+    float: The cross product.
+    """
+
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def _min_slopes_right(x, y):
+    """
+    Calculate the minimal slope from every point of the cumulative sum diagram to the shifted points on its right.
+
+    For each i < k, the slope is minimized over the points (x[r] + 1, y[r] + 1) with r > i. This corresponds to the
+    isotonic fit with an additional test object of label 1. The lower convex hull of the shifted points is built from
+    right to left, and the tangent point for each query is found by binary search.
+
+    Args:
+    x (list): Cumulative weights of the sorted, unique calibration scores (starting with 0).
+    y (list): Cumulative label counts of the sorted, unique calibration scores (starting with 0).
+
+    Returns:
+    list: The minimal slopes (the last entry is None).
+    """
+
+    k = len(x) - 1
+    slopes = [None] * (k + 1)
+    hull = []  # hull[-1] is the leftmost vertex
+    for i in range(k - 1, -1, -1):
+        p = (x[i + 1] + 1, y[i + 1] + 1)
+        while len(hull) >= 2 and _cross(p, hull[-1], hull[-2]) <= 0:
+            hull.pop()
+        hull.append(p)
+
+        q = (x[i], y[i])
+        lo, hi = 0, len(hull) - 1  # positions counted from the leftmost vertex
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _cross(q, hull[-1 - mid], hull[-2 - mid]) >= 0:
+                hi = mid
+            else:
+                lo = mid + 1
+        v = hull[-1 - lo]
+        slopes[i] = (v[1] - q[1]) / (v[0] - q[0])
+
+    return slopes
+
+
+def _max_slopes_left(x, y):
+    """
+    Calculate the maximal slope to every shifted point of the cumulative sum diagram from the points on its left.
+
+    For each i > 0, the slope is maximized over the points (x[l], y[l]) with l < i towards (x[i] + 1, y[i]). This
+    corresponds to the isotonic fit with an additional test object of label 0. The lower convex hull of the points is
+    built from left to right, and the tangent point for each query is found by binary search.
+
+    Args:
+    x (list): Cumulative weights of the sorted, unique calibration scores (starting with 0).
+    y (list): Cumulative label counts of the sorted, unique calibration scores (starting with 0).
+
+    Returns:
+    list: The maximal slopes (the first entry is None).
+    """
+
+    k = len(x) - 1
+    slopes = [None] * (k + 1)
+    hull = []  # hull[-1] is the rightmost vertex
+    for i in range(1, k + 1):
+        p = (x[i - 1], y[i - 1])
+        while len(hull) >= 2 and _cross(hull[-2], hull[-1], p) <= 0:
+            hull.pop()
+        hull.append(p)
+
+        q = (x[i] + 1, y[i])
+        lo, hi = 0, len(hull) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _cross(hull[mid], hull[mid + 1], q) <= 0:
+                hi = mid
+            else:
+                lo = mid + 1
+        v = hull[lo]
+        slopes[i] = (v[1] - q[1]) / (v[0] - q[0])
+
+    return slopes
+
+
+class VennAbersIndex:
+    def __init__(self, p_cal, y_cal, sample_weight=None):
+        """
+        Initialize a new VennAbersIndex instance.
+
+        This class precomputes the Venn-ABERS calibration of the given calibration set once, so that test scores can be
+        calibrated by binary search. The calibration scores are sorted, the cumulative label counts are calculated,
+        and the isotonic fits for both hypothetical test labels are evaluated at every position between the sorted
+        unique scores. The outputs are identical to the VennAbersCalibrator class from venn_abers (MIT license).
+        Source: https://github.com/ip200/venn-abers
+        Copyright (c) 2023 Ivan Petej
+
+        The index keeps the total weight and label weight of each unique score, so that cases can be added or removed
+        later (see update) without sorting the calibration set again.
+
+        Args:
+        p_cal (numpy.ndarray): A 2D numpy array containing the (naive) probability estimates of the calibration set.
+        y_cal (numpy.ndarray): The binary labels of the calibration set.
+        sample_weight (numpy.ndarray, optional): The weights of the calibration cases. Defaults to None (weight 1).
+        """
+
+        self.c = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.label_weights = np.zeros(0)
+        self.update(p_cal, y_cal, sample_weight)
+
+    def update(self, p_new, y_new, sample_weight=None, decay=None):
+        """
+        Add calibration cases to the index and recompute the isotonic fits.
+
+        The scores of the new cases are merged into the sorted unique scores. Cases added before can be removed by
+        passing them again with negative weights (e.g., for a sliding window).
+
+        Args:
+        p_new (numpy.ndarray): A 2D numpy array containing the (naive) probability estimates of the new cases.
+        y_new (numpy.ndarray): The binary labels of the new cases.
+        sample_weight (numpy.ndarray, optional): The weights of the new cases. Defaults to None (weight 1).
+        decay (float, optional): A factor applied to the weights of the existing cases before the new cases are added.
+            Defaults to None (no decay).
+
+        Returns:
+        VennAbersIndex: The updated index.
+        """
+
+        scores = np.asarray(p_new)[:, 1]
+        labels = np.asarray(y_new, dtype=float)
+        new_weights = np.ones(len(scores)) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+        old_weights, old_label_weights = self.weights, self.label_weights
+        if decay is not None:
+            old_weights, old_label_weights = old_weights * decay, old_label_weights * decay
+
+        # Merge the new scores into the unique scores (weights of equal scores are summed)
+        c, inverse = np.unique(np.concatenate([self.c, scores]), return_inverse=True)
+        weights = np.bincount(inverse, np.concatenate([old_weights, new_weights]), minlength=len(c))
+        label_weights = np.bincount(
+            inverse, np.concatenate([old_label_weights, new_weights * labels]), minlength=len(c))
+
+        # Scores of removed cases
+        keep = weights > 1e-9
+        if not keep.all():
+            c, weights, label_weights = c[keep], weights[keep], label_weights[keep]
+        np.clip(label_weights, 0, weights, out=label_weights)
+
+        if not len(c):
+            raise ValueError("The Venn-ABERS calibration set is empty.")
+
+        # Cumulative sum diagram of the calibration set
+        x = np.zeros(len(c) + 1)
+        np.cumsum(weights, out=x[1:])
+        y = np.zeros(len(c) + 1)
+        np.cumsum(label_weights, out=y[1:])
+        x, y = x.tolist(), y.tolist()
+
+        # The index is replaced at once, so that concurrent predictions use either the old or the new index
+        (self.c, self.weights, self.label_weights, self.p1, self.p0) = (
+            c, weights, label_weights, self._fit_p1(x, y), self._fit_p0(x, y))
+
+        return self
+
+    @staticmethod
+    def _fit_p1(x, y):
+        """
+        Calculate the isotonic fit for a test object of label 1 at every position between the unique calibration scores.
+
+        Args:
+        x (list): Cumulative weights of the sorted, unique calibration scores (starting with 0).
+        y (list): Cumulative label counts of the sorted, unique calibration scores (starting with 0).
+
+        Returns:
+        numpy.ndarray: The isotonic fit values.
+        """
+
+        k = len(x) - 1
+        slopes = _min_slopes_right(x, y)
+        p1 = np.zeros(k + 1)
+
+        grad = slopes[0]
+        c_point = 0
+        p1[0] = grad
+        for i in range(1, k + 1):
+            imp_point = y[c_point] + (x[i] - x[c_point]) * grad
+            if y[i] < imp_point:
+                if i < k:
+                    grad = slopes[i]
+                c_point = i
+            p1[i] = grad
+        p1[-1] = 1.0
+
+        return p1
+
+    @staticmethod
+    def _fit_p0(x, y):
+        """
+        Calculate the isotonic fit for a test object of label 0 at every position between the unique calibration scores.
+
+        Args:
+        x (list): Cumulative weights of the sorted, unique calibration scores (starting with 0).
+        y (list): Cumulative label counts of the sorted, unique calibration scores (starting with 0).
+
+        Returns:
+        numpy.ndarray: The isotonic fit values.
+        """
+
+        k = len(x) - 1
+        slopes = _max_slopes_left(x, y)
+        p0 = np.zeros(k + 1)
+
+        grad = slopes[k]
+        c_point = k
+        p0[k] = grad
+        for i in range(k - 1, -1, -1):
+            imp_point = y[c_point] + ((x[i] + 1) - (x[c_point] + 1)) * grad
+            if y[i] < imp_point:
+                grad = max(slopes[i], 0.0) if i > 0 else 0.0
+                c_point = i
+            p0[i] = grad
+
+        return p0
+
+    def calibrate(self, scores):
+        """
+        Calculate the Venn-ABERS calibrated probabilities and bounds for (naive) probability estimates of any shape.
+
+        Args:
+        scores (numpy.ndarray): The (naive) probability estimates of delirium.
+
+        Returns:
+        numpy.ndarray: The calibrated probabilities of delirium, of the shape of scores.
+        numpy.ndarray: The lower and upper probability bounds, of the shape of scores plus a last axis of length 2.
+        """
+
+        p0 = self.p0[np.searchsorted(self.c, scores, 'right')]
+        p1 = self.p1[np.searchsorted(self.c, scores, 'left')]
+        return p1 / (1 - p0 + p1), np.stack((p0, p1), axis=-1)
+
+    def predict_proba(self, p_test, p0_p1_output=False):
+        """
+        Calculate the Venn-ABERS calibrated probabilities for the given (naive) probability estimates.
+
+        Args:
+        p_test (numpy.ndarray): A 2D numpy array containing the (naive) probability estimates to calibrate.
+        p0_p1_output (bool, optional): Whether to also return the lower and upper probability bounds. Defaults to False.
+
+        Returns:
+        numpy.ndarray: A 2D numpy array containing the calibrated probabilities.
+        numpy.ndarray: A 2D numpy array containing the lower and upper probability bounds (if p0_p1_output is True).
+        """
+
+        (p, p0_p1) = self.calibrate(np.asarray(p_test)[:, 1])
+
+        p_prime = np.zeros((len(p), 2))
+        p_prime[:, 1] = p
+        p_prime[:, 0] = 1 - p_prime[:, 1]
+
+        if p0_p1_output:
+            return p_prime, p0_p1
+        return p_prime
@@ -0,0 +1,127 @@
+import numpy as np
+from pod_predictor import COEFFICIENTS, DEFAULT_VALUES, NORMALIZATION_MEAN_SD
+
+# This module only depends on numpy. It scores the uncalibrated model (default value imputation and naive
+# probabilities) without importing pandas or sklearn, which are only needed by PODPredictor for calibration, KNN
+# imputation and DataFrame input.
+
+FEATURES = list(DEFAULT_VALUES.keys())
+COEFFICIENT_ARRAY = np.array([COEFFICIENTS[key] for key in FEATURES], dtype=float)
+DEFAULT_ARRAY = np.array([DEFAULT_VALUES[key] for key in FEATURES], dtype=float)
+# Binary features are left unchanged by the normalization (mean 0, standard deviation 1)
+NORMALIZATION_MEAN = np.array([NORMALIZATION_MEAN_SD.get(key, (0, 1))[0] for key in FEATURES], dtype=float)
+NORMALIZATION_SD = np.array([NORMALIZATION_MEAN_SD.get(key, (0, 1))[1] for key in FEATURES], dtype=float)
+# Missing values are imputed after the normalization (as by PODPredictor.impute), with the normalized default values
+NORMALIZED_DEFAULT_ARRAY = (DEFAULT_ARRAY - NORMALIZATION_MEAN) / NORMALIZATION_SD
+
+
+def as_array(X_test):
+    """
+    Convert the input data to a new float64 array of shape (n, 15) with the columns in the order of COEFFICIENTS.
+
+    Args:
+    X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data. The columns of a numpy array must be in the
+        order of COEFFICIENTS.
+
+    Raises:
+    ValueError: If the input is a numpy array with incorrect dimensions.
+    KeyError: If a key is not found in the JSON template for the data.
+
+    Returns:
+    numpy.ndarray: The input data as a float64 array.
+    """
+
+    if isinstance(X_test, dict) or hasattr(X_test, 'columns'):
+        keys = list(X_test.keys())
+        for key in keys + FEATURES:
+            if key not in FEATURES or key not in keys:
+                raise KeyError(
+                    f"Key '{key}' not found in Features. Use keys in data/JSON_template.json.")
+        return np.column_stack([np.asarray(X_test[key], dtype=np.float64).ravel() for key in FEATURES])
+
+    X = np.array(X_test, dtype=np.float64, order='C', ndmin=2)
+    if X.ndim != 2 or X.shape[1] != len(FEATURES):
+        raise ValueError(
+            f"Expected X_test to have shape (n, 15), but got array with shape {np.shape(X_test)} instead.")
+    return X
+
+
+def normalize(X):
+    """
+    Normalize a float64 array of shape (n, 15) in place.
+
+    Args:
+    X (numpy.ndarray): The data with the columns in the order of COEFFICIENTS.
+
+    Returns:
+    numpy.ndarray: The normalized data (the same array).
+    """
+
+    np.subtract(X, NORMALIZATION_MEAN, out=X)
+    np.divide(X, NORMALIZATION_SD, out=X)
+    return X
+
+
+def decision_function(X, coefficients=COEFFICIENT_ARRAY):
+    """
+    Calculate the decision function for the normalized data with imputed values.
+
+    Args:
+    X (numpy.ndarray): The normalized data of shape (n, 15).
+    coefficients (numpy.ndarray, optional): The model coefficients. Defaults to COEFFICIENT_ARRAY.
+
+    Returns:
+    numpy.ndarray: The decision function values.
+    """
+
+    # The rounding of the dot product depends on the memory layout (e.g., the values of a DataFrame are column-major),
+    # so it is always calculated on a C-contiguous array
+    z = np.empty(X.shape[0])
+    np.dot(np.ascontiguousarray(X, dtype=np.float64), coefficients, out=z)
+    z -= 0.61
+    return z
+
+
+def naive_proba(z, out=None):
+    """
+    Calculate the naive probability estimates for the given decision function values.
+
+    The values of z are overwritten.
+
+    Args:
+    z (numpy.ndarray): The decision function values.
+    out (numpy.ndarray, optional): An array of shape (n, 2) to store the result in. Defaults to None.
+
+    Returns:
+    numpy.ndarray: A 2D numpy array containing the naive probability estimates.
+    """
+
+    if out is None:
+        out = np.empty((z.shape[0], 2))
+
+    np.multiply(z, -0.97, out=z)
+    z += 1.07
+    np.exp(z, out=z)
+    z += 1
+    np.divide(1, z, out=out[:, 1])
+    np.subtract(1, out[:, 1], out=out[:, 0])
+    return out
+
+
+def predict_proba(X_test):
+    """
+    Predict the (uncalibrated) probability of postoperative delirium for the given input data.
+
+    Missing values are replaced by the default values. The results are the same as those of PODPredictor.predict_proba
+    without calibration and imputation.
+
+    Args:
+    X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data to predict probabilities for.
+
+    Returns:
+    numpy.ndarray: A 2D numpy array containing the predicted probabilities for the given input data.
+    """
+
+    X = normalize(as_array(X_test))
+    np.copyto(X, NORMALIZED_DEFAULT_ARRAY, where=np.isnan(X))
+    return naive_proba(decision_function(X))
@@ -0,0 +1,304 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pod_predictor import core
+from pod_predictor.calibration import VennAbersIndex
+
+METRICS = ['AUC', 'Brier Score', 'Calibration Slope', 'Calibration Intercept']
+
+
+def _expit(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def bootstrap_weights(n, n_replicates, rng):
+    """
+    Draw bootstrap replicates as case weights (the number of times each case is drawn).
+
+    Args:
+    n (int): The number of cases.
+    n_replicates (int): The number of replicates.
+    rng (numpy.random.Generator): The random number generator.
+
+    Returns:
+    numpy.ndarray: The weights of shape (n_replicates, n).
+    """
+
+    samples = rng.integers(0, n, size=(n_replicates, n))
+    samples += (np.arange(n_replicates) * n)[:, None]
+    return np.bincount(samples.ravel(), minlength=n_replicates * n).reshape(n_replicates, n).astype(float)
+
+
+def weighted_auc(scores, y, weights):
+    """
+    Calculate the area under the ROC curve for several weightings of the cases at once.
+
+    The scores are sorted once; for each weighting, the AUC is the weighted probability that a positive case has a
+    higher score than a negative case (ties count one half).
+
+    Args:
+    scores (numpy.ndarray): The predicted scores of shape (n,).
+    y (numpy.ndarray): The binary labels of shape (n,).
+    weights (numpy.ndarray): The case weights of shape (n_replicates, n).
+
+    Returns:
+    numpy.ndarray: The AUC of each weighting (NaN if a class has no weight).
+    """
+
+    order = np.argsort(scores, kind='stable')
+    _, starts = np.unique(scores[order], return_index=True)
+    y_sorted = np.asarray(y, dtype=float)[order]
+    weights = weights[:, order]
+
+    positives = np.add.reduceat(weights * y_sorted, starts, axis=1)
+    negatives = np.add.reduceat(weights * (1 - y_sorted), starts, axis=1)
+    negatives_below = np.cumsum(negatives, axis=1) - negatives
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((positives * (negatives_below + 0.5 * negatives)).sum(axis=1)
+                / (positives.sum(axis=1) * negatives.sum(axis=1)))
+
+
+def weighted_brier(proba, y, weights):
+    """
+    Calculate the Brier score for several weightings of the cases at once.
+
+    Args:
+    proba (numpy.ndarray): The predicted probabilities of shape (n,).
+    y (numpy.ndarray): The binary labels of shape (n,).
+    weights (numpy.ndarray): The case weights of shape (n_replicates, n).
+
+    Returns:
+    numpy.ndarray: The Brier score of each weighting.
+    """
+
+    return weights @ (proba - y) ** 2 / weights.sum(axis=1)
+
+
+def weighted_calibration(proba, y, weights, start=None, max_iter=50, tol=1e-10):
+    """
+    Calculate the calibration slope and intercept for several weightings of the cases at once.
+
+    The slope is the coefficient of the logistic regression of the labels on the logit of the predicted probabilities,
+    and the intercept (calibration-in-the-large) is the intercept of the logistic regression with the logit as offset.
+    Both are fitted by Newton's method for all weightings simultaneously, starting from the given values (e.g., the
+    estimates on the unweighted data, which are close to those of bootstrap replicates).
+
+    Args:
+    proba (numpy.ndarray): The predicted probabilities of shape (n,).
+    y (numpy.ndarray): The binary labels of shape (n,).
+    weights (numpy.ndarray): The case weights of shape (n_replicates, n).
+    start (tuple, optional): The initial slope, intercept of the slope model, and calibration intercept. Defaults to
+        None (1, 0, 0).
+    max_iter (int, optional): The maximal number of Newton iterations. Defaults to 50.
+    tol (float, optional): The tolerance of the parameter updates. Defaults to 1e-10.
+
+    Returns:
+    numpy.ndarray: The calibration slope of each weighting.
+    numpy.ndarray: The calibration intercept of each weighting.
+    numpy.ndarray: The intercept of the slope model of each weighting.
+    """
+
+    p = np.clip(proba, 1e-12, 1 - 1e-12)
+    x = np.log(p / (1 - p))
+    n_replicates = len(weights)
+
+    (b0, a0, c0) = (1.0, 0.0, 0.0) if start is None else start
+
+    # Slope: y ~ a + b * x
+    a, b = np.full(n_replicates, a0), np.full(n_replicates, b0)
+    for _ in range(max_iter):
+        mu = _expit(a[:, None] + b[:, None] * x)
+        residuals = weights * (y - mu)
+        curvature = weights * mu * (1 - mu)
+        g0, g1 = residuals.sum(axis=1), residuals @ x
+        h00, h01, h11 = curvature.sum(axis=1), curvature @ x, curvature @ x ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            det = h00 * h11 - h01 ** 2
+            da, db = (h11 * g0 - h01 * g1) / det, (h00 * g1 - h01 * g0) / det
+        a, b = a + da, b + db
+        if np.nanmax(np.abs(np.concatenate([da, db]))) < tol:
+            break
+    slope, slope_intercept = b, a
+
+    # Intercept: y ~ offset(x) + a
+    a = np.full(n_replicates, c0)
+    for _ in range(max_iter):
+        mu = _expit(a[:, None] + x)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            da = (weights * (y - mu)).sum(axis=1) / (weights * mu * (1 - mu)).sum(axis=1)
+        a = a + da
+        if np.nanmax(np.abs(da)) < tol:
+            break
+
+    return slope, a, slope_intercept
+
+
+def bootstrap_metrics(proba, y, n_replicates=2000, alpha=0.05, random_state=0, chunk_size=100):
+    """
+    Estimate AUC, Brier score, calibration slope and intercept with percentile bootstrap confidence intervals.
+
+    The replicates are represented as case weights and evaluated in chunks, with all replicates of a chunk processed
+    by the same array operations.
+
+    Args:
+    proba (numpy.ndarray): The predicted probabilities of shape (n,).
+    y (numpy.ndarray): The binary labels of shape (n,).
+    n_replicates (int, optional): The number of bootstrap replicates. Defaults to 2000.
+    alpha (float, optional): One minus the confidence level of the intervals. Defaults to 0.05.
+    random_state (int, optional): The seed of the random number generator. Defaults to 0.
+    chunk_size (int, optional): The number of replicates evaluated at once. Defaults to 100.
+
+    Returns:
+    pandas.DataFrame: The estimate and the lower and upper confidence bound of each metric.
+    """
+
+    proba = np.asarray(proba, dtype=float)
+    y = np.asarray(y, dtype=float)
+    rng = np.random.default_rng(random_state)
+
+    start = None
+
+    def metrics(weights):
+        slope, intercept, slope_intercept = weighted_calibration(proba, y, weights, start=start)
+        return (np.column_stack((weighted_auc(proba, y, weights), weighted_brier(proba, y, weights), slope, intercept)),
+                slope_intercept)
+
+    estimate, slope_intercept = metrics(np.ones((1, len(y))))
+    estimate = estimate[0]
+    # The bootstrap replicates are fitted starting from the estimates
+    start = (estimate[2], slope_intercept[0], estimate[3])
+    replicates = np.vstack([metrics(bootstrap_weights(len(y), min(chunk_size, n_replicates - i), rng))[0]
+                            for i in range(0, n_replicates, chunk_size)])
+    lower, upper = np.nanpercentile(replicates, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+
+    return pd.DataFrame({'Estimate': estimate, 'Lower': lower, 'Upper': upper}, index=pd.Index(METRICS, name='Metric'))
+
+
+def stratified_folds(y, n_splits, rng):
+    """
+    Assign the cases to stratified cross-validation folds.
+
+    Args:
+    y (numpy.ndarray): The binary labels of shape (n,).
+    n_splits (int): The number of folds.
+    rng (numpy.random.Generator): The random number generator.
+
+    Returns:
+    numpy.ndarray: The fold of each case.
+    """
+
+    folds = np.empty(len(y), dtype=int)
+    for label in (False, True):
+        cases = rng.permutation(np.flatnonzero(np.asarray(y, dtype=bool) == label))
+        folds[cases] = np.arange(len(cases)) % n_splits
+    return folds
+
+
+def calibrate_fold(calibration, z_train, y_train, z_test):
+    """
+    Fit a calibration method on the decision function values of the training cases and apply it to the test cases.
+
+    Args:
+    calibration (str): The calibration method. Can be None, 'platt', or 'va'.
+    z_train (numpy.ndarray): The decision function values of the training cases.
+    y_train (numpy.ndarray): The binary labels of the training cases.
+    z_test (numpy.ndarray): The decision function values of the test cases.
+
+    Returns:
+    numpy.ndarray: The calibrated probabilities of the test cases.
+    """
+
+    if calibration is None:
+        return core.naive_proba(z_test.copy())[:, 1]
+
+    if calibration == 'platt':
+        from sklearn.linear_model import LogisticRegression
+        calibrator = LogisticRegression().fit(z_train.reshape(-1, 1), y_train)
+        return calibrator.predict_proba(z_test.reshape(-1, 1))[:, 1]
+
+    if calibration == 'va':
+        calibrator = VennAbersIndex(core.naive_proba(z_train.copy()), y_train)
+        return calibrator.predict_proba(core.naive_proba(z_test.copy()))[:, 1]
+
+    raise ValueError(f"Invalid calibration value '{calibration}'. Use None, 'platt', or 'va'.")
+
+
+def cross_validated_proba(z, y, calibration, n_splits=5, random_state=0, n_jobs=None):
+    """
+    Calculate out-of-fold calibrated probabilities by stratified cross-validation.
+
+    The decision function values are computed once by the caller (the model coefficients are fixed); only the
+    calibration is refitted on each training fold. The folds are processed in parallel worker processes.
+
+    Args:
+    z (numpy.ndarray): The decision function values of the calibration set.
+    y (numpy.ndarray): The binary labels of the calibration set.
+    calibration (str): The calibration method. Can be None, 'platt', or 'va'.
+    n_splits (int, optional): The number of folds. Defaults to 5.
+    random_state (int, optional): The seed of the fold assignment. Defaults to 0.
+    n_jobs (int, optional): The number of worker processes. Defaults to the number of CPUs (1 runs serially).
+
+    Returns:
+    numpy.ndarray: The out-of-fold probabilities.
+    """
+
+    z = np.asarray(z, dtype=float)
+    y = np.asarray(y)
+    folds = stratified_folds(y, n_splits, np.random.default_rng(random_state))
+    tasks = [(calibration, z[folds != k], y[folds != k], z[folds == k]) for k in range(n_splits)]
+
+    n_jobs = min(n_jobs or os.cpu_count(), n_splits)
+    if n_jobs == 1 or calibration is None:
+        results = [calibrate_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(calibrate_fold, *zip(*tasks)))
+
+    proba = np.empty(len(z))
+    for (k, result) in enumerate(results):
+        proba[folds == k] = result
+    return proba
+
+
+def evaluate(model, calibrations=(None, 'platt', 'va'), n_splits=5, n_replicates=2000, alpha=0.05, random_state=0,
+             n_jobs=None):
+    """
+    Compare calibration methods on the calibration set of a predictor by cross-validation and bootstrap.
+
+    For each calibration method, out-of-fold probabilities are calculated by stratified cross-validation on the
+    (imputed) calibration set, and AUC, Brier score, calibration slope and intercept are estimated with percentile
+    bootstrap confidence intervals. The bootstrap resamples the out-of-fold predictions; the calibration is not
+    refitted for each replicate.
+
+    Args:
+    model (PODPredictor): A predictor with a calibration dataset (i.e., with calibration or imputation).
+    calibrations (tuple, optional): The calibration methods to compare. Defaults to (None, 'platt', 'va').
+    n_splits (int, optional): The number of cross-validation folds. Defaults to 5.
+    n_replicates (int, optional): The number of bootstrap replicates. Defaults to 2000.
+    alpha (float, optional): One minus the confidence level of the intervals. Defaults to 0.05.
+    random_state (int, optional): The seed of the fold assignment and the bootstrap. Defaults to 0.
+    n_jobs (int, optional): The number of worker processes for the folds. Defaults to the number of CPUs.
+
+    Raises:
+    ValueError: If the predictor has no calibration dataset.
+
+    Returns:
+    pandas.DataFrame: The estimate and the lower and upper confidence bound of each metric and calibration method.
+    """
+
+    if not hasattr(model, 'y'):
+        raise ValueError(
+            "The evaluation requires a predictor with a calibration dataset (calibration or imputation).")
+
+    z = model.decision_function(model.X)
+    y = np.asarray(model.y)
+
+    results = []
+    for calibration in calibrations:
+        proba = cross_validated_proba(z, y, calibration, n_splits=n_splits, random_state=random_state, n_jobs=n_jobs)
+        result = bootstrap_metrics(proba, y, n_replicates=n_replicates, alpha=alpha, random_state=random_state)
+        results.append(result.assign(Calibration=str(calibration)).set_index('Calibration', append=True))
+
+    return pd.concat(results).reorder_levels(['Calibration', 'Metric'])
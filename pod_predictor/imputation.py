@@ -0,0 +1,731 @@
+import hashlib
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# The maximal number of feature differences held in memory at once by the brute force search
+BRUTE_FORCE_CHUNK = 1 << 20
+
+
+def _nearest(dist, rows, k):
+    """
+    Select the k nearest candidates of each row, breaking ties by the calibration row index.
+
+    Args:
+    dist (numpy.ndarray): The distances to the candidates of shape (n, m).
+    rows (numpy.ndarray): The calibration row indices of the candidates of shape (n, m).
+    k (int): The number of neighbours.
+
+    Returns:
+    numpy.ndarray: The distances of the neighbours of shape (n, k).
+    numpy.ndarray: The calibration row indices of the neighbours of shape (n, k).
+    """
+
+    nearest = np.lexsort((rows, dist), axis=1)[:, :k]
+    return np.take_along_axis(dist, nearest, axis=1), np.take_along_axis(rows, nearest, axis=1)
+
+
+class NearestNeighbourImputer:
+    def __init__(self, n_neighbors=5, brute_force_max=1000):
+        """
+        Initialize a new NearestNeighbourImputer instance.
+
+        This class imputes missing values with the mean of the nearest neighbours in the calibration set, using the
+        same NaN-aware euclidean distance as sklearn's KNNImputer (uniform weights). Instead of computing the distances
+        to every calibration row, the calibration rows are grouped by their missingness pattern. Within a group, the
+        distance only depends on the features observed in both rows, so the nearest neighbours are found with a
+        KD-tree on these features. The tree of each group on all its observed features is built at fit time; trees on
+        smaller feature subsets (needed for test rows with other missing features) are built on first use and reused.
+        Small groups are searched by brute force, which is faster than a tree for a few hundred rows.
+
+        Args:
+        n_neighbors (int, optional): The number of neighbouring rows to use for imputation. Defaults to 5.
+        brute_force_max (int, optional): The maximal group size searched by brute force. Defaults to 1000.
+        """
+
+        self.n_neighbors = n_neighbors
+        self.brute_force_max = brute_force_max
+
+    def fit(self, X):
+        """
+        Fit the imputer on the (normalized) calibration data.
+
+        The calibration rows are grouped by missingness pattern, and a KD-tree is built for the observed features of
+        each group.
+
+        Args:
+        X (numpy.ndarray): The calibration data of shape (n, n_features) with missing values as NaN.
+
+        Returns:
+        NearestNeighbourImputer: The fitted imputer.
+        """
+
+        self.fit_X = np.asarray(X, dtype=np.float64)
+        self.n_features = self.fit_X.shape[1]
+        self.trees = {}
+        self._group()
+        self._build_trees()
+
+        return self
+
+    def partial_fit(self, X_new, keep=None):
+        """
+        Add rows to the (normalized) calibration data of the fitted imputer.
+
+        The rows are regrouped by missingness pattern, which only needs a few array operations. The KD-trees of the
+        groups whose rows did not change are kept; the trees of the other groups are rebuilt.
+
+        Args:
+        X_new (numpy.ndarray): The new rows of shape (n, n_features) with missing values as NaN.
+        keep (int, optional): The number of most recent rows to keep (a sliding window). Older rows are removed.
+            Defaults to None (all rows are kept).
+
+        Returns:
+        NearestNeighbourImputer: The updated imputer.
+        """
+
+        X_new = np.asarray(X_new, dtype=np.float64).reshape(-1, self.n_features)
+        fit_X = np.concatenate([self.fit_X, X_new])
+        n_dropped = max(0, len(fit_X) - keep) if keep is not None else 0
+
+        # Missingness patterns of the added and removed rows
+        changed = {row.tobytes() for row in np.unique(~np.isnan(
+            np.concatenate([self.fit_X[:n_dropped], X_new])), axis=0)}
+        old_patterns, old_trees = self.patterns, self.trees
+
+        self.fit_X = fit_X[n_dropped:]
+        self._group()
+
+        self.trees = {}
+        group_index = {pattern.tobytes(): g for (g, pattern) in enumerate(self.patterns)}
+        for ((g, features), tree) in old_trees.items():
+            pattern = old_patterns[g].tobytes()
+            if pattern not in changed and pattern in group_index:
+                self.trees[(group_index[pattern], features)] = tree
+        self._build_trees()
+
+        return self
+
+    def _group(self):
+        """
+        Group the calibration rows by missingness pattern.
+
+        Returns:
+        None
+        """
+
+        mask = np.isnan(self.fit_X)
+
+        # Mean of the observed values (used if a row has no common observed feature with any donor)
+        counts = (~mask).sum(axis=0)
+        sums = np.where(mask, 0, self.fit_X).sum(axis=0)
+        self.col_means = np.divide(sums, counts, out=np.zeros(self.n_features), where=counts > 0)
+
+        # Calibration rows grouped by missingness pattern
+        self.patterns, self.group_ids = np.unique(~mask, axis=0, return_inverse=True)
+        self.group_ids = self.group_ids.ravel()
+        self.order = np.argsort(self.group_ids, kind='stable')
+        self.group_starts = np.searchsorted(self.group_ids[self.order], np.arange(len(self.patterns) + 1))
+
+    def _build_trees(self):
+        """
+        Build the KD-trees of the large groups on all their observed features (existing trees are reused).
+
+        Returns:
+        None
+        """
+
+        for g in range(len(self.patterns)):
+            if self.patterns[g].any() and len(self.group_rows(g)) > self.brute_force_max:
+                self.tree(g, self.patterns[g])
+
+    def group_rows(self, g):
+        """
+        Get the calibration row indices of a missingness pattern group.
+
+        Args:
+        g (int): The index of the group.
+
+        Returns:
+        numpy.ndarray: The row indices.
+        """
+
+        return self.order[self.group_starts[g]:self.group_starts[g + 1]]
+
+    def tree(self, g, features):
+        """
+        Get the KD-tree of a group on a subset of its observed features, building it on first use.
+
+        Args:
+        g (int): The index of the group.
+        features (numpy.ndarray): A boolean mask of the features.
+
+        Returns:
+        sklearn.neighbors.KDTree: The KD-tree.
+        """
+
+        key = (g, features.tobytes())
+        tree = self.trees.get(key)
+        if tree is None:
+            from sklearn.neighbors import KDTree  # Imported on first use (scoring small groups only needs numpy)
+            tree = KDTree(self.fit_X[np.ix_(self.group_rows(g), features)])
+            self.trees[key] = tree
+        return tree
+
+    def query(self, g, features, X, k):
+        """
+        Find the nearest neighbours of the given rows within a group on a subset of features.
+
+        Args:
+        g (int): The index of the group.
+        features (numpy.ndarray): A boolean mask of the features (all observed in the group and in the rows).
+        X (numpy.ndarray): The rows of shape (n, n_features).
+        k (int): The number of neighbours.
+
+        Returns:
+        numpy.ndarray: The squared euclidean distances on the features of shape (n, k).
+        numpy.ndarray: The calibration row indices of the neighbours of shape (n, k).
+        """
+
+        group_rows = self.group_rows(g)
+        X = X[:, features]
+
+        # The distances are summed from the exact differences, so that they (and the neighbours) of a row do not depend
+        # on the other rows of the batch. Ties are broken by the calibration row index.
+        if len(group_rows) > self.brute_force_max:
+            # The tree finds the distance of the k-th neighbour; all rows within it (including ties) are candidates
+            tree = self.tree(g, features)
+            kth = tree.query(X, k=k)[0][:, -1]
+            candidates = tree.query_radius(X, kth * (1 + 1e-9) + 1e-12)
+            counts = np.array([len(ix) for ix in candidates])
+            (receivers, ix) = (np.repeat(np.arange(len(X)), counts), np.concatenate(candidates))
+            columns = np.arange(len(ix)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+            dist = np.full((len(X), counts.max()), np.inf)
+            rows = np.full(dist.shape, len(self.fit_X))
+            dist[receivers, columns] = ((X[receivers] - self.fit_X[group_rows[ix]][:, features]) ** 2).sum(axis=1)
+            rows[receivers, columns] = group_rows[ix]
+            return _nearest(dist, rows, k)
+
+        F = self.fit_X[np.ix_(group_rows, features)]
+        dist = np.empty((len(X), len(F)))
+        chunksize = max(1, BRUTE_FORCE_CHUNK // max(1, F.size))
+        for start in range(0, len(X), chunksize):
+            diff = X[start:start + chunksize, None, :] - F[None, :, :]
+            np.square(diff, out=diff)
+            diff.sum(axis=2, out=dist[start:start + chunksize])
+        return _nearest(dist, np.broadcast_to(group_rows, dist.shape), k)
+
+    def transform(self, X):
+        """
+        Impute missing values in the given (normalized) data.
+
+        Args:
+        X (numpy.ndarray): The data of shape (n, n_features) with missing values as NaN.
+
+        Returns:
+        numpy.ndarray: The data with missing values imputed.
+        """
+
+        X = np.array(X, dtype=np.float64)
+        mask = np.isnan(X)
+        rows = np.flatnonzero(mask.any(axis=1))
+        if not len(rows):
+            return X
+
+        test_patterns, inverse = np.unique(~mask[rows], axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for (t, observed) in enumerate(test_patterns):
+            receivers = rows[inverse == t]
+            X[np.ix_(receivers, ~observed)] = self.impute_pattern(X[receivers], observed)
+
+        return X
+
+    def impute_pattern(self, X, observed):
+        """
+        Impute the missing values of rows sharing the same missingness pattern.
+
+        For each group of calibration rows, the nearest neighbours on the commonly observed features are queried. For
+        each missing feature, the nearest neighbours among all groups observing that feature are selected, and their
+        values are averaged.
+
+        Args:
+        X (numpy.ndarray): The rows of shape (n, n_features).
+        observed (numpy.ndarray): A boolean mask of the features observed in these rows.
+
+        Returns:
+        numpy.ndarray: The imputed values of shape (n, n_missing).
+        """
+
+        missing = np.flatnonzero(~observed)
+        dist, donors, groups = [], [], []
+        for (g, pattern) in enumerate(self.patterns):
+            common = observed & pattern
+            n_common = common.sum()
+            if n_common == 0 or not pattern[missing].any():
+                continue  # No defined distance or no donors for the missing features
+
+            k = min(self.n_neighbors, len(self.group_rows(g)))
+            d, ix = self.query(g, common, X, k)
+            dist.append(d * (self.n_features / n_common))
+            donors.append(ix)
+            groups.append(np.full(k, g))
+
+        values = np.tile(self.col_means[missing], (len(X), 1))
+        if not dist:
+            return values
+
+        dist, donors, groups = np.hstack(dist), np.hstack(donors), np.concatenate(groups)
+        for (i, col) in enumerate(missing):
+            candidates = self.patterns[groups, col]
+            if not candidates.any():
+                continue
+            dist_col = dist[:, candidates]
+            donors_col = donors[:, candidates]
+            k = min(self.n_neighbors, dist_col.shape[1])
+            values[:, i] = self.fit_X[_nearest(dist_col, donors_col, k)[1], col].mean(axis=1)
+
+        return values
+
+
+# Fitted IterativeImputer states, keyed by the content hash of the calibration data and the parameters, so that
+# predictors built on the same calibration data (e.g., with different calibration methods) fit the models only once.
+# The cache is bounded (least recently used states are evicted), since each partial_fit adds a state.
+MAX_FITTED_STATES = 4
+_fitted_states = OrderedDict()
+_fitted_lock = threading.Lock()
+
+
+def _fit_feature_model(X, j, seed, n_estimators, max_features, min_samples_leaf):
+    """
+    Fit the random forest predicting one feature from the other features and flatten its trees into arrays.
+
+    This function runs in worker processes, so it only uses its arguments.
+
+    Args:
+    X (numpy.ndarray): The (current) imputed calibration rows of shape (n, n_features) in which the feature is observed.
+    j (int): The index of the predicted feature.
+    seed (int): The seed of the forest.
+    n_estimators (int): The number of trees.
+    max_features (float): The fraction of features considered at each split.
+    min_samples_leaf (int): The minimal number of rows per leaf.
+
+    Returns:
+    tuple: The trees (see _flatten_trees) and the out-of-bag residuals of the observed values.
+    """
+
+    from sklearn.ensemble import RandomForestRegressor
+
+    (X_other, y) = (np.delete(X, j, axis=1), X[:, j])
+    forest = RandomForestRegressor(n_estimators=n_estimators, max_features=max_features,
+                                   min_samples_leaf=min_samples_leaf, bootstrap=True, oob_score=True,
+                                   random_state=seed, n_jobs=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # Rows without out-of-bag trees (their residuals are skipped)
+        forest.fit(X_other, y)
+    residuals = y - forest.oob_prediction_
+
+    return _flatten_trees(forest, j), residuals[np.isfinite(residuals)]
+
+
+def _flatten_trees(forest, j):
+    """
+    Flatten the trees of a fitted forest into node arrays.
+
+    The feature indices refer to all features (the predicted feature j is skipped). Leaves point to themselves, so that
+    a fixed number of steps (the maximal depth) moves every row to its leaf.
+
+    Args:
+    forest (sklearn.ensemble.RandomForestRegressor): The fitted forest.
+    j (int): The index of the predicted feature.
+
+    Returns:
+    tuple: The root node of each tree, and the split feature, threshold, left child, right child and value of each
+           node, and the maximal depth.
+    """
+
+    roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+    offset, depth = 0, 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        feature = np.where(leaf, 0, tree.feature)
+        roots.append(offset)
+        features.append(feature + (feature >= j))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+        values.append(tree.value[:, 0, 0])
+        offset += tree.node_count
+        depth = max(depth, tree.max_depth)
+
+    return (np.array(roots, dtype=np.intp), np.concatenate(features).astype(np.intp), np.concatenate(thresholds),
+            np.concatenate(lefts).astype(np.intp), np.concatenate(rights).astype(np.intp), np.concatenate(values),
+            depth)
+
+
+def _fit_feature_models(tasks, n_jobs):
+    """
+    Fit the random forests of several (draw, feature) pairs, in parallel worker processes if n_jobs > 1.
+
+    Args:
+    tasks (list): The arguments of _fit_feature_model per pair.
+    n_jobs (int): The number of worker processes.
+
+    Returns:
+    list: The flattened forests and out-of-bag residuals, in the order of the tasks.
+    """
+
+    if n_jobs <= 1 or len(tasks) <= 1:
+        return [_fit_feature_model(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as executor:
+        return list(executor.map(_fit_feature_model, *zip(*tasks)))
+
+
+def _stack_forests(forests):
+    """
+    Stack the flattened forests of all draws of a feature into one set of node arrays.
+
+    Args:
+    forests (list): The flattened forests (see _flatten_trees), one per draw, with the same number of trees.
+
+    Returns:
+    tuple: The root nodes of shape (n_imputations, n_estimators), the node arrays of all draws, and the maximal depth.
+    """
+
+    roots, offset = [], 0
+    for forest in forests:
+        roots.append(forest[0] + offset)
+        offset += len(forest[1])
+    return (np.stack(roots),) + tuple(np.concatenate([forest[k] for forest in forests]) for k in range(1, 6)) + (
+        max(forest[6] for forest in forests),)
+
+
+def _predict_forests(forests, X):
+    """
+    Predict a feature with the stacked forests of all draws (mean of the trees of each draw).
+
+    All (draw, row, tree) triples descend the trees together, one level per step. As in sklearn, the values are
+    compared with the thresholds in single precision.
+
+    Args:
+    forests (tuple): The stacked forests of the feature (see _stack_forests).
+    X (numpy.ndarray): The current imputed rows of each draw of shape (n_imputations, n, n_features).
+
+    Returns:
+    numpy.ndarray: The predictions of shape (n_imputations, n).
+    """
+
+    (roots, feature, threshold, left, right, value, depth) = forests
+    X = X.astype(np.float32).astype(np.float64)
+    (n_imputations, n) = X.shape[:2]
+    node = np.broadcast_to(roots[:, None, :], (n_imputations, n, roots.shape[1])).copy()
+    draw, row = np.arange(n_imputations)[:, None, None], np.arange(n)[None, :, None]
+    for _ in range(depth):
+        node = np.where(X[draw, row, feature[node]] <= threshold[node], left[node], right[node])
+    return value[node].mean(axis=2)
+
+
+def _row_hashes(X):
+    """
+    Calculate a 64-bit hash of each row from the bits of its values (splitmix64).
+
+    Args:
+    X (numpy.ndarray): The data of shape (n, n_features) (NaN entries should be canonical).
+
+    Returns:
+    numpy.ndarray: The uint64 hashes of shape (n,).
+    """
+
+    bits = np.ascontiguousarray(X, dtype=np.float64).view(np.uint64)
+    h = np.full(len(X), 0x9E3779B97F4A7C15, dtype=np.uint64)
+    for j in range(bits.shape[1]):
+        h = _splitmix(h ^ bits[:, j])
+    return h
+
+
+def _splitmix(h):
+    with np.errstate(over='ignore'):
+        h = h + np.uint64(0x9E3779B97F4A7C15)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _uniform(hashes, j, iteration, n_imputations):
+    """
+    Derive uniform random numbers in [0, 1) from row hashes for every draw, given a feature and an iteration.
+
+    Args:
+    hashes (numpy.ndarray): The uint64 row hashes of shape (n,).
+    j (int): The feature.
+    iteration (int): The iteration.
+    n_imputations (int): The number of draws.
+
+    Returns:
+    numpy.ndarray: The random numbers of shape (n_imputations, n).
+    """
+
+    streams = np.arange(n_imputations, dtype=np.uint64) * np.uint64(1_000_003) + np.uint64((j * 1031 + iteration) + 1)
+    h = _splitmix(hashes[None, :] ^ _splitmix(streams)[:, None])
+    return (h >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class IterativeImputer:
+    def __init__(self, n_imputations=5, max_iter=5, n_estimators=25, max_features=0.6, min_samples_leaf=3, tol=1e-3,
+                 random_state=0, n_jobs=1):
+        """
+        Initialize a new IterativeImputer instance.
+
+        This class imputes missing values several times (multiple imputation) with random forests predicting each
+        feature from the other features, iterated until the imputed values of the calibration set converge (similar
+        to MissForest). Each imputation draw has its own chain of forests, fitted with different seeds, and adds noise
+        to the predictions (a resampled out-of-bag residual, or a Bernoulli draw for binary features), so that the
+        spread of the draws reflects the uncertainty of the imputed values.
+
+        In each iteration, the forests of all draws and features are fitted on the imputed data of the previous
+        iteration, so that they are independent of each other and can be fitted in parallel worker processes. Forests of
+        features without missing values in the calibration set are only fitted once, on the final imputations (they
+        are needed for test data). The fitted trees are flattened into node arrays, so that the forests of all draws
+        predict a feature in one vectorized descent (without sklearn), and cached per calibration data and parameters.
+
+        The noise of a test row is derived from a hash of its values, so that the imputations of a row do not depend on
+        the other rows of the batch.
+
+        Args:
+        n_imputations (int, optional): The number of imputation draws. Defaults to 5.
+        max_iter (int, optional): The maximal number of iterations. Defaults to 5.
+        n_estimators (int, optional): The number of trees per forest (i.e., per draw and feature). Defaults to 25.
+        max_features (float, optional): The fraction of features considered at each split. Defaults to 0.6.
+        min_samples_leaf (int, optional): The minimal number of rows per leaf. Defaults to 3.
+        tol (float, optional): The relative change of the predicted calibration values below which the iterations
+            stop. Defaults to 1e-3.
+        random_state (int, optional): The seed of the forests. Defaults to 0.
+        n_jobs (int, optional): The number of worker processes fitting the forests (None for the number of CPUs).
+            Defaults to 1 (the forests are fitted in the calling process).
+        """
+
+        self.n_imputations = n_imputations
+        self.max_iter = max_iter
+        self.n_estimators = n_estimators
+        self.max_features = max_features
+        self.min_samples_leaf = min_samples_leaf
+        self.tol = tol
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def fit(self, X):
+        """
+        Fit the forests of all draws and features on the (normalized) calibration data.
+
+        Args:
+        X (numpy.ndarray): The calibration data of shape (n, n_features) with missing values as NaN.
+
+        Returns:
+        IterativeImputer: The fitted imputer.
+        """
+
+        self.fit_X = np.asarray(X, dtype=np.float64)
+        self.n_features = self.fit_X.shape[1]
+
+        key = (hashlib.sha256(np.ascontiguousarray(self.fit_X).tobytes()).hexdigest(), self.fit_X.shape,
+               self.n_imputations, self.max_iter, self.n_estimators, self.max_features, self.min_samples_leaf,
+               self.tol, self.random_state)
+        with _fitted_lock:
+            state = _fitted_states.get(key)
+            if state is not None:
+                _fitted_states.move_to_end(key)
+        if state is None:
+            state = self._fit()
+            with _fitted_lock:
+                _fitted_states[key] = state
+                while len(_fitted_states) > MAX_FITTED_STATES:
+                    _fitted_states.popitem(last=False)
+        (self.col_means, self.binary, self.forests, self.residuals, self.n_iter) = state
+
+        return self
+
+    def partial_fit(self, X_new, keep=None):
+        """
+        Add rows to the (normalized) calibration data and fit the forests again.
+
+        Args:
+        X_new (numpy.ndarray): The new rows of shape (n, n_features) with missing values as NaN.
+        keep (int, optional): The number of most recent rows to keep (a sliding window). Older rows are removed.
+            Defaults to None (all rows are kept).
+
+        Returns:
+        IterativeImputer: The updated imputer.
+        """
+
+        X_new = np.asarray(X_new, dtype=np.float64).reshape(-1, self.n_features)
+        fit_X = np.concatenate([self.fit_X, X_new])
+        n_dropped = max(0, len(fit_X) - keep) if keep is not None else 0
+        return self.fit(fit_X[n_dropped:])
+
+    def _fit(self):
+        """
+        Run the imputation chains of all draws on the calibration data.
+
+        Returns:
+        tuple: The column means, the binary feature mask, the stacked forests and the out-of-bag residuals of each
+               feature, and the number of iterations.
+        """
+
+        X = self.fit_X
+        mask = np.isnan(X)
+        counts = (~mask).sum(axis=0)
+        self.col_means = np.divide(np.where(mask, 0, X).sum(axis=0), counts, out=np.zeros(self.n_features),
+                                   where=counts > 0)
+        self.binary = np.array([np.isin(X[~mask[:, j], j], (0.0, 1.0)).all() for j in range(self.n_features)])
+        self.forests, self.residuals = [None] * self.n_features, [None] * self.n_features
+        incomplete = np.flatnonzero(mask.any(axis=0))
+        hashes = _row_hashes(np.where(mask, np.nan, X))
+        n_jobs = self.n_jobs or os.cpu_count()
+
+        imputed = np.repeat(np.where(mask, self.col_means, X)[None], self.n_imputations, axis=0)
+
+        def fit_features(features, iteration):
+            # The forest of a feature is fitted on the rows in which it is observed
+            tasks = [(imputed[m][~mask[:, j]], j, self._seed(m, j, iteration), self.n_estimators, self.max_features,
+                      self.min_samples_leaf) for j in features for m in range(self.n_imputations)]
+            fitted = _fit_feature_models(tasks, n_jobs)
+            for (i, j) in enumerate(features):
+                draws = fitted[i * self.n_imputations:(i + 1) * self.n_imputations]
+                self.forests[j] = _stack_forests([forest for (forest, _) in draws])
+                self.residuals[j] = [residuals for (_, residuals) in draws]
+
+        self.n_iter = 0
+        predictions = {}
+        while len(incomplete) and self.n_iter < self.max_iter:
+            fit_features(incomplete, self.n_iter)
+
+            # Jacobi update of the missing calibration values of all features
+            previous, change, scale = imputed.copy(), 0.0, 0.0
+            for j in incomplete:
+                rows = mask[:, j]
+                prediction = _predict_forests(self.forests[j], previous[:, rows])
+                imputed[:, rows, j] = self._add_noise(j, self.n_iter, prediction, hashes[rows])
+                if j in predictions:
+                    change += ((prediction - predictions[j]) ** 2).sum()
+                scale += (prediction ** 2).sum()
+                predictions[j] = prediction
+            self.n_iter += 1
+
+            if self.n_iter > 1 and change <= self.tol * scale:
+                break
+
+        # The forests of the complete features are only needed for test data and fitted on the final imputations
+        fit_features(np.setdiff1d(np.arange(self.n_features), incomplete), self.n_iter)
+
+        return self.col_means, self.binary, self.forests, self.residuals, self.n_iter
+
+    def _seed(self, m, j, iteration):
+        return (self.random_state * 1_000_003 + (m * self.n_features + j) * 101 + iteration) % (2 ** 32)
+
+    def _add_noise(self, j, iteration, prediction, hashes):
+        """
+        Draw imputed values of a feature from the predictions of the forests of all draws.
+
+        Numeric features get a resampled out-of-bag residual of the forest of the draw added; binary features are drawn
+        from a Bernoulli distribution with the predicted probability.
+
+        Args:
+        j (int): The feature.
+        iteration (int): The iteration.
+        prediction (numpy.ndarray): The predictions of shape (n_imputations, n).
+        hashes (numpy.ndarray): The hashes of the rows of shape (n,).
+
+        Returns:
+        numpy.ndarray: The imputed values of shape (n_imputations, n).
+        """
+
+        u = _uniform(hashes, j, iteration, self.n_imputations)
+        if self.binary[j]:
+            return (u < np.clip(prediction, 0, 1)).astype(np.float64)
+
+        values = prediction.copy()
+        for (m, residuals) in enumerate(self.residuals[j]):
+            if len(residuals):
+                values[m] += residuals[np.minimum((u[m] * len(residuals)).astype(np.intp), len(residuals) - 1)]
+        return values
+
+    def transform_draws(self, X, noise=True):
+        """
+        Impute missing values in the given (normalized) data once per draw.
+
+        Rows without missing values are the same in all draws. The missing values of the other rows are iterated with
+        the forests of each draw, as on the calibration data. The number of iterations of a row only depends on its own
+        missingness (a single iteration if it has one missing value), so that its draws do not depend on the other rows
+        of the batch.
+
+        Args:
+        X (numpy.ndarray): The data of shape (n, n_features) with missing values as NaN.
+        noise (bool, optional): Whether to add noise to the predictions of the forests (see _add_noise). Defaults to
+            True.
+
+        Returns:
+        numpy.ndarray: The imputed data of shape (n_imputations, n, n_features).
+        """
+
+        X = np.array(X, dtype=np.float64).reshape(-1, self.n_features)
+        mask = np.isnan(X)
+        X[mask] = np.nan  # Canonical NaN for the row hashes
+        draws = np.repeat(X[None], self.n_imputations, axis=0)
+        rows = np.flatnonzero(mask.any(axis=1))
+        if not len(rows):
+            return draws
+
+        mask, hashes = mask[rows], _row_hashes(X[rows])
+        features = np.flatnonzero(mask.any(axis=0))
+        n_iter = np.where(mask.sum(axis=1) == 1, 1, max(self.n_iter, 1))
+        current = np.repeat(np.where(mask, self.col_means, X[rows])[None], self.n_imputations, axis=0)
+
+        for iteration in range(n_iter.max()):
+            previous = current.copy()
+            for j in features:
+                receivers = mask[:, j] & (n_iter > iteration)
+                if not receivers.any():
+                    continue
+                prediction = _predict_forests(self.forests[j], previous[:, receivers])
+                current[:, receivers, j] = (self._add_noise(j, iteration, prediction, hashes[receivers]) if noise
+                                            else prediction)
+
+        draws[:, rows] = current
+        return draws
+
+    def transform(self, X):
+        """
+        Impute missing values in the given (normalized) data with the mean prediction of the forests of all draws
+        (without noise, i.e. the best single imputation).
+
+        Args:
+        X (numpy.ndarray): The data of shape (n, n_features) with missing values as NaN.
+
+        Returns:
+        numpy.ndarray: The data with missing values imputed.
+        """
+
+        return self.pool(X, self.transform_draws(X, noise=False))
+
+    @staticmethod
+    def pool(X, draws):
+        """
+        Replace the missing values of the data by the mean of their draws (observed values are kept unchanged).
+
+        Args:
+        X (numpy.ndarray): The data of shape (n, n_features) with missing values as NaN.
+        draws (numpy.ndarray): The imputed data of shape (n_imputations, n, n_features).
+
+        Returns:
+        numpy.ndarray: The data with missing values imputed.
+        """
+
+        X = np.array(X, dtype=np.float64).reshape(-1, draws.shape[2])
+        mask = np.isnan(X)
+        X[mask] = draws[:, mask].mean(axis=0)
+        return X
@@ -1,15 +1,19 @@
+import os
 import numpy as np
 import pandas as pd
-from pod_predictor import COEFFICIENTS, DEFAULT_VALUES, NORMALIZATION_MEAN_SD
-from pod_predictor.utils import load_data, preprocess
-from sklearn.impute import KNNImputer
-from sklearn.linear_model import LogisticRegression
-from venn_abers import VennAbersCalibrator
+from pod_predictor import COEFFICIENTS, DEFAULT_VALUES, NORMALIZATION_MEAN_SD, core
+from pod_predictor.cache import ResultCache
+from pod_predictor.calibration import VennAbersIndex
+from pod_predictor.imputation import IterativeImputer, NearestNeighbourImputer
+from pod_predictor.instrumentation import Instrumentation, timed
+from pod_predictor.schema import SCHEMA
+from pod_predictor.utils import PreparedBatch, load_data, load_input, preprocess, variant_grid
 import warnings
 
 
 class PODPredictor:
-    def __init__(self, path_to_file='./data/calibration.csv', calibration=None, imputation=None):
+    def __init__(self, path_to_file='./data/calibration.csv', calibration=None, imputation=None, cache_size=None,
+                 cache_ttl=None):
         """
         Initialize a new PODPredictor instance.
 
@@ -20,12 +24,30 @@ class PODPredictor:
         Args:
         path_to_file (str, optional): The file path of the calibration dataset. Defaults to './data/calibration.csv'.
         calibration (str, optional): The calibration method to use. Can be None, 'platt', or 'va'. Defaults to None.
-        imputation (str, optional): The imputation method to use. Can be None or 'knn'. Defaults to None.
+        imputation (str, optional): The imputation method to use. Can be None, 'knn', or 'iterative' (multiple
+            imputation, see IterativeImputer). Defaults to None.
+        cache_size (int, optional): The maximal number of patients whose results of predict_proba and get_report are
+            cached (see ResultCache). Defaults to None (no cache).
+        cache_ttl (float, optional): The time to live of a cached result (in seconds). Defaults to None (no expiry).
         """
 
+        # The calibration version is part of the cache keys and is incremented whenever the calibration changes
+        self.cache = ResultCache(cache_size, cache_ttl) if cache_size else None
+        self.calibration_version = 0
+        # Per-stage timers and counters, disabled by default (see Instrumentation)
+        self.instrumentation = Instrumentation()
+
         self.coefficients = np.array(list(COEFFICIENTS.values()))
         self.default_values = DEFAULT_VALUES
         self.normalization = NORMALIZATION_MEAN_SD
+        self.features = pd.Index(self.default_values.keys())
+        self.default_array = core.DEFAULT_ARRAY.copy()
+        self.normalization_mean = core.NORMALIZATION_MEAN.copy()
+        self.normalization_sd = core.NORMALIZATION_SD.copy()
+        self.normalized_default_array = core.NORMALIZED_DEFAULT_ARRAY.copy()
+        self.normalized_default_values = {
+            key: (value - self.normalization[key][0]) / self.normalization[key][1] if key in self.normalization else value
+            for (key, value) in self.default_values.items()}
 
         if calibration or imputation:
 
@@ -43,14 +65,18 @@ class PODPredictor:
 
             self.X = self.data.drop(['Delirium'], axis=1)
             self.y = self.data['Delirium'].values
+            self.sample_weight = np.ones(len(self.y))
 
             # Normalization and Imputation
             if imputation is None:
                 self.imputer = None
             elif imputation == 'knn':
-                self.imputer = KNNImputer(n_neighbors=5)
-                self.imputer.fit(self.normalize(self.X))
-            # TO DO: Add more imputation methods (e.g. MissForest)
+                self.imputer = NearestNeighbourImputer(n_neighbors=5)
+                self.imputer.fit(self.normalize(self.X).to_numpy())
+            elif imputation == 'iterative':
+                # Multiple imputation: predict_proba and get_report propagate the draws through the calibration
+                self.imputer = IterativeImputer()
+                self.imputer.fit(self.normalize(self.X).to_numpy())
             else:
                 warnings.warn(
                     f"Invalid imputation value '{imputation}'. Proceeding with default None", UserWarning)
@@ -62,14 +88,16 @@ class PODPredictor:
             if calibration is None:
                 self.calibrator = None
             elif calibration == 'platt':
+                # sklearn is only imported if Platt scaling is selected
+                from sklearn.linear_model import LogisticRegression
                 self.calibrator = LogisticRegression()
                 self.calibrator.fit(self.decision_function(
                     self.X).reshape(-1, 1), self.y)
             elif calibration == 'va':
-                self.calibrator = VennAbersCalibrator()
-                # VennAbersCalibrator class from venn_abers (MIT license)
-                # Source: https://github.com/ip200/venn-abers
-                # Copyright (c) 2023 Ivan Petej
+                # The Venn-ABERS index is precomputed once from the calibration set. The scores of the calibration
+                # cases are kept, so that update removes cases from the index by exactly the scores they were added with
+                self.scores = self.naive_proba(self.X)[:, 1]
+                self.calibrator = VennAbersIndex(np.column_stack((1 - self.scores, self.scores)), self.y)
             else:
                 warnings.warn(
                     f"Invalid calibration value '{calibration}'. Proceeding with default None", UserWarning)
@@ -79,24 +107,33 @@ class PODPredictor:
             self.imputer = None
             self.calibrator = None
 
+    @timed('preprocess_input')
     def preprocess_input(self, X_test):
         """
         Preprocess the given input data for prediction.
 
-        The method checks the input type and ensures it has the correct dimensions, format, and keys.
+        The method checks the input type and ensures it has the correct dimensions, format, and keys. A file path is
+        loaded with load_input (CSV, JSON, Parquet, Arrow IPC or NumPy, reading only the feature columns). The values
+        are validated and coerced to float64 with the compiled schema (see schema.Schema), which reports all invalid
+        values at once.
 
         Args:
-        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data to preprocess.
+        X_test (numpy.ndarray, dict, pandas.DataFrame, or str): The input data to preprocess, or the path of a file
+            containing it.
 
         Raises:
-        TypeError: If the input is not a numpy array, pandas DataFrame, or a dictionary.
+        TypeError: If the input is not a numpy array, pandas DataFrame, dictionary, or file path.
         ValueError: If the input is a numpy array with incorrect dimensions.
-        KeyError: If a key is not found in the JSON template for the data.
+        KeyError: If keys are not found in the JSON template for the data, or features are missing.
+        SchemaError: If values are not numbers (or yes/no for binary features) or out of range (a ValueError).
 
         Returns:
         pandas.DataFrame: The preprocessed input data with the correct format, dimensions, and keys.
         """
 
+        if isinstance(X_test, (str, os.PathLike)):
+            X_test = load_input(X_test)
+
         if isinstance(X_test, np.ndarray):
             X_test = X_test.reshape(
                 1, -1) if len(X_test.shape) == 1 else X_test
@@ -111,66 +148,202 @@ class PODPredictor:
 
         if not isinstance(X_test, pd.DataFrame):
             raise TypeError(
-                f"Expected a np.array, pd.DataFrame or dictionary as input, but got {type(X_test).__name__} instead.")
+                f"Expected a np.array, pd.DataFrame, dictionary or file path as input, but got {type(X_test).__name__} "
+                f"instead.")
 
-        for key in X_test.columns:
-            if key not in self.default_values.keys():
-                raise KeyError(
-                    f"Key '{key}' not found in Features. Use keys in data/JSON_template.json.")
+        # Check keys and values, reorder DataFrame
+        X_test = SCHEMA.validate(X_test)
 
-        try:
-            # Check and reorder DataFrame
-            X_test = X_test[list(self.default_values.keys())]
-        except KeyError as e:
-            key = e.args[0].strip("'['] not in index")
-            raise KeyError(
-                f"Key '{key}' not found in Features. Use keys in data/JSON_template.json.")
+        if self.instrumentation.enabled:
+            self.instrumentation.count('preprocessed_rows', len(X_test))
+            self.instrumentation.count('missing_values', X_test.isna().to_numpy().sum())
 
         return X_test
 
-    def normalize(self, X):
+    @timed('normalize')
+    def normalize(self, X, copy=True):
         """
         Normalize data columns using mean and standard deviation.
 
+        The normalization is applied to all columns at once as a broadcasted array operation. Binary columns are left
+        unchanged.
+
         Args:
-        X (pandas.DataFrame): DataFrame to be normalized.
+        X (pandas.DataFrame or numpy.ndarray): Data to be normalized. The columns of a numpy array must be in the order
+            of COEFFICIENTS.
+        copy (bool, optional): Whether to normalize a copy of the data. If False, a float64 numpy array is normalized
+            in place. Defaults to True.
 
         Returns:
-        pandas.DataFrame: Normalized data.
+        pandas.DataFrame or numpy.ndarray: Normalized data.
         """
 
-        X = X.copy()
-        for (key, value) in self.normalization.items():
-            X[key] = X[key].apply(lambda x: (x - value[0]) / value[1])
+        if isinstance(X, np.ndarray):
+            if copy or X.dtype != np.float64:
+                X = X.astype(np.float64)
+            np.subtract(X, self.normalization_mean, out=X)
+            np.divide(X, self.normalization_sd, out=X)
+            return X
 
-        return X
+        if X.columns.equals(self.features):
+            mean, sd = self.normalization_mean, self.normalization_sd
+        else:
+            indexer = self.features.get_indexer(X.columns)
+            mean, sd = self.normalization_mean[indexer], self.normalization_sd[indexer]
 
-    def impute(self, X):
+        values = X.to_numpy(dtype=np.float64, copy=True)
+        np.subtract(values, mean, out=values)
+        np.divide(values, sd, out=values)
+
+        return pd.DataFrame(data=values, index=X.index, columns=X.columns)
+
+    @timed('impute')
+    def impute(self, X, normalized=False):
         """
         Impute missing values in the given input data.
 
+        Missing values are replaced by the default values if no imputer is selected. The returned data is normalized.
+
         Args:
         X (pandas.DataFrame): The input data to impute missing values for.
+        normalized (bool, optional): Whether the input data is already normalized. Defaults to False.
 
         Returns:
-        pandas.DataFrame: The input data with missing values imputed.
+        pandas.DataFrame: The normalized input data with missing values imputed.
         """
 
-        if self.imputer is None:
-            for (key, value) in self.default_values.items():
-                X[key] = X[key].fillna(value)
+        if not normalized:
             X = self.normalize(X)
 
+        if self.instrumentation.enabled:
+            self.instrumentation.count('imputed_values', X.isna().to_numpy().sum())
+
+        if self.imputer is None:
+            X = X.fillna(self.normalized_default_values)
+
         else:
-            X = self.normalize(X)
+            self.instrumentation.count('imputer_calls')
             X = pd.DataFrame(data=self.imputer.transform(
-                X), columns=X.columns)
+                X.to_numpy()), columns=X.columns)
 
         return X
 
+    def prepare(self, X_test, validated=False):
+        """
+        Prepare the given input data once for repeated use in the prediction methods.
+
+        The input is validated, normalized and imputed a single time. The returned batch can be passed to
+        decision_function, feature_importance, naive_proba, predict, predict_proba and get_report in place of the raw
+        input data.
+
+        Args:
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data to prepare.
+        validated (bool, optional): Whether the input data was already preprocessed (see preprocess_input), so that
+            it is not validated again. Defaults to False.
+
+        Returns:
+        PreparedBatch: The normalized input data, with and without imputed missing values.
+        """
+
+        if isinstance(X_test, PreparedBatch):
+            return X_test
+
+        X = X_test if validated else self.preprocess_input(X_test)
+        normalized = self.normalize(X)
+        imputed = self.impute(normalized, normalized=True)
+        draws = self.impute_draws(normalized) if isinstance(self.imputer, IterativeImputer) else None
+
+        return PreparedBatch(normalized, imputed, draws)
+
+    @timed('impute_draws')
+    def impute_draws(self, X):
+        """
+        Impute missing values in the given normalized input data once per draw of the multiple imputation.
+
+        Args:
+        X (pandas.DataFrame): The normalized input data to impute missing values for.
+
+        Returns:
+        numpy.ndarray: The imputed data of shape (n_imputations, n, 15).
+        """
+
+        self.instrumentation.count('imputer_calls')
+        return self.imputer.transform_draws(X.to_numpy())
+
+    def calibrate(self, X):
+        """
+        Predict the calibrated probability of delirium for normalized input data with imputed values.
+
+        Args:
+        X (pandas.DataFrame): The normalized input data with missing values imputed.
+
+        Returns:
+        numpy.ndarray: The probabilities of delirium.
+        numpy.ndarray: The lower and upper probability bounds of Venn-ABERS of shape (n, 2) (None for other calibration
+                       methods).
+        """
+
+        X = PreparedBatch(None, X)
+
+        if isinstance(self.calibrator, VennAbersIndex):
+            probas = self.naive_proba(X)
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                (probas, p0_p1) = self.calibrator.predict_proba(probas, p0_p1_output=True)
+            return probas[:, 1], p0_p1
+
+        if self.calibrator is not None:
+            z = self.decision_function(X).reshape(-1, 1)
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                return self.calibrator.predict_proba(z)[:, 1], None
+
+        return self.naive_proba(X)[:, 1], None
+
+    def pool_draws(self, X_test):
+        """
+        Predict the probability of delirium with the draws of a multiple imputation, propagated through the
+        calibration in one call.
+
+        The rows without missing values and the imputed rows of all draws are stacked and calibrated together. The
+        probability of a row with missing values is the mean over its draws, and its interval covers the Venn-ABERS
+        intervals of all draws (or the range of the probabilities of the draws for other calibration methods), so that
+        the uncertainty of the imputation widens the interval. Rows without missing values get the same results as
+        without multiple imputation.
+
+        Args:
+        X_test (PreparedBatch): The prepared input data with imputation draws (see prepare).
+
+        Returns:
+        numpy.ndarray: The probabilities of delirium.
+        numpy.ndarray: The lower bounds of the intervals (NaN if not available).
+        numpy.ndarray: The upper bounds of the intervals (NaN if not available).
+        """
+
+        draws = X_test.draws
+        (n_imputations, n, n_features) = draws.shape
+        missing = X_test.normalized.isna().to_numpy().any(axis=1)
+        (complete, incomplete) = (np.flatnonzero(~missing), np.flatnonzero(missing))
+
+        stacked = np.vstack([X_test.imputed.to_numpy()[complete], draws[:, incomplete].reshape(-1, n_features)])
+        (probas, p0_p1) = self.calibrate(pd.DataFrame(stacked, columns=self.features))
+        draw_probas = probas[len(complete):].reshape(n_imputations, len(incomplete))
+
+        proba, lower, upper = np.empty(n), np.full(n, np.nan), np.full(n, np.nan)
+        proba[complete], proba[incomplete] = probas[:len(complete)], draw_probas.mean(axis=0)
+        if p0_p1 is not None:
+            draw_p0_p1 = p0_p1[len(complete):].reshape(n_imputations, len(incomplete), 2)
+            lower[complete], upper[complete] = p0_p1[:len(complete), 0], p0_p1[:len(complete), 1]
+            lower[incomplete], upper[incomplete] = draw_p0_p1[:, :, 0].min(axis=0), draw_p0_p1[:, :, 1].max(axis=0)
+        else:
+            lower[incomplete], upper[incomplete] = draw_probas.min(axis=0), draw_probas.max(axis=0)
+
+        return proba, lower, upper
+
     # The decorator preprocesses the input data, unless it is the (already preprocessed) calibration data 'self.X'.
     # This distinction allows testing the uncalibrated model on the calibration data.
     @preprocess
+    @timed('decision_function')
     def decision_function(self, X):
         """
         Calculate the decision function for the given input data.
@@ -182,12 +355,12 @@ class PODPredictor:
         numpy.ndarray: The decision function values.
         """
 
-        z = np.dot(X, self.coefficients.T) - 0.61
-        return z
+        return core.decision_function(X, self.coefficients)
 
     # The decorator preprocesses the input data, unless it is the (already preprocessed) calibration data 'self.X'.
     # For the following function, the impute process is excluded.
     @preprocess
+    @timed('feature_importance')
     def feature_importance(self, X):
         """
         Calculate the feature importance for the given input data.
@@ -237,6 +410,7 @@ class PODPredictor:
         z = self.decision_function(X_test)
         return np.where(z < 0, 0, 1)  # labels 0 as positive cases
 
+    @timed('predict_proba')
     def predict_proba(self, X_test):
         """
         Predict the probability of postoperative delirium for the given input data.
@@ -250,26 +424,104 @@ class PODPredictor:
         numpy.ndarray: A 2D numpy array containing the predicted probabilities for the given input data.
         """
 
+        if self.cache is not None and not isinstance(X_test, PreparedBatch):
+            return self.cache.cached_rows(self.preprocess_input(X_test), ('predict_proba', self.calibration_version),
+                                          lambda X: self.predict_proba(self.prepare(X, validated=True)))
+
+        # Multiple imputation (the draws are calibrated and pooled)
+        if isinstance(self.imputer, IterativeImputer) and not (hasattr(self, 'X') and X_test is self.X):
+            X_test = self.prepare(X_test)
+            if X_test.draws is not None:
+                proba = self.pool_draws(X_test)[0]
+                return np.column_stack((1 - proba, proba))
+
         # No Calibration (naive probabilities)
         if self.calibrator is None:
             probas = self.naive_proba(X_test)
 
+        # Venn-ABERS
+        elif isinstance(self.calibrator, VennAbersIndex):
+            probas = self.naive_proba(X_test)
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                probas = self.calibrator.predict_proba(probas)
+
         # Platt Scaling
-        elif isinstance(self.calibrator, LogisticRegression):
-            probas = self.calibrator.predict_proba(
-                self.decision_function(X_test).reshape(-1, 1))
+        else:
+            z = self.decision_function(X_test).reshape(-1, 1)
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                probas = self.calibrator.predict_proba(z)
+
+        return probas
+
+    @timed('predict_proba_array')
+    def predict_proba_array(self, X_test, out=None):
+        """
+        Predict the probability of postoperative delirium for the given numpy array without using pandas.
+
+        This is a fast path for numpy arrays with the columns in the order of COEFFICIENTS. Missing values are imputed,
+        and normalization, decision function and (calibrated) probabilities are calculated in preallocated buffers.
+        The results are the same as those of predict_proba.
+
+        Args:
+        X_test (numpy.ndarray or str): The input data of shape (n, 15) or (15,) to predict probabilities for, or the
+            path of a file containing it (see load_input; a .npy file is memory-mapped and copied only once).
+        out (numpy.ndarray, optional): A float64 array of shape (n, 2) to store the probabilities in. Defaults to None.
+
+        Raises:
+        ValueError: If the input is a numpy array with incorrect dimensions.
+        SchemaError: If values are out of range (see schema.Schema).
+
+        Returns:
+        numpy.ndarray: A 2D numpy array containing the predicted probabilities for the given input data.
+        """
+
+        if isinstance(X_test, (str, os.PathLike)):
+            X_test = load_input(X_test)
+        X = core.as_array(X_test)
+        SCHEMA.check_array(X)
+
+        # Multiple imputation (the draws are calibrated and pooled, see predict_proba)
+        if isinstance(self.imputer, IterativeImputer):
+            probas = self.predict_proba(X)
+            if out is None:
+                return probas
+            out[:] = probas
+            return out
+
+        # Normalization and Imputation (in the order of impute, so that the imputed values are the same)
+        self.normalize(X, copy=False)
+        if self.imputer is None:
+            np.copyto(X, self.normalized_default_array, where=np.isnan(X))
+        else:
+            X = self.imputer.transform(X)
+
+        # Decision Function
+        z = core.decision_function(X, self.coefficients)
+
+        if out is None:
+            out = np.empty((X.shape[0], 2))
+
+        # Platt Scaling
+        if self.calibrator is not None and not isinstance(self.calibrator, VennAbersIndex):
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                out[:] = self.calibrator.predict_proba(z.reshape(-1, 1))
+            return out
+
+        # Naive Probabilities
+        core.naive_proba(z, out=out)
 
         # Venn-ABERS
-        elif isinstance(self.calibrator, VennAbersCalibrator):
-            probas = self.calibrator.predict_proba(
-                p_cal=self.naive_proba(self.X),
-                y_cal=self.y,
-                p_test=self.naive_proba(X_test),
-                p0_p1_output=False
-            )
+        if isinstance(self.calibrator, VennAbersIndex):
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                out[:] = self.calibrator.predict_proba(out)
 
-        return probas
+        return out
 
+    @timed('get_report')
     def get_report(self, X_test):
         """
         Generate a report predicting the probability of postoperative delirium, including confidence intervals (if applicable) and feature importance for the given input data.
@@ -286,26 +538,224 @@ class PODPredictor:
                 - Feature importance scores for each input feature.
         """
 
-        if isinstance(self.calibrator, VennAbersCalibrator):
-            va_proba = self.calibrator.predict_proba(
-                p_cal=self.naive_proba(self.X),
-                y_cal=self.y,
-                p_test=self.naive_proba(X_test),
-                p0_p1_output=True
-            )
+        if self.cache is not None and not isinstance(X_test, PreparedBatch):
+            return self.cache.cached_rows(self.preprocess_input(X_test), ('get_report', self.calibration_version),
+                                          lambda X: self.get_report(self.prepare(X, validated=True)))
+
+        X_test = self.prepare(X_test)
+
+        if X_test.draws is not None:
+            # Multiple imputation: the intervals of patients with missing values cover all draws
+            # (the intervals of the other patients are NaN without Venn-ABERS, also if no patient of the batch has one)
+            proba, ci_0, ci_1 = self.pool_draws(X_test)
+        elif isinstance(self.calibrator, VennAbersIndex):
+            naive_proba = self.naive_proba(X_test)
+            with self.instrumentation.stage('calibrator'):
+                self.instrumentation.count('calibrator_calls')
+                va_proba = self.calibrator.predict_proba(naive_proba, p0_p1_output=True)
             proba = va_proba[0][:, 1]
             ci_0, ci_1 = va_proba[1][:, 0], va_proba[1][:, 1]
         else:
             proba = self.predict_proba(X_test)[:, 1]
             ci_0, ci_1 = None, None
 
-        report = pd.DataFrame({
-            'Delirium Probability': proba,
-            'Confidence Interval (lower bound)': ci_0,
-            'Confidence Interval (upper bound)': ci_1
-        })
-
         feature_importance = self.feature_importance(X_test)
-        report = pd.concat([report, feature_importance], axis=1)
+
+        with self.instrumentation.stage('report_assembly'):
+            # The report keeps the index of the input data (e.g., patient IDs, see multimorbidity.add_multimorbidity)
+            report = pd.DataFrame({
+                'Delirium Probability': proba,
+                'Confidence Interval (lower bound)': ci_0,
+                'Confidence Interval (upper bound)': ci_1
+            }, index=feature_importance.index)
+            report = pd.concat([report, feature_importance], axis=1)
+
+        return report
+
+    def calibrate_scores(self, z):
+        """
+        Calibrate decision values of any shape with the calibrator of the predictor.
+
+        Unlike calibrate, the calibration is applied as array operations: the Venn-ABERS index calibrates the scores
+        in their shape (see VennAbersIndex.calibrate) and Platt scaling is applied with its fitted slope and intercept.
+
+        Args:
+        z (numpy.ndarray): The decision values.
+
+        Returns:
+        numpy.ndarray: The probabilities of delirium, of the shape of z.
+        numpy.ndarray: The lower and upper probability bounds of Venn-ABERS, of the shape of z plus a last axis of
+                       length 2 (None for other calibration methods).
+        """
+
+        naive = 1/(1 + np.exp(-0.97 * z + 1.07))
+
+        with self.instrumentation.stage('calibrator'):
+            if isinstance(self.calibrator, VennAbersIndex):
+                self.instrumentation.count('calibrator_calls')
+                return self.calibrator.calibrate(naive)
+
+            if self.calibrator is not None:
+                self.instrumentation.count('calibrator_calls')
+                (slope, intercept) = (self.calibrator.coef_.ravel()[0], self.calibrator.intercept_.ravel()[0])
+                return 1 / (1 + np.exp(-(slope * z + intercept))), None
+
+        return naive, None
+
+    @timed('what_if')
+    def what_if(self, X_test, variants, p0_p1_output=False):
+        """
+        Predict the probability of postoperative delirium for every combination of patient and variant of the input
+        features (e.g., a shorter cut-to-suture time or stopping pre-operative benzodiazepines).
+
+        The input is prepared once. Since the decision function is linear, the decision values of all variants follow
+        from those of the patients by one matrix product: a varied feature replaces the contribution of the patient's
+        value with that of the variant's value. All (patient x variant) decision values are then calibrated at once
+        (see calibrate_scores). The imputed values of the other features are kept, i.e., they are not imputed again
+        for each variant (with multiple imputation, the point imputation is used).
+
+        Args:
+        X_test (numpy.ndarray, dict, pandas.DataFrame, str, or PreparedBatch): The input data of the patients.
+        variants (dict or pandas.DataFrame): A dictionary mapping features to lists of values (all combinations are
+            scored) or a DataFrame with one variant per row (see utils.variant_grid). A missing value keeps the value
+            of the patient.
+        p0_p1_output (bool, optional): Whether to also return the lower and upper probability bounds of Venn-ABERS.
+            Defaults to False.
+
+        Raises:
+        KeyError: If a varied feature is not found in Features.
+        SchemaError: If a value of a variant is invalid (see schema.Schema).
+
+        Returns:
+        numpy.ndarray: The probabilities of delirium of shape (n_patients, n_variants), with the variants in the order
+                       of variant_grid(variants).
+        numpy.ndarray: The lower and upper probability bounds of shape (n_patients, n_variants, 2) (if p0_p1_output is
+                       True). The bounds are NaN without Venn-ABERS calibration.
+        """
+
+        # Normalized values of the variants (NaN if the feature is not varied)
+        values = self.normalize(SCHEMA.validate_subset(variant_grid(variants)))
+        varied = ~np.isnan(values)
+        contributions = np.where(varied, values, 0) @ self.coefficients
+
+        batch = self.prepare(X_test)
+        z = self.decision_function(batch)
+        X = batch.imputed.to_numpy(dtype=np.float64)
+
+        # z[i, k] = z[i] + sum_j varied[k, j] * coefficients[j] * (values[k, j] - X[i, j])
+        z = z[:, None] + contributions - (X * self.coefficients) @ varied.T
+        (proba, p0_p1) = self.calibrate_scores(z)
+
+        if not p0_p1_output:
+            return proba
+        return proba, np.full(z.shape + (2,), np.nan) if p0_p1 is None else p0_p1
+
+    def what_if_report(self, X_test, variants):
+        """
+        Predict the probabilities of delirium of all variants of the input features (see what_if) as a long table.
+
+        Args:
+        X_test (numpy.ndarray, dict, pandas.DataFrame, str, or PreparedBatch): The input data of the patients.
+        variants (dict or pandas.DataFrame): The variants of the input features (see what_if).
+
+        Returns:
+        pandas.DataFrame: A DataFrame with one row per patient and variant, containing 'Patient', 'Variant', the values
+                          of the varied features, 'Delirium Probability', the confidence interval bounds (NaN without
+                          Venn-ABERS calibration), and 'Change' (the difference to the probability without changes).
+        """
+
+        grid = variant_grid(variants)
+        batch = self.prepare(X_test)
+        baseline = self.what_if(batch, {})[:, 0]
+        (proba, bounds) = self.what_if(batch, grid, p0_p1_output=True)
+        (n_patients, n_variants) = proba.shape
+
+        report = grid.iloc[np.tile(np.arange(n_variants), n_patients)].reset_index(drop=True)
+        report.insert(0, 'Variant', np.tile(np.arange(n_variants), n_patients))
+        report.insert(0, 'Patient', np.repeat(np.arange(n_patients), n_variants))
+        report['Delirium Probability'] = proba.ravel()
+        report['Confidence Interval (lower bound)'] = bounds[:, :, 0].ravel()
+        report['Confidence Interval (upper bound)'] = bounds[:, :, 1].ravel()
+        report['Change'] = (proba - baseline[:, None]).ravel()
 
         return report
+
+    def update(self, X_new, y_new, window=None, decay=None):
+        """
+        Add newly observed cases to the calibration set without refitting the predictor from scratch.
+
+        The new cases are normalized and added to the imputation index (rows of missingness patterns that did not change
+        keep their KD-trees), imputed, and merged into the calibration: the Venn-ABERS index merges their scores into
+        its sorted scores, and Platt scaling is refitted warm-started from the current parameters. Calibration cases
+        that were imputed before are not imputed again. The predictor must not be used for predictions while it is
+        updated.
+
+        Args:
+        X_new (numpy.ndarray, dict, or pandas.DataFrame): The input data of the new cases.
+        y_new (numpy.ndarray): The observed outcomes of the new cases (True or 1 for delirium).
+        window (int, optional): The maximal number of most recent cases to keep in the calibration set (a sliding
+            window, which may also drop the oldest of the new cases). Defaults to None (all cases are kept).
+        decay (float, optional): A factor between 0 and 1 applied to the weights of the existing calibration cases
+            before the new cases are added, so that older cases lose influence. Defaults to None (no decay).
+
+        Raises:
+        ValueError: If the predictor uses neither calibration nor imputation, or if the number of outcomes does not
+            match the number of cases.
+
+        Returns:
+        PODPredictor: The updated predictor.
+        """
+
+        if not hasattr(self, 'y'):
+            raise ValueError(
+                "Incremental updates require a calibration or imputation method with a calibration dataset.")
+
+        normalized = self.normalize(self.preprocess_input(X_new))
+        y_new = np.asarray(y_new).astype(self.y.dtype).ravel()
+        if len(y_new) != len(normalized):
+            raise ValueError(
+                f"Expected {len(normalized)} outcomes for the new cases, but got {len(y_new)} instead.")
+
+        # New cases beyond the window are never part of the calibration set
+        if window is not None and len(y_new) > window:
+            normalized, y_new = normalized.iloc[len(y_new) - window:].reset_index(drop=True), y_new[-window:]
+
+        n_dropped = max(0, len(self.y) + len(y_new) - window) if window is not None else 0
+        y_dropped = self.y[:n_dropped]
+
+        # Imputation
+        if self.imputer is not None:
+            self.imputer.partial_fit(normalized.to_numpy(), keep=window)
+        new = PreparedBatch(normalized, self.impute(normalized, normalized=True))
+
+        # Calibration set
+        weights_new = np.ones(len(y_new))
+        if decay is not None:
+            self.sample_weight = self.sample_weight * decay
+        weights_dropped = self.sample_weight[:n_dropped]
+        self.X = pd.concat([self.X, new.imputed], ignore_index=True).iloc[n_dropped:].reset_index(drop=True)
+        self.y = np.concatenate([self.y, y_new])[n_dropped:]
+        self.sample_weight = np.concatenate([self.sample_weight, weights_new])[n_dropped:]
+
+        # Calibration (removed cases are subtracted from the Venn-ABERS index with negative weights, by the scores they
+        # were added with)
+        if isinstance(self.calibrator, VennAbersIndex):
+            scores_new = self.naive_proba(new)[:, 1]
+            scores = np.concatenate([scores_new, self.scores[:n_dropped]])
+            self.scores = np.concatenate([self.scores, scores_new])[n_dropped:]
+            self.calibrator.update(
+                np.column_stack((1 - scores, scores)),
+                np.concatenate([y_new, y_dropped]),
+                sample_weight=np.concatenate([weights_new, -weights_dropped]),
+                decay=decay)
+        elif self.calibrator is not None:
+            self.calibrator.set_params(warm_start=True)
+            self.calibrator.fit(self.decision_function(self.X).reshape(-1, 1), self.y,
+                                sample_weight=self.sample_weight)
+
+        # Cached results of the previous calibration are invalid
+        self.calibration_version += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+        return self
@@ -0,0 +1,216 @@
+import contextlib
+import functools
+import threading
+import time
+
+
+class Instrumentation:
+    def __init__(self, enabled=False, callback=None):
+        """
+        Initialize a new Instrumentation instance.
+
+        This class collects per-stage timers (number of calls, total and maximal time) and counters (e.g., rows, missing
+        values, imputer and calibrator calls) of a PODPredictor. It can be enabled and disabled at runtime; while it is
+        disabled, the instrumented methods only check a flag. Stage times include nested stages (e.g., the time of
+        'get_report' includes that of 'impute').
+
+        Args:
+        enabled (bool, optional): Whether to collect metrics. Defaults to False.
+        callback (callable, optional): A function called with the stage name and its time (in seconds) after each
+            timed stage. Defaults to None.
+        """
+
+        self.enabled = enabled
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.timers = {}  # stage -> [calls, total seconds, maximal seconds]
+        self.counters = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def enable(self, callback=None):
+        """
+        Start collecting metrics.
+
+        Args:
+        callback (callable, optional): A function called with the stage name and its time (in seconds) after each
+            timed stage. Defaults to None (the current callback is kept).
+
+        Returns:
+        None
+        """
+
+        if callback is not None:
+            self.callback = callback
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop collecting metrics (the collected metrics are kept).
+
+        Returns:
+        None
+        """
+
+        self.enabled = False
+
+    def reset(self):
+        """
+        Remove the collected metrics.
+
+        Returns:
+        None
+        """
+
+        with self.lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def record(self, stage, seconds):
+        """
+        Record the time of a stage.
+
+        Args:
+        stage (str): The name of the stage.
+        seconds (float): The time (in seconds).
+
+        Returns:
+        None
+        """
+
+        with self.lock:
+            timer = self.timers.setdefault(stage, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def count(self, name, value=1):
+        """
+        Increment a counter (if enabled).
+
+        Args:
+        name (str): The name of the counter.
+        value (int, optional): The increment. Defaults to 1.
+
+        Returns:
+        None
+        """
+
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    @contextlib.contextmanager
+    def _timed_stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def stage(self, stage):
+        """
+        Time a block of code as a stage.
+
+        Args:
+        stage (str): The name of the stage.
+
+        Returns:
+        A context manager timing the block (a no-op if disabled).
+        """
+
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed_stage(stage)
+
+    def to_dict(self):
+        """
+        Export the collected metrics.
+
+        Returns:
+        dict: The timers (calls, total and mean time in milliseconds, maximal time in milliseconds) per stage, and the
+              counters.
+        """
+
+        with self.lock:
+            return {
+                'stages': {stage: {
+                    'calls': calls,
+                    'total_ms': total * 1000,
+                    'mean_ms': total / calls * 1000,
+                    'max_ms': maximum * 1000,
+                } for (stage, (calls, total, maximum)) in self.timers.items()},
+                'counters': dict(self.counters),
+            }
+
+    def to_prometheus(self, prefix='pod_predictor'):
+        """
+        Export the collected metrics in the Prometheus text exposition format.
+
+        Args:
+        prefix (str, optional): The prefix of the metric names. Defaults to 'pod_predictor'.
+
+        Returns:
+        str: The metrics.
+        """
+
+        with self.lock:
+            timers = dict(self.timers)
+            counters = dict(self.counters)
+
+        lines = [
+            f"# HELP {prefix}_stage_calls_total Number of calls of each stage.",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{stage}"}} {calls}' for (stage, (calls, _, _)) in timers.items()]
+        lines += [
+            f"# HELP {prefix}_stage_seconds_total Total time spent in each stage.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{stage}"}} {total!r}'
+                  for (stage, (_, total, _)) in timers.items()]
+        lines += [
+            f"# HELP {prefix}_stage_seconds_max Maximal time of a single call of each stage.",
+            f"# TYPE {prefix}_stage_seconds_max gauge",
+        ]
+        lines += [f'{prefix}_stage_seconds_max{{stage="{stage}"}} {maximum!r}'
+                  for (stage, (_, _, maximum)) in timers.items()]
+        for (name, value) in counters.items():
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+
+        return '\n'.join(lines) + '\n'
+
+
+def timed(stage):
+    """
+    Decorator to time a PODPredictor method as a stage of its instrumentation (see Instrumentation).
+
+    Args:
+    stage (str): The name of the stage.
+
+    Returns:
+    A decorator for methods of classes with an 'instrumentation' attribute.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.enabled:
+                return func(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                instrumentation.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,218 @@
+import os
+import numpy as np
+import pandas as pd
+from pod_predictor.streaming import read_chunks
+
+# Scoring rules of the modified Charlson Comorbidity Index (see readme): (category, points, ICD-10 code prefixes).
+# The codes are the ICD-10 coding algorithm of Quan et al. (2005); ranges (e.g., 'I60-I69') include both ends.
+# A category scores the maximal points of its rules (e.g., 3 for a patient with mild and severe liver disease).
+CCI_RULES = [
+    ('Myocardial infarction', 1, ['I21', 'I22', 'I25.2']),
+    ('Congestive heart failure', 1, [
+        'I09.9', 'I11.0', 'I13.0', 'I13.2', 'I25.5', 'I42.0', 'I42.5-I42.9', 'I43', 'I50', 'P29.0']),
+    ('Peripheral vascular disease', 1, [
+        'I70', 'I71', 'I73.1', 'I73.8', 'I73.9', 'I77.1', 'I79.0', 'I79.2', 'K55.1', 'K55.8', 'K55.9', 'Z95.8',
+        'Z95.9']),
+    ('Cerebrovascular disease', 1, ['G45', 'G46', 'H34.0', 'I60-I69']),
+    ('Dementia', 1, ['F00-F03', 'F05.1', 'G30', 'G31.1']),
+    ('Chronic pulmonary disease', 1, ['I27.8', 'I27.9', 'J40-J47', 'J60-J67', 'J68.4', 'J70.1', 'J70.3']),
+    ('Liver disease', 1, [
+        'B18', 'K70.0-K70.3', 'K70.9', 'K71.3-K71.5', 'K71.7', 'K73', 'K74', 'K76.0', 'K76.2-K76.4', 'K76.8',
+        'K76.9', 'Z94.4']),
+    ('Liver disease', 3, [
+        'I85.0', 'I85.9', 'I86.4', 'I98.2', 'K70.4', 'K71.1', 'K72.1', 'K72.9', 'K76.5-K76.7']),
+    ('Diabetes mellitus', 1, [f'E1{i}.{j}' for i in range(5) for j in '01689']),
+    ('Diabetes mellitus', 2, [f'E1{i}.{j}' for i in range(5) for j in '23457']),
+    ('Renal disease', 2, [
+        'I12.0', 'I13.1', 'N03.2-N03.7', 'N05.2-N05.7', 'N18', 'N19', 'N25.0', 'Z49.0-Z49.2', 'Z94.0', 'Z99.2']),
+]
+
+
+def normalize_codes(codes):
+    """
+    Normalize diagnosis codes for the prefix lookup (upper case, without dots, spaces and other separators).
+
+    Args:
+    codes (pandas.Series): The diagnosis codes (e.g., 'i25.2' or 'E11.91 G').
+
+    Returns:
+    pandas.Series: The normalized codes (e.g., 'I252' or 'E1191G').
+    """
+
+    return codes.astype(str).str.upper().str.replace(r'[^0-9A-Z]', '', regex=True)
+
+
+def _expand(prefix):
+    # 'K70.0-K70.3' -> ['K700', 'K701', 'K702', 'K703']
+    (first, _, last) = prefix.replace('.', '').partition('-')
+    if not last:
+        return [first]
+    if len(first) != len(last) or first[:-1] != last[:-1]:
+        raise ValueError(f"Invalid code range '{prefix}'. Only the last character of a range may differ.")
+    return [first[:-1] + str(digit) for digit in range(int(first[-1]), int(last[-1]) + 1)]
+
+
+class DiagnosisIndex:
+    def __init__(self, rules=CCI_RULES):
+        """
+        Initialize a new DiagnosisIndex instance.
+
+        This class compiles scoring rules into one hash table per prefix length, mapping the normalized code prefixes
+        to their rules. A code is looked up by its prefixes of every length, so that it matches all rules of its
+        categories (e.g., 'K704' matches the severe liver disease rule 'K70.4'). Each unique code of a table is looked
+        up only once.
+
+        Args:
+        rules (list, optional): The scoring rules as (category, points, code prefixes) tuples. Defaults to CCI_RULES.
+
+        Raises:
+        ValueError: If a code prefix is assigned to more than one rule or a code range is invalid.
+        """
+
+        self.categories = list(dict.fromkeys(category for (category, _, _) in rules))
+        self.rule_category = np.array([self.categories.index(category) for (category, _, _) in rules], dtype=np.intp)
+        self.rule_points = np.array([points for (_, points, _) in rules], dtype=np.int8)
+
+        # Prefix length -> {normalized prefix: rule}
+        self.tables = {}
+        for (rule, (category, _, prefixes)) in enumerate(rules):
+            for prefix in prefixes:
+                for code in _expand(prefix):
+                    table = self.tables.setdefault(len(code), {})
+                    if code in table:
+                        raise ValueError(f"Code prefix '{prefix}' of '{category}' is assigned to more than one rule.")
+                    table[code] = rule
+
+    def lookup(self, codes):
+        """
+        Look up the points of diagnosis codes for each category.
+
+        Args:
+        codes (array-like): The diagnosis codes (ICD-10, with or without dots). Missing codes score no points.
+
+        Returns:
+        numpy.ndarray: The points of shape (n, n_categories).
+        """
+
+        # Factorizing a pandas column keeps its (e.g., Arrow) string dtype, which is faster than an object array
+        (codes, uniques) = pd.factorize(codes if isinstance(codes, pd.Series) else pd.Series(codes))
+        uniques = normalize_codes(pd.Series(uniques, dtype=object))
+
+        # One more row (of zeros) for missing codes, which are factorized to -1
+        points = np.zeros((len(uniques) + 1, len(self.categories)), dtype=np.int8)
+        for (length, table) in self.tables.items():
+            rules = uniques.str[:length].map(table).to_numpy(dtype=np.float64, na_value=np.nan)
+            matched = np.flatnonzero(~np.isnan(rules))
+            rules = rules[matched].astype(np.intp)
+            np.maximum.at(points, (matched, self.rule_category[rules]), self.rule_points[rules])
+
+        return points[codes]
+
+    def aggregate(self, diagnoses, patient_column='Patient', code_column='Code', chunksize=100000):
+        """
+        Aggregate the points of each category per patient over a long-format diagnosis table.
+
+        Each chunk is looked up and grouped by patient with vectorized group operations. Since the diagnoses of a
+        patient may span several chunks, the per-chunk results are combined by their maximum at the end.
+
+        Args:
+        diagnoses (pandas.DataFrame, str, or iterable): A table with one row per diagnosis (patient ID and code), the
+            path of a file containing it (CSV, Parquet or Arrow IPC, read in chunks), or an iterable of such tables
+            (e.g., chunks of a database query).
+        patient_column (str, optional): The name of the patient ID column. Defaults to 'Patient'.
+        code_column (str, optional): The name of the diagnosis code column. Defaults to 'Code'.
+        chunksize (int, optional): The number of rows per chunk if a file is read. Defaults to 100000.
+
+        Returns:
+        pandas.DataFrame: The points of each category (columns) per patient (index). Patients without matching
+                          diagnoses score 0.
+
+        Raises:
+        FileNotFoundError: If the file is not found at the provided path.
+        KeyError: If the patient or code column is missing.
+        """
+
+        if isinstance(diagnoses, (str, os.PathLike)):
+            diagnoses = read_chunks(diagnoses, [patient_column, code_column], chunksize)
+        elif isinstance(diagnoses, pd.DataFrame):
+            diagnoses = [diagnoses]
+
+        partials = []
+        for chunk in diagnoses:
+            for key in (patient_column, code_column):
+                if key not in chunk.columns:
+                    raise KeyError(f"Column '{key}' not found in diagnoses.")
+            # Only the diagnoses that match a rule are grouped; the other patients of the chunk score 0
+            points = self.lookup(chunk[code_column])
+            matched = points.any(axis=1)
+            patients = chunk[patient_column].to_numpy()
+            partial = pd.DataFrame(points[matched], columns=self.categories).groupby(
+                patients[matched], sort=False).max()
+            partials.append(partial.reindex(pd.unique(patients[~pd.isna(patients)]), fill_value=0))
+
+        if not partials:
+            return pd.DataFrame(columns=self.categories, dtype=np.int8)
+        if len(partials) == 1:
+            return partials[0]
+        return pd.concat(partials).groupby(level=0, sort=False).max()
+
+
+# The compiled index of CCI_RULES
+CCI_INDEX = DiagnosisIndex(CCI_RULES)
+
+
+def multimorbidity_scores(diagnoses, patient_column='Patient', code_column='Code', chunksize=100000, index=CCI_INDEX):
+    """
+    Calculate the multimorbidity score (modified Charlson Comorbidity Index, see readme) of each patient from
+    diagnosis codes.
+
+    Args:
+    diagnoses (pandas.DataFrame, str, or iterable): A long-format table with one row per diagnosis, the path of a file
+        containing it, or an iterable of such tables (see DiagnosisIndex.aggregate).
+    patient_column (str, optional): The name of the patient ID column. Defaults to 'Patient'.
+    code_column (str, optional): The name of the diagnosis code column (ICD-10). Defaults to 'Code'.
+    chunksize (int, optional): The number of rows per chunk if a file is read. Defaults to 100000.
+    index (DiagnosisIndex, optional): The compiled scoring rules. Defaults to CCI_INDEX.
+
+    Returns:
+    pandas.Series: The 'Multimorbidity (score)' per patient ID.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    KeyError: If the patient or code column is missing.
+    """
+
+    points = index.aggregate(diagnoses, patient_column, code_column, chunksize)
+    return points.sum(axis=1).astype(np.int64).rename('Multimorbidity (score)')
+
+
+def add_multimorbidity(data, diagnoses, patient_column='Patient', code_column='Code', chunksize=100000):
+    """
+    Set the multimorbidity score of the patients of a feature matrix from their diagnosis codes.
+
+    The patients are matched by the patient ID column of the data or, if it has none, by its index. The patient ID
+    column is moved to the index, so that the result can be passed to PODPredictor directly (the report of
+    PODPredictor.get_report keeps the patient IDs as its index). Patients without diagnoses in the table keep their
+    multimorbidity score (missing, i.e., imputed, if the data has none).
+
+    Args:
+    data (pandas.DataFrame): The feature matrix.
+    diagnoses (pandas.DataFrame, str, or iterable): The diagnoses (see multimorbidity_scores).
+    patient_column (str, optional): The name of the patient ID column. Defaults to 'Patient'.
+    code_column (str, optional): The name of the diagnosis code column (ICD-10). Defaults to 'Code'.
+    chunksize (int, optional): The number of rows per chunk if a file is read. Defaults to 100000.
+
+    Returns:
+    pandas.DataFrame: The feature matrix with the calculated multimorbidity scores.
+    """
+
+    scores = multimorbidity_scores(diagnoses, patient_column, code_column, chunksize)
+
+    data = data.set_index(patient_column) if patient_column in data.columns else data.copy()
+    calculated = scores.reindex(data.index).to_numpy(dtype=np.float64, na_value=np.nan)
+    if 'Multimorbidity (score)' in data.columns:
+        existing = data['Multimorbidity (score)'].to_numpy(dtype=np.float64, na_value=np.nan)
+        calculated = np.where(np.isnan(calculated), existing, calculated)
+    data['Multimorbidity (score)'] = calculated
+
+    return data
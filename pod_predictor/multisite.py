@@ -0,0 +1,270 @@
+import os
+import numpy as np
+import pandas as pd
+from pod_predictor.calibration import VennAbersIndex
+from pod_predictor.imputation import NearestNeighbourImputer
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import PreparedBatch, load_data
+import warnings
+
+
+class MultiSitePredictor:
+    def __init__(self, sites, calibration='va', imputation=None):
+        """
+        Initialize a new MultiSitePredictor instance.
+
+        This class scores one batch of patients against the calibrations of several sites (e.g., hospitals) in a single
+        pass. The input is validated, normalized and imputed, and the decision function is calculated once; the
+        calibrators of all sites are then applied to the shared scores as array operations, resulting in a
+        (patients x sites) probability matrix. The results for each site are the same as those of a PODPredictor with
+        the calibration dataset of the site.
+
+        Only the calibration state is kept per site: the slope and intercept of Platt scaling, and the isotonic fits of
+        Venn-ABERS at the positions between the unique calibration scores. The Venn-ABERS fits of all sites are stored
+        in flat arrays, with the calibration scores of all sites replaced by their ranks among the unique scores of
+        all sites, so that a test score is located in the calibration scores of every site by one binary search.
+
+        With KNN imputation, the input is imputed by a single imputer fitted on the pooled calibration datasets of all
+        sites, so that the results only differ from those of per-site PODPredictors for patients with missing values.
+
+        Args:
+        sites (dict or list): A dictionary mapping site names to the file paths of their calibration datasets (format
+            of data/calibration_template.csv), or a list of file paths (the site names are the file names without
+            extension).
+        calibration (str or dict, optional): The calibration method of all sites, or a dictionary mapping site names
+            to calibration methods. Can be None, 'platt', or 'va'. Defaults to 'va'.
+        imputation (str, optional): The imputation method to use. Can be None or 'knn'. Defaults to None.
+
+        Raises:
+        FileNotFoundError: If a calibration dataset is not found.
+        KeyError: If a calibration dataset contains unknown keys.
+        ValueError: If no sites are given or site names are not unique.
+        """
+
+        if not isinstance(sites, dict):
+            paths = list(sites)
+            sites = {os.path.splitext(os.path.basename(str(path)))[0]: path for path in paths}
+            if len(sites) != len(paths):
+                raise ValueError("The site names are not unique. Pass a dictionary of site names and file paths.")
+        if not sites:
+            raise ValueError("At least one site is required.")
+
+        self.sites = list(sites.keys())
+        if not isinstance(calibration, dict):
+            calibration = {site: calibration for site in self.sites}
+
+        # The shared preprocessing (validation, normalization, imputation, decision function) of all sites
+        self.model = PODPredictor()
+
+        data = {}
+        for (site, path_to_file) in sites.items():
+            try:
+                data[site] = load_data(path_to_file)
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    f"Calibration dataset '{path_to_file}' of site '{site}' not found.")
+            for key in data[site].columns:
+                if key != 'Delirium' and key not in self.model.default_values.keys():
+                    raise KeyError(
+                        f"Key {key} not found in data of site '{site}'. Use keys in data/calibration_template.csv.")
+
+        if imputation == 'knn':
+            pooled = pd.concat([data[site].drop(['Delirium'], axis=1) for site in self.sites], ignore_index=True)
+            self.model.imputer = NearestNeighbourImputer(n_neighbors=5)
+            self.model.imputer.fit(self.model.normalize(pooled).to_numpy())
+        elif imputation is not None:
+            warnings.warn(
+                f"Invalid imputation value '{imputation}'. Proceeding with default None", UserWarning)
+
+        self.calibration = {}
+        platt, venn_abers = {}, {}
+        for site in self.sites:
+            method = calibration.get(site)
+            if method not in (None, 'platt', 'va'):
+                warnings.warn(
+                    f"Invalid calibration value '{method}' for site '{site}'. Proceeding with default None",
+                    UserWarning)
+                method = None
+            self.calibration[site] = method
+            if method is None:
+                continue
+
+            X = self.model.normalize(data[site].drop(['Delirium'], axis=1))
+            if imputation == 'knn':
+                # The calibration set is imputed as by a PODPredictor of the site (the imputer is not kept)
+                imputer = NearestNeighbourImputer(n_neighbors=5)
+                imputer.fit(X.to_numpy())
+                X = pd.DataFrame(data=imputer.transform(X.to_numpy()), columns=X.columns)
+            else:
+                X = self.model.impute(X, normalized=True)
+            y = data[site]['Delirium'].values
+            batch = PreparedBatch(X, X)
+            if method == 'platt':
+                # sklearn is only imported if Platt scaling is selected
+                from sklearn.linear_model import LogisticRegression
+                calibrator = LogisticRegression().fit(self.model.decision_function(batch).reshape(-1, 1), y)
+                platt[site] = (calibrator.coef_.ravel()[0], calibrator.intercept_.ravel()[0])
+            else:
+                venn_abers[site] = VennAbersIndex(self.model.naive_proba(batch), y)
+
+        self._compile_platt(platt)
+        self._compile_venn_abers(venn_abers)
+
+    def _compile_platt(self, platt):
+        """
+        Store the Platt scaling parameters of the sites as arrays.
+
+        Args:
+        platt (dict): A dictionary mapping site names to (slope, intercept).
+
+        Returns:
+        None
+        """
+
+        self.platt_sites = np.array([self.sites.index(site) for site in platt], dtype=np.intp)
+        self.platt_coef = np.array([coef for (coef, _) in platt.values()], dtype=np.float64)
+        self.platt_intercept = np.array([intercept for (_, intercept) in platt.values()], dtype=np.float64)
+
+    def _compile_venn_abers(self, venn_abers):
+        """
+        Store the Venn-ABERS fits of the sites in flat arrays.
+
+        The unique calibration scores of all sites are collected in 'va_scores', and the scores of each site are
+        replaced by their ranks in it. The ranks of site j are offset by j * (len(va_scores) + 1), so that the ranks of
+        all sites form a single sorted array ('va_ranks'), which is searched for the ranks of the test scores of all
+        sites at once. The isotonic fits of site j (one more than its unique scores) are concatenated in 'va_p0' and
+        'va_p1' in the same order, so that an index into 'va_ranks' of site j, plus j, is an index into them.
+
+        Args:
+        venn_abers (dict): A dictionary mapping site names to their VennAbersIndex.
+
+        Returns:
+        None
+        """
+
+        indices = list(venn_abers.values())
+        self.va_sites = np.array([self.sites.index(site) for site in venn_abers], dtype=np.intp)
+        self.va_scores = np.unique(np.concatenate([index.c for index in indices])) if indices else np.zeros(0)
+
+        stride = len(self.va_scores) + 1
+        rank_dtype = np.int32 if stride * max(len(indices), 1) < np.iinfo(np.int32).max else np.int64
+        self.va_stride = rank_dtype(stride)
+        self.va_ranks = np.concatenate(
+            [np.searchsorted(self.va_scores, index.c).astype(rank_dtype) + rank_dtype(j * stride)
+             for (j, index) in enumerate(indices)]) if indices else np.zeros(0, dtype=rank_dtype)
+        self.va_p0 = np.concatenate([index.p0 for index in indices]) if indices else np.zeros(0)
+        self.va_p1 = np.concatenate([index.p1 for index in indices]) if indices else np.zeros(0)
+
+    def prepare(self, X_test):
+        """
+        Prepare the given input data once for all sites (see PODPredictor.prepare).
+
+        Args:
+        X_test (numpy.ndarray, dict, pandas.DataFrame, or str): The input data to prepare.
+
+        Returns:
+        PreparedBatch: The normalized input data, with and without imputed missing values.
+        """
+
+        return self.model.prepare(X_test)
+
+    def predict_proba(self, X_test, p0_p1_output=False):
+        """
+        Predict the probability of postoperative delirium for the given input data with the calibration of every site.
+
+        Args:
+        X_test (numpy.ndarray, dict, pandas.DataFrame, str, or PreparedBatch): The input data to predict
+            probabilities for.
+        p0_p1_output (bool, optional): Whether to also return the lower and upper probability bounds of Venn-ABERS.
+            Defaults to False.
+
+        Returns:
+        numpy.ndarray: The probabilities of delirium of shape (n_patients, n_sites), with the sites in the order of
+                       'sites'.
+        numpy.ndarray: The lower and upper probability bounds of shape (n_patients, n_sites, 2) (if p0_p1_output is
+                       True). The bounds of sites without Venn-ABERS calibration are NaN.
+        """
+
+        batch = self.prepare(X_test)
+        z = self.model.decision_function(batch)
+        naive = 1/(1 + np.exp(-0.97 * z + 1.07))
+
+        # Uncalibrated sites
+        proba = np.repeat(naive[:, None], len(self.sites), axis=1)
+        bounds = np.full((len(z), len(self.sites), 2), np.nan) if p0_p1_output else None
+
+        # Platt scaling
+        if len(self.platt_sites):
+            proba[:, self.platt_sites] = 1 / (1 + np.exp(-(z[:, None] * self.platt_coef + self.platt_intercept)))
+
+        # Venn-ABERS
+        if len(self.va_sites):
+            p0_p1 = self._venn_abers_bounds(naive)
+            proba[:, self.va_sites] = p0_p1[:, :, 1] / (1 - p0_p1[:, :, 0] + p0_p1[:, :, 1])
+            if p0_p1_output:
+                bounds[:, self.va_sites] = p0_p1
+
+        if p0_p1_output:
+            return proba, bounds
+        return proba
+
+    def _venn_abers_bounds(self, naive):
+        """
+        Look up the Venn-ABERS probability bounds of the naive probabilities for all Venn-ABERS sites.
+
+        Args:
+        naive (numpy.ndarray): The naive probabilities of delirium of shape (n_patients,).
+
+        Returns:
+        numpy.ndarray: The lower and upper probability bounds of shape (n_patients, n_va_sites, 2).
+        """
+
+        # Ranks of the test scores among the calibration scores of all sites ('left': of the first equal score,
+        # 'right': after the last equal score)
+        left = np.searchsorted(self.va_scores, naive, 'left').astype(self.va_ranks.dtype)
+        right = np.searchsorted(self.va_scores, naive, 'right').astype(self.va_ranks.dtype)
+
+        # The calibration scores of site j below the test score are the ranks of site j below its rank
+        sites = np.arange(len(self.va_sites), dtype=self.va_ranks.dtype)
+        offsets = sites * self.va_stride
+        p1_index = np.searchsorted(self.va_ranks, left[:, None] + offsets) + sites
+        p0_index = np.searchsorted(self.va_ranks, right[:, None] + offsets) + sites
+
+        return np.stack((self.va_p0[p0_index], self.va_p1[p1_index]), axis=-1)
+
+    def to_frame(self, X_test):
+        """
+        Predict the probabilities of delirium with the calibration of every site as a long table.
+
+        Args:
+        X_test (numpy.ndarray, dict, pandas.DataFrame, str, or PreparedBatch): The input data to predict
+            probabilities for.
+
+        Returns:
+        pandas.DataFrame: A DataFrame with one row per patient and site, containing 'Patient' (the index label of the
+                          patient in the input data, e.g., the patient ID), 'Site', 'Delirium Probability' and the
+                          confidence interval bounds (NaN if the site has no Venn-ABERS calibration).
+        """
+
+        batch = self.prepare(X_test)
+        proba, bounds = self.predict_proba(batch, p0_p1_output=True)
+        (n_patients, n_sites) = proba.shape
+        return pd.DataFrame({
+            'Patient': np.repeat(batch.normalized.index.to_numpy(), n_sites),
+            'Site': np.tile(np.array(self.sites, dtype=object), n_patients),
+            'Delirium Probability': proba.ravel(),
+            'Confidence Interval (lower bound)': bounds[:, :, 0].ravel(),
+            'Confidence Interval (upper bound)': bounds[:, :, 1].ravel(),
+        })
+
+    def memory_usage(self):
+        """
+        Calculate the memory of the calibration state of all sites.
+
+        Returns:
+        int: The number of bytes of the calibration arrays.
+        """
+
+        return sum(array.nbytes for array in (
+            self.platt_sites, self.platt_coef, self.platt_intercept,
+            self.va_sites, self.va_scores, self.va_ranks, self.va_p0, self.va_p1))
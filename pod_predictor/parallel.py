@@ -0,0 +1,180 @@
+import copy
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pod_predictor.instrumentation import Instrumentation
+
+_worker_model = None
+
+
+def _share_arrays(model, directory):
+    """
+    Create a copy of the predictor whose calibration and imputation arrays are stored as memory-mapped files.
+
+    The numpy arrays of the imputer and the calibrator are saved once to the given directory and replaced by None in
+    the copy. The KD-trees of the KNN imputer are not copied; each worker builds them from the memory-mapped
+    calibration rows (see _init_worker). The calibration dataset itself is not needed for scoring and is dropped. The
+    copy is small enough to be sent to each worker once. The result cache and the instrumentation are not shared.
+
+    Args:
+    model (PODPredictor): The predictor to share.
+    directory (str): The directory to store the memory-mapped files in.
+
+    Returns:
+    PODPredictor: The copy of the predictor without its large arrays.
+    dict: The file paths of the shared arrays, keyed by (owner, attribute).
+    """
+
+    template = copy.copy(model)
+    for key in ('data', 'X', 'y', 'sample_weight', 'scores'):
+        template.__dict__.pop(key, None)
+    template.cache = None  # Each process would only cache its own chunks
+    template.instrumentation = Instrumentation()
+
+    shared = {}
+    for owner in ('imputer', 'calibrator'):
+        obj = getattr(model, owner, None)
+        if obj is None:
+            continue
+        obj = copy.copy(obj)
+        setattr(template, owner, obj)
+        if isinstance(getattr(obj, 'trees', None), dict):
+            obj.trees = {}
+        for (attr, value) in list(vars(obj).items()):
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                path = os.path.join(directory, f'{owner}.{attr}.npy')
+                np.save(path, value)
+                shared[(owner, attr)] = path
+                setattr(obj, attr, None)
+
+    return template, shared
+
+
+def _init_worker(template, shared):
+    """
+    Initialize a worker process by attaching the shared arrays to the predictor copy.
+
+    The KD-trees of the large groups of the KNN imputer are rebuilt from the memory-mapped calibration rows.
+
+    Args:
+    template (PODPredictor): The copy of the predictor without its large arrays.
+    shared (dict): The file paths of the shared arrays, keyed by (owner, attribute).
+
+    Returns:
+    None
+    """
+
+    global _worker_model
+    for ((owner, attr), path) in shared.items():
+        setattr(getattr(template, owner), attr, np.load(path, mmap_mode='r'))
+    if hasattr(template.imputer, 'trees'):
+        template.imputer._build_trees()
+    _worker_model = template
+
+
+def _predict_proba_chunk(X):
+    """
+    Predict the probabilities for a chunk of rows in a worker process (see PODPredictor.predict_proba_array).
+    """
+
+    return _worker_model.predict_proba_array(X)
+
+
+def _get_report_chunk(X):
+    """
+    Generate the report for a chunk of rows in a worker process (see PODPredictor.get_report).
+    """
+
+    return _worker_model.get_report(X)
+
+
+class ParallelPredictor:
+    def __init__(self, model, n_jobs=None, chunksize=10000):
+        """
+        Initialize a new ParallelPredictor instance.
+
+        This class scores large batches with a fitted PODPredictor in a pool of worker processes. The calibration and
+        imputation arrays (e.g., the KNN imputation data and the Venn-ABERS index) are written once to memory-mapped
+        files, which all workers map instead of receiving pickled copies with every task. The input is split into
+        chunks of rows, and the results are concatenated in the original row order, so the output is identical to
+        that of the serial predictor.
+
+        Args:
+        model (PODPredictor): The fitted predictor.
+        n_jobs (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int, optional): The number of rows per task. Defaults to 10000.
+        """
+
+        self.model = model
+        self.n_jobs = n_jobs or os.cpu_count()
+        self.chunksize = chunksize
+        self.directory = tempfile.mkdtemp(prefix='pod_predictor_')
+        template, shared = _share_arrays(model, self.directory)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.n_jobs, initializer=_init_worker, initargs=(template, shared))
+
+    def split(self, X_test):
+        """
+        Validate the input data and split it into chunks of rows.
+
+        Args:
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data.
+
+        Returns:
+        pandas.Index: The index of the input data.
+        list: Float64 numpy arrays with the columns in the order of COEFFICIENTS.
+        """
+
+        X = self.model.preprocess_input(X_test)
+        values = X.to_numpy(dtype=np.float64)
+        return X.index, [values[i:i + self.chunksize] for i in range(0, max(len(values), 1), self.chunksize)]
+
+    def predict_proba(self, X_test):
+        """
+        Predict the probability of postoperative delirium for the given input data in parallel.
+
+        Args:
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data to predict probabilities for.
+
+        Returns:
+        numpy.ndarray: A 2D numpy array containing the predicted probabilities for the given input data.
+        """
+
+        chunks = self.split(X_test)[1]
+        return np.concatenate(list(self.executor.map(_predict_proba_chunk, chunks)))
+
+    def get_report(self, X_test):
+        """
+        Generate the report (see PODPredictor.get_report) for the given input data in parallel.
+
+        Args:
+        X_test (numpy.ndarray, dict, or pandas.DataFrame): The input data.
+
+        Returns:
+        pandas.DataFrame: The report with one row per patient, in the order of the input data.
+        """
+
+        (index, chunks) = self.split(X_test)
+        reports = self.executor.map(_get_report_chunk, chunks)
+        # The report keeps the index of the input data (see PODPredictor.get_report)
+        return pd.concat(list(reports)).set_axis(index)
+
+    def close(self):
+        """
+        Shut down the worker processes and remove the memory-mapped files.
+
+        Returns:
+        None
+        """
+
+        self.executor.shutdown()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
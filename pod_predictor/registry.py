@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+from pod_predictor.inference import PODPredictor
+
+_lock = threading.Lock()
+_file_hashes = {}  # absolute path -> ((modification time, size), content hash)
+_models = {}  # (absolute path, content hash, calibration, imputation) -> PODPredictor
+
+
+def file_hash(path_to_file):
+    """
+    Calculate the content hash of a calibration dataset.
+
+    The hash is cached and only recalculated if the modification time or size of the file changed on disk.
+
+    Args:
+    path_to_file (str): The file path of the calibration dataset.
+
+    Returns:
+    str: The SHA-256 hex digest of the file content.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    """
+
+    path = os.path.abspath(path_to_file)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Calibration dataset '{path_to_file}' not found.")
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _file_hashes.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha.update(block)
+    digest = sha.hexdigest()
+    _file_hashes[path] = (signature, digest)
+
+    return digest
+
+
+def get_predictor(path_to_file='./data/calibration.csv', calibration=None, imputation=None):
+    """
+    Get a PODPredictor instance from the process-wide registry.
+
+    Each predictor is built once per calibration dataset (path and content hash), calibration method and imputation
+    method, and reused by subsequent calls. If the calibration dataset changes on disk, a new predictor is built and
+    the outdated ones for that path are removed.
+
+    Args:
+    path_to_file (str, optional): The file path of the calibration dataset. Defaults to './data/calibration.csv'.
+    calibration (str, optional): The calibration method to use. Can be None, 'platt', or 'va'. Defaults to None.
+    imputation (str, optional): The imputation method to use. Can be None, 'knn', or 'iterative'. Defaults to None.
+
+    Returns:
+    PODPredictor: The (cached) predictor.
+    """
+
+    with _lock:
+        if calibration or imputation:
+            path = os.path.abspath(path_to_file)
+            digest = file_hash(path)
+        else:
+            path, digest = None, None  # The calibration dataset is not used
+
+        key = (path, digest, calibration, imputation)
+        model = _models.get(key)
+        if model is None:
+            for outdated in [k for k in _models if k[0] == path and k[1] != digest]:
+                del _models[outdated]
+            model = PODPredictor(path_to_file=path or path_to_file,
+                                 calibration=calibration, imputation=imputation)
+            _models[key] = model
+
+    return model
+
+
+def clear_registry():
+    """
+    Remove all cached predictors and file hashes from the registry.
+
+    Returns:
+    None
+    """
+
+    with _lock:
+        _models.clear()
+        _file_hashes.clear()
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+from pod_predictor import DEFAULT_VALUES
+
+PREDICTION_COLUMNS = [
+    'Delirium Probability',
+    'Confidence Interval (lower bound)',
+    'Confidence Interval (upper bound)',
+]
+OUTPUT_FORMATS = ['text', 'jsonl', 'csv']
+
+
+def _percent_strings(values):
+    # Rounded to two decimals first, as in the original app.pod_prediction (e.g., 0.565 -> 0.56 -> '56')
+    percent = np.rint(np.round(values, 2) * 100)
+    return np.where(np.isnan(percent), '', np.nan_to_num(percent).astype(np.int64).astype(str))
+
+
+def format_predictions(report):
+    """
+    Format the predicted probabilities and confidence intervals of a report as strings (e.g., '6% [2-6%]').
+
+    The strings are built by array operations over all patients. If a patient has no confidence interval (i.e., the
+    predictor is not calibrated with Venn-ABERS), only the probability is formatted (e.g., '11%').
+
+    Args:
+    report (pandas.DataFrame): A report generated by PODPredictor.get_report.
+
+    Returns:
+    numpy.ndarray: The formatted predictions, one per patient.
+    """
+
+    values = report[PREDICTION_COLUMNS].to_numpy(dtype=np.float64, na_value=np.nan)
+    proba, lower, upper = (_percent_strings(values[:, j]) for j in range(3))
+
+    formatted = np.char.add(proba, '%')
+    with_interval = np.char.add(np.char.add(np.char.add(np.char.add(formatted, ' ['), lower), '-'), upper)
+    with_interval = np.char.add(with_interval, '%]')
+    return np.where(np.isnan(values[:, 1]) | np.isnan(values[:, 2]), formatted, with_interval)
+
+
+def top_features(report, top_k=5):
+    """
+    Rank the features of each patient by their importance (i.e., their contribution to the decision function).
+
+    The importance matrix is sorted row-wise by a single argsort, in descending order. Features with missing values
+    (no importance) are ranked last, and ties keep the order of COEFFICIENTS.
+
+    Args:
+    report (pandas.DataFrame): A report generated by PODPredictor.get_report.
+    top_k (int, optional): The number of features per patient. Defaults to 5 (None for all features).
+
+    Returns:
+    numpy.ndarray: The names of the top features, of shape (n, top_k).
+    numpy.ndarray: Their importance, of shape (n, top_k).
+    """
+
+    features = np.array(list(DEFAULT_VALUES.keys()), dtype=object)
+    importance = report[features].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # NaN is sorted last by numpy, and negating keeps it NaN
+    order = np.argsort(-importance, axis=1, kind='stable')[:, :top_k]
+    return features[order], np.take_along_axis(importance, order, axis=1)
+
+
+def render_table(report, top_k=5, decimals=2):
+    """
+    Render a report as a flat table with the formatted prediction and the ranked top features of each patient.
+
+    Columns of the report that are neither predictions nor features (e.g., 'Row' or an ID column added by
+    streaming.stream_report) are kept in front.
+
+    Args:
+    report (pandas.DataFrame): A report generated by PODPredictor.get_report.
+    top_k (int, optional): The number of features per patient. Defaults to 5 (None for all features).
+    decimals (int, optional): The number of decimals of the probabilities and importances. Defaults to 2.
+
+    Returns:
+    pandas.DataFrame: The table with the index of the report (e.g., patient IDs), with the columns 'Prediction [CI]',
+                      the rounded probability and confidence bounds, and 'Feature i' and 'Importance i' for the i-th
+                      most important feature.
+    """
+
+    names, importance = top_features(report, top_k)
+    importance = np.round(importance, decimals)
+
+    table = {key: report[key].to_numpy()
+             for key in report.columns if key not in PREDICTION_COLUMNS and key not in DEFAULT_VALUES}
+    table['Prediction [CI]'] = format_predictions(report)
+    for key in PREDICTION_COLUMNS:
+        table[key] = np.round(report[key].to_numpy(dtype=np.float64, na_value=np.nan), decimals)
+    for i in range(names.shape[1]):
+        table[f'Feature {i + 1}'] = names[:, i]
+        table[f'Importance {i + 1}'] = importance[:, i]
+
+    return pd.DataFrame(table, index=report.index)
+
+
+class ReportWriter:
+    def __init__(self, file, output_format='text', top_k=5, decimals=2):
+        """
+        Initialize a new ReportWriter instance.
+
+        This class renders reports (e.g., the chunks of streaming.stream_report) and writes them to a file as they
+        arrive, so that the memory is bounded by the size of a chunk. Supported formats are JSON Lines ('jsonl', one
+        object per patient), CSV ('csv'), and a compact text table ('text', one line per patient with the prediction
+        and the top features). The header of CSV and text outputs is written before the first chunk. Patients are
+        labelled in the first column by the index of the report (e.g., patient IDs, named by the index or 'Patient'),
+        or by their running row number if the report has a default index or a 'Row' column.
+
+        Args:
+        file (file-like object): The file to write to (e.g., sys.stdout or a file opened in text mode).
+        output_format (str, optional): The output format. Can be 'text', 'jsonl', or 'csv'. Defaults to 'text'.
+        top_k (int, optional): The number of features per patient. Defaults to 5 (None for all features).
+        decimals (int, optional): The number of decimals of the probabilities and importances. Defaults to 2.
+
+        Raises:
+        ValueError: If the output format is not supported.
+        """
+
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Invalid output format '{output_format}'. Use {', '.join(repr(f) for f in OUTPUT_FORMATS)}.")
+
+        self.file = file
+        self.output_format = output_format
+        self.top_k = top_k
+        self.decimals = decimals
+        self.rows = 0
+
+    def write(self, report):
+        """
+        Render a report and write it to the file.
+
+        Args:
+        report (pandas.DataFrame): A report generated by PODPredictor.get_report.
+
+        Returns:
+        None
+        """
+
+        table = render_table(report, self.top_k, self.decimals)
+        if 'Row' not in table.columns:
+            if isinstance(table.index, pd.RangeIndex) and table.index.name is None:
+                table.insert(0, 'Row', np.arange(self.rows, self.rows + len(table)))
+            else:
+                table.insert(0, table.index.name or 'Patient', table.index.to_numpy())
+
+        if self.output_format == 'jsonl':
+            if len(table):
+                # pandas escapes every '/' (e.g., in 'Dementia (Yes/No)'), which JSON does not require
+                lines = table.to_json(orient='records', lines=True, force_ascii=False).replace('\\/', '/')
+                self.file.write(lines.rstrip('\n') + '\n')
+        elif self.output_format == 'csv':
+            table.to_csv(self.file, header=self.rows == 0, index=False, lineterminator='\n')
+        else:
+            self.file.write(self._text_lines(table))
+
+        self.rows += len(table)
+
+    def _text_lines(self, table):
+        n_features = sum(1 for key in table.columns if key.startswith('Feature '))
+        # The first column labels the patients (see write)
+        label = table.columns[0]
+        rows = table[label].to_numpy().astype(str)
+        width = max([6, len(label)] + [len(row) for row in rows])
+        lines = np.char.add(np.char.add(np.char.rjust(rows, width), '  '), np.char.ljust(
+            table['Prediction [CI]'].to_numpy().astype(str), 14))
+
+        for i in range(1, n_features + 1):
+            importance = table[f'Importance {i}'].to_numpy()
+            values = np.char.mod(f'%+.{self.decimals}f', importance)
+            values = np.where(np.isnan(importance), 'NA', values)
+            feature = np.char.add(np.char.add(table[f'Feature {i}'].to_numpy().astype(str), ' '), values)
+            lines = np.char.add(lines, np.char.add(', ' if i > 1 else '  ', feature))
+
+        header = '' if self.rows else f"{label:>{width}}  {'Prediction':<14}  Top features (importance)\n"
+        return header + ''.join(np.char.add(lines, '\n').tolist())
+
+
+def render_reports(reports, file, output_format='text', top_k=5, decimals=2):
+    """
+    Render reports and write them to a file chunk by chunk (see ReportWriter).
+
+    Args:
+    reports (pandas.DataFrame or iterable): A report generated by PODPredictor.get_report, or an iterable of reports
+        (e.g., streaming.stream_report).
+    file (file-like object): The file to write to.
+    output_format (str, optional): The output format. Can be 'text', 'jsonl', or 'csv'. Defaults to 'text'.
+    top_k (int, optional): The number of features per patient. Defaults to 5 (None for all features).
+    decimals (int, optional): The number of decimals of the probabilities and importances. Defaults to 2.
+
+    Returns:
+    int: The number of rendered patients.
+    """
+
+    writer = ReportWriter(file, output_format, top_k, decimals)
+    for report in ([reports] if isinstance(reports, pd.DataFrame) else reports):
+        writer.write(report)
+    return writer.rows
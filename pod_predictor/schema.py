@@ -0,0 +1,284 @@
+import numpy as np
+import pandas as pd
+from pod_predictor import COEFFICIENTS
+
+# Allowed ranges (inclusive) of the features with normalization. The other (binary) features are 0 or 1.
+FEATURE_RANGES = {
+    'Estimated Cut-to-Suture Time (minutes)': (0, 1440),
+    'Age (months)': (0, 1800),
+    'GFR (Cockcroft-Gault, ml/min)': (0, 300),
+    'ASA Class (score)': (1, 6),
+    'MoCA Orientation (subscore)': (0, 6),
+    'MoCA Memory (subscore)': (0, 5),
+    'Number of Medications (n)': (0, 100),
+    'Multimorbidity (score)': (0, 13),
+    'Clinical Frailty Scale (score)': (1, 9),
+}
+
+# Values of binary features given as text (compared case-insensitively, without surrounding spaces)
+YES_NO = {'yes': 1, 'no': 0}
+
+# The number of invalid cells listed in the message of a SchemaError (all are in SchemaError.errors)
+MAX_REPORTED_ERRORS = 20
+
+
+def map_yes_no(column):
+    """
+    Convert the yes/no values of a column to 1/0 (case-insensitively). Other values are kept.
+
+    Args:
+    column (pandas.Series): The column to convert.
+
+    Returns:
+    pandas.Series: The converted column (numeric if all values are yes/no or missing).
+    """
+
+    if pd.api.types.is_numeric_dtype(column.dtype):
+        return column
+
+    mapped = column.astype('string').str.strip().str.lower().map(YES_NO)
+    found = mapped.notna()
+    if found.sum() == column.notna().sum():
+        return mapped.astype(np.float64) if mapped.isna().any() else mapped.astype(np.int64)
+    return column.astype(object).where(~found, mapped)
+
+
+class SchemaError(ValueError):
+    def __init__(self, errors):
+        """
+        Initialize a new SchemaError instance.
+
+        This exception reports all invalid cells of the input data at once.
+
+        Args:
+        errors (pandas.DataFrame): The invalid cells, with the columns 'Row' (the index label of the row), 'Column',
+            'Value', and 'Reason'.
+        """
+
+        self.errors = errors
+        lines = [f"  row {row}, '{column}': {value!r} ({reason})"
+                 for (row, column, value, reason) in errors.head(MAX_REPORTED_ERRORS).itertuples(index=False)]
+        if len(errors) > MAX_REPORTED_ERRORS:
+            lines.append(f"  ... and {len(errors) - MAX_REPORTED_ERRORS} more (see SchemaError.errors)")
+        super().__init__(f"{len(errors)} invalid value(s) in the input data:\n" + '\n'.join(lines))
+
+
+class Schema:
+    def __init__(self, features=COEFFICIENTS.keys(), ranges=FEATURE_RANGES):
+        """
+        Initialize a new Schema instance.
+
+        This class compiles the input schema of the model, i.e., the features in the order of COEFFICIENTS, their dtype
+        (float64), their allowed ranges, and the yes/no mapping of binary features, into arrays. Inputs are then
+        validated and coerced as whole columns: numeric inputs are range-checked as one 2D array by their column minima
+        and maxima, and only columns given as text are parsed. All invalid cells are collected and reported in one
+        SchemaError, instead of failing on the first.
+
+        Args:
+        features (iterable, optional): The feature names in model order. Defaults to the keys of COEFFICIENTS.
+        ranges (dict, optional): The allowed (lower, upper) range of each non-binary feature. Features without a
+            range are binary (0 or 1, or yes/no). Defaults to FEATURE_RANGES.
+        """
+
+        self.features = pd.Index(list(features))
+        self.binary = np.array([key not in ranges for key in self.features])
+        self.lower = np.array([ranges[key][0] if key in ranges else 0 for key in self.features], dtype=np.float64)
+        self.upper = np.array([ranges[key][1] if key in ranges else 1 for key in self.features], dtype=np.float64)
+        self.binary_columns = np.flatnonzero(self.binary)
+
+    def check_keys(self, columns, required=True):
+        """
+        Check that the given columns are exactly the features (in any order).
+
+        Args:
+        columns (pandas.Index): The column names of the input data.
+        required (bool, optional): Whether all features are required. Defaults to True.
+
+        Raises:
+        KeyError: If columns are unknown or features are missing (all of them are listed).
+
+        Returns:
+        None
+        """
+
+        unknown = columns[~columns.isin(self.features)]
+        missing = self.features[~self.features.isin(columns)] if required else self.features[:0]
+        if len(unknown) or len(missing):
+            problems = []
+            if len(unknown):
+                problems.append(f"Key(s) {', '.join(repr(key) for key in unknown)} not found in Features.")
+            if len(missing):
+                problems.append(f"Key(s) {', '.join(repr(key) for key in missing)} missing in the input data.")
+            raise KeyError(' '.join(problems) + " Use keys in data/JSON_template.json.")
+
+    def coerce(self, column, binary=False):
+        """
+        Convert a column to float64, parsing numbers and (for binary features) yes/no given as text.
+
+        Args:
+        column (pandas.Series): The column to convert.
+        binary (bool, optional): Whether the feature is binary. Defaults to False.
+
+        Returns:
+        numpy.ndarray: The converted values (NaN if missing or invalid).
+        numpy.ndarray: A boolean mask of the values that could not be parsed.
+        """
+
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            return column.to_numpy(dtype=np.float64, na_value=np.nan), np.zeros(len(column), dtype=bool)
+
+        text = column.astype('string').str.strip()
+        values = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if binary:
+            yes_no = text.str.lower().map(YES_NO).to_numpy(dtype=np.float64, na_value=np.nan)
+            values = np.where(np.isnan(values), yes_no, values)
+
+        return values, np.isnan(values) & column.notna().to_numpy()
+
+    def invalid_cells(self, values):
+        """
+        Find the values outside of the allowed ranges (missing values are valid).
+
+        The columns are first checked by their minima and maxima (ignoring NaN), so that the cell-wise mask is only
+        calculated for the columns with invalid values.
+
+        Args:
+        values (numpy.ndarray): The input data of shape (n, n_features), in model order.
+
+        Returns:
+        numpy.ndarray: A boolean mask of the invalid values, or None if all values are valid.
+        """
+
+        if len(values) == 0:
+            return None
+
+        with np.errstate(invalid='ignore'):
+            lowest = np.fmin.reduce(values, axis=0)
+            highest = np.fmax.reduce(values, axis=0)
+            # x - x^2 is 0 for 0 and 1, and positive for fractions between them (calculated in one buffer)
+            fractional = np.zeros(len(self.features), dtype=bool)
+            buffer = np.empty(len(values))
+            for j in self.binary_columns:
+                np.multiply(values[:, j], values[:, j], out=buffer)
+                np.subtract(values[:, j], buffer, out=buffer)
+                fractional[j] = np.fmax.reduce(buffer) > 0
+        failed = np.flatnonzero((lowest < self.lower) | (highest > self.upper) | fractional)
+        if not len(failed):
+            return None
+
+        invalid = np.zeros(values.shape, dtype=bool)
+        for j in failed:
+            column = values[:, j]
+            invalid[:, j] = (column < self.lower[j]) | (column > self.upper[j])
+            if self.binary[j]:
+                invalid[:, j] |= (column > 0) & (column < 1)
+        return invalid
+
+    def check_array(self, values, index=None, original=None, unparsed=None):
+        """
+        Check the values of the input data against the allowed ranges.
+
+        Args:
+        values (numpy.ndarray): The input data of shape (n, n_features), in model order.
+        index (pandas.Index, optional): The row labels used in the error report. Defaults to None (row positions).
+        original (pandas.DataFrame, optional): The input data before coercion (for the error report). Defaults to
+            None.
+        unparsed (numpy.ndarray, optional): A boolean mask of the values that could not be parsed. Defaults to None.
+
+        Raises:
+        SchemaError: If values could not be parsed or are out of range (all of them are reported).
+
+        Returns:
+        None
+        """
+
+        invalid = self.invalid_cells(values)
+        if invalid is None and (unparsed is None or not unparsed.any()):
+            return
+
+        if invalid is None:
+            invalid = np.zeros(values.shape, dtype=bool)
+        if unparsed is not None:
+            invalid |= unparsed
+
+        (rows, columns) = np.nonzero(invalid)
+        if original is not None:
+            cells = original.to_numpy(dtype=object)[rows, columns]
+        else:
+            cells = values[rows, columns]
+
+        reasons = np.array([f"outside [{lower:g}, {upper:g}]" for (lower, upper) in zip(self.lower, self.upper)],
+                           dtype=object)[columns]
+        reasons[self.binary[columns]] = 'not 0, 1, yes, or no'
+        if unparsed is not None:
+            reasons[unparsed[rows, columns] & ~self.binary[columns]] = 'not a number'
+
+        raise SchemaError(pd.DataFrame({
+            'Row': (np.arange(len(values)) if index is None else np.asarray(index))[rows],
+            'Column': self.features[columns],
+            'Value': cells,
+            'Reason': reasons,
+        }))
+
+    def validate(self, X):
+        """
+        Validate input data and coerce it to the model schema.
+
+        Args:
+        X (pandas.DataFrame): The input data with the features as columns (in any order).
+
+        Raises:
+        KeyError: If columns are unknown or features are missing.
+        SchemaError: If values could not be parsed or are out of range (all of them are reported).
+
+        Returns:
+        pandas.DataFrame: The input data with the columns in model order and the index of X (as float64 if columns
+                          were given as text).
+        """
+
+        self.check_keys(X.columns)
+        X = X[self.features]
+
+        # Numeric data is checked as one array and returned as is
+        if all(pd.api.types.is_numeric_dtype(dtype) for dtype in X.dtypes):
+            self.check_array(X.to_numpy(dtype=np.float64, na_value=np.nan), X.index, X)
+            return X
+
+        values = np.empty(X.shape, dtype=np.float64)
+        unparsed = np.zeros(X.shape, dtype=bool)
+        for j in range(len(self.features)):
+            values[:, j], unparsed[:, j] = self.coerce(X.iloc[:, j], self.binary[j])
+
+        self.check_array(values, X.index, X, unparsed)
+        return pd.DataFrame(values, columns=self.features, index=X.index)
+
+    def validate_subset(self, X):
+        """
+        Validate data with a subset of the features (e.g., the varied features of PODPredictor.what_if) and coerce it
+        to a float64 array.
+
+        Args:
+        X (pandas.DataFrame): The data with some of the features as columns. Missing values are kept.
+
+        Raises:
+        KeyError: If columns are unknown.
+        SchemaError: If values could not be parsed or are out of range (all of them are reported).
+
+        Returns:
+        numpy.ndarray: The data of shape (n, n_features), in model order, with NaN for the features not in X.
+        """
+
+        self.check_keys(X.columns, required=False)
+        X = X.reindex(columns=self.features)
+
+        values = np.empty(X.shape, dtype=np.float64)
+        unparsed = np.zeros(X.shape, dtype=bool)
+        for j in range(len(self.features)):
+            values[:, j], unparsed[:, j] = self.coerce(X.iloc[:, j], self.binary[j])
+
+        self.check_array(values, X.index, X, unparsed)
+        return values
+
+
+# The compiled schema of the model
+SCHEMA = Schema()
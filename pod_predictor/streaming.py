@@ -0,0 +1,352 @@
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from pod_predictor import DEFAULT_VALUES
+from pod_predictor.utils import (_import_pyarrow, arrow_to_pandas, file_format, load_array, load_file,
+                                 preprocess_data, read_arrow_table)
+
+
+class StreamProgress:
+    def __init__(self, offset=0):
+        """
+        Initialize a new StreamProgress instance.
+
+        This class counts the processed rows and chunks of a streaming run and tracks the offset (i.e., the number of
+        input rows already written), from which an interrupted run can be resumed, and the size of a CSV output at
+        that offset.
+
+        Args:
+        offset (int, optional): The number of input rows skipped at the start of the run. Defaults to 0.
+        """
+
+        self.start_offset = offset
+        self.offset = offset
+        self.output_size = None
+        self.rows = 0
+        self.chunks = 0
+        self.start_time = time.perf_counter()
+
+    def update(self, n_rows, output_size=None):
+        """
+        Record a written chunk.
+
+        Args:
+        n_rows (int): The number of rows in the chunk.
+        output_size (int, optional): The size of the output file (in bytes) after the chunk. Defaults to None.
+
+        Returns:
+        None
+        """
+
+        self.rows += n_rows
+        self.chunks += 1
+        self.offset += n_rows
+        self.output_size = output_size
+
+    def to_dict(self):
+        """
+        Export the progress.
+
+        Returns:
+        dict: Offset, output size (in bytes, None for Parquet outputs), processed rows and chunks, elapsed time (in
+              seconds) and throughput (rows per second).
+        """
+
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            'offset': self.offset,
+            'output_size': self.output_size,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'elapsed_s': elapsed,
+            'rows_per_s': self.rows / elapsed if elapsed else 0.0,
+        }
+
+
+class _CSVWriter:
+    def __init__(self, path_to_file, append, size=None):
+        """
+        Initialize a writer appending reports to a CSV file.
+
+        Args:
+        path_to_file (str): The file path of the CSV file.
+        append (bool): Whether to append to an existing file.
+        size (int, optional): The size (in bytes) of the file at the checkpoint of a resumed run. The file is truncated
+            to it, removing the rows written after the checkpoint. Defaults to None.
+        """
+
+        self.path_to_file = path_to_file
+        if append and size is not None and os.path.exists(path_to_file):
+            with open(path_to_file, 'r+b') as file:
+                file.truncate(size)
+        self.header = not (append and os.path.exists(path_to_file))
+        self.mode = 'a' if append else 'w'
+
+    def write(self, report):
+        report.to_csv(self.path_to_file, mode=self.mode, header=self.header, index=False)
+        self.mode, self.header = 'a', False
+        return os.path.getsize(self.path_to_file)
+
+    def close(self):
+        pass
+
+
+class _ParquetWriter:
+    def __init__(self, path_to_file, start_row=0):
+        """
+        Initialize a writer storing reports as numbered part files of a Parquet dataset directory.
+
+        Each report is written to its own part file, named by its first input row, which is moved into place once it
+        is complete. The parts from the start row on (e.g., written after the checkpoint of an interrupted run) are
+        removed, so that a resumed run continues the dataset. The directory can be read with pandas.read_parquet.
+
+        Args:
+        path_to_file (str): The path of the dataset directory.
+        start_row (int, optional): The first input row of the run. Defaults to 0.
+
+        Raises:
+        ImportError: If pyarrow is not installed.
+        FileExistsError: If a run is resumed and the path is a file.
+        """
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError(
+                "Writing Parquet files requires pyarrow. Install it with 'pip install pyarrow'.")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path_to_file = path_to_file
+        self.row = start_row
+
+        if os.path.isfile(path_to_file):
+            if start_row > 0:
+                raise FileExistsError(f"Cannot resume: '{path_to_file}' is a file, not a Parquet dataset directory.")
+            os.remove(path_to_file)
+        os.makedirs(path_to_file, exist_ok=True)
+
+        parts = []
+        for name in sorted(os.listdir(path_to_file)):
+            if name.startswith('.part-'):
+                os.remove(os.path.join(path_to_file, name))  # An incomplete part of an interrupted run
+            elif name.startswith('part-') and name.endswith('.parquet'):
+                if int(name[5:-8]) >= start_row:
+                    os.remove(os.path.join(path_to_file, name))
+                else:
+                    parts.append(name)
+        # The parts of a resumed run keep the schema of the existing parts
+        self.schema = self.pq.read_schema(os.path.join(path_to_file, parts[0])) if parts else None
+
+    def write(self, report):
+        table = self.pa.Table.from_pandas(report, preserve_index=False)
+        if self.schema is None:
+            self.schema = table.schema
+        path = os.path.join(self.path_to_file, f'part-{self.row:012d}.parquet')
+        tmp_path = os.path.join(self.path_to_file, f'.part-{self.row:012d}.parquet.tmp')
+        self.pq.write_table(table.cast(self.schema), tmp_path)
+        os.replace(tmp_path, path)
+        self.row += len(report)
+
+    def close(self):
+        pass
+
+
+def read_checkpoint(checkpoint_path):
+    """
+    Read the offset of an interrupted streaming run from its checkpoint file.
+
+    Args:
+    checkpoint_path (str): The file path of the checkpoint.
+
+    Returns:
+    int: The number of input rows already written (0 if the checkpoint does not exist).
+    """
+
+    return _read_checkpoint(checkpoint_path).get('offset', 0)
+
+
+def _read_checkpoint(checkpoint_path):
+    # The progress saved by write_checkpoint (empty if the checkpoint does not exist)
+    if checkpoint_path is None or not os.path.exists(checkpoint_path):
+        return {}
+    with open(checkpoint_path, 'r') as file:
+        return json.load(file)
+
+
+def write_checkpoint(checkpoint_path, progress):
+    """
+    Write the progress of a streaming run to its checkpoint file.
+
+    The file is replaced atomically, so that an interruption never leaves a partial checkpoint.
+
+    Args:
+    checkpoint_path (str): The file path of the checkpoint.
+    progress (StreamProgress): The progress of the run.
+
+    Returns:
+    None
+    """
+
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(progress.to_dict(), file)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def read_chunks(path_to_file, columns, chunksize=10000, start_row=0):
+    """
+    Read the given columns of a data file in chunks.
+
+    CSV files are parsed chunk by chunk. Parquet files are read by record batches, and Arrow IPC files and NumPy arrays
+    (.npy, in the order of COEFFICIENTS) are memory-mapped and sliced, so that columnar files are not parsed as text and
+    only one chunk is converted at a time.
+
+    Args:
+    path_to_file (str): The file path of the input file (see utils.FILE_FORMATS; JSON files are read at once).
+    columns (list): The names of the columns to read (ignored for NumPy arrays).
+    chunksize (int, optional): The number of rows per chunk. Defaults to 10000.
+    start_row (int, optional): The number of rows to skip. Defaults to 0.
+
+    Yields:
+    pandas.DataFrame: A chunk.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    """
+
+    data_format = file_format(path_to_file)
+
+    if data_format == 'csv':
+        with pd.read_csv(path_to_file, chunksize=chunksize, usecols=lambda key: key in columns,
+                         skiprows=range(1, start_row + 1)) as reader:
+            yield from reader
+        return
+
+    if data_format == 'parquet':
+        pyarrow = _import_pyarrow()
+        if not os.path.exists(path_to_file):
+            raise FileNotFoundError(f"File '{path_to_file}' not found.")
+        parquet_file = pyarrow.parquet.ParquetFile(path_to_file)
+        batches = parquet_file.iter_batches(
+            batch_size=chunksize, columns=[key for key in columns if key in parquet_file.schema_arrow.names])
+        skip = start_row
+        for batch in batches:
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            yield arrow_to_pandas(batch.slice(skip))
+            skip = 0
+        return
+
+    if data_format == 'npy':
+        data = load_array(path_to_file)
+        for start in range(start_row, len(data), chunksize):
+            yield pd.DataFrame(np.array(data[start:start + chunksize], dtype=np.float64),
+                               columns=list(DEFAULT_VALUES.keys()), copy=False)
+        return
+
+    if data_format == 'arrow':
+        data = read_arrow_table(path_to_file, columns)
+        for start in range(start_row, data.num_rows, chunksize):
+            yield arrow_to_pandas(data.slice(start, chunksize))
+        return
+
+    data = load_file(path_to_file, columns)
+    for start in range(start_row, len(data), chunksize):
+        yield data.iloc[start:start + chunksize]
+
+
+def stream_report(model, path_to_file, chunksize=10000, start_row=0, id_column=None):
+    """
+    Read a CSV, Parquet, Arrow IPC or NumPy file in chunks and generate the report for each chunk (see read_chunks).
+
+    Only the feature columns (and the optional ID column) are read. Each chunk is preprocessed, calibrated and
+    explained by PODPredictor.get_report. The reports contain the input row number ('Row') to link them to the input.
+
+    Args:
+    model (PODPredictor): The predictor to use.
+    path_to_file (str): The file path of the input file (columns of data/calibration_template.csv).
+    chunksize (int, optional): The number of rows per chunk. Defaults to 10000.
+    start_row (int, optional): The number of input rows to skip. Defaults to 0.
+    id_column (str, optional): The name of a column to copy into the reports. Defaults to None.
+
+    Yields:
+    pandas.DataFrame: The report of a chunk.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    """
+
+    columns = list(model.default_values.keys())
+    if id_column is not None:
+        columns.append(id_column)
+
+    offset = start_row
+    for chunk in read_chunks(path_to_file, columns, chunksize, start_row):
+        if chunk.empty:
+            continue
+        chunk = chunk.reset_index(drop=True)
+        ids = chunk.pop(id_column) if id_column is not None else None
+        if any(not pd.api.types.is_numeric_dtype(dtype) for dtype in chunk.dtypes):
+            chunk = preprocess_data(chunk)
+        report = model.get_report(chunk)
+
+        report.insert(0, 'Row', np.arange(offset, offset + len(chunk)))
+        if ids is not None:
+            report.insert(1, id_column, ids)
+        offset += len(chunk)
+        yield report
+
+
+def score_file(model, input_path, output_path, chunksize=10000, start_row=None, checkpoint_path=None,
+               id_column=None, callback=None):
+    """
+    Score a (large) CSV, Parquet, Arrow IPC or NumPy file in chunks and write the reports incrementally with bounded
+    memory.
+
+    The output format is selected by the file extension of the output path ('.parquet' for a Parquet dataset directory
+    with one part file per chunk, otherwise CSV). If a checkpoint path is given, the offset (and the size of a CSV
+    output) is saved after each written chunk, and a subsequent call resumes from it. A resumed run first removes the
+    output written after the checkpoint (a CSV output is truncated to the saved size, and later Parquet parts are
+    removed), so that every input row is written exactly once.
+
+    Args:
+    model (PODPredictor): The predictor to use.
+    input_path (str): The file path of the input file (columns of data/calibration_template.csv).
+    output_path (str): The file path of the output file.
+    chunksize (int, optional): The number of rows per chunk. Defaults to 10000.
+    start_row (int, optional): The number of input rows to skip. Defaults to the offset in the checkpoint (or 0).
+    checkpoint_path (str, optional): The file path of the checkpoint. Defaults to None.
+    id_column (str, optional): The name of a column to copy into the reports. Defaults to None.
+    callback (callable, optional): A function called with the StreamProgress after each chunk. Defaults to None.
+
+    Returns:
+    StreamProgress: The progress of the finished run.
+    """
+
+    checkpoint = _read_checkpoint(checkpoint_path)
+    if start_row is None:
+        start_row = checkpoint.get('offset', 0)
+    # The saved output size only applies if the run resumes from the checkpoint
+    output_size = checkpoint.get('output_size') if start_row == checkpoint.get('offset') else None
+
+    if output_path.endswith('.parquet'):
+        writer = _ParquetWriter(output_path, start_row)
+    else:
+        writer = _CSVWriter(output_path, append=start_row > 0, size=output_size)
+
+    progress = StreamProgress(offset=start_row)
+    try:
+        for report in stream_report(model, input_path, chunksize, start_row, id_column):
+            progress.update(len(report), writer.write(report))
+            if checkpoint_path is not None:
+                write_checkpoint(checkpoint_path, progress)
+            if callback is not None:
+                callback(progress)
+    finally:
+        writer.close()
+
+    return progress
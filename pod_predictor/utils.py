@@ -1,51 +1,268 @@
+import json
+import os
+import numpy as np
 import pandas as pd
+from pod_predictor import DEFAULT_VALUES
+from pod_predictor.schema import map_yes_no
 
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.npy': 'npy',
+}
 
-def load_file(path_to_file):
+
+def file_format(path_to_file):
     """
-    Load a CSV file from the specified path and return a DataFrame.
+    Determine the format of a data file from its extension (see FILE_FORMATS).
 
     Args:
-    path_to_file (str): The file path of the CSV file to be loaded.
+    path_to_file (str): The file path.
 
     Returns:
-    pandas.DataFrame: A DataFrame containing the contents of the CSV file.
+    str: The format ('csv', 'json', 'parquet', 'arrow' or 'npy'). Files with other extensions are read as CSV.
+    """
+
+    extension = os.path.splitext(str(path_to_file))[1].lower()
+    return FILE_FORMATS.get(extension, 'csv')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Reading Parquet and Arrow files requires pyarrow. Install it with 'pip install pyarrow'.")
+    return pyarrow
+
+
+def read_arrow_table(path_to_file, columns=None):
+    """
+    Read the given columns of a Parquet or Arrow IPC (Feather) file into an Arrow table.
+
+    Arrow IPC files are memory-mapped. Columns that are not in the file are skipped (so that missing features are
+    reported by the validation of the predictor).
+
+    Args:
+    path_to_file (str): The file path of the Parquet or Arrow IPC file.
+    columns (list, optional): The names of the columns to read. Defaults to None (all columns).
 
     Raises:
     FileNotFoundError: If the file is not found at the provided path.
+    ImportError: If pyarrow is not installed.
+
+    Returns:
+    pyarrow.Table: The columns of the file.
     """
-    try:
-        data = pd.read_csv(path_to_file)
-    except FileNotFoundError:
-        raise
 
+    pyarrow = _import_pyarrow()
+    if not os.path.exists(path_to_file):
+        raise FileNotFoundError(f"File '{path_to_file}' not found.")
+
+    if file_format(path_to_file) == 'parquet':
+        names = pyarrow.parquet.read_schema(path_to_file).names
+        if columns is not None:
+            columns = [key for key in columns if key in names]
+        return pyarrow.parquet.read_table(path_to_file, columns=columns)
+
+    table = pyarrow.feather.read_table(path_to_file, memory_map=True)
+    if columns is not None:
+        table = table.select([key for key in columns if key in table.column_names])
+    return table
+
+
+def arrow_to_pandas(table):
+    """
+    Convert an Arrow table to a DataFrame without consolidating its columns, so that numeric columns without missing
+    values are handed over without a copy.
+
+    Args:
+    table (pyarrow.Table): The table.
+
+    Returns:
+    pandas.DataFrame: The table as a DataFrame.
+    """
+
+    return table.to_pandas(split_blocks=True)
+
+
+def load_file(path_to_file, columns=None):
+    """
+    Load a data file from the specified path and return a DataFrame.
+
+    The format is determined by the file extension (see FILE_FORMATS): CSV, JSON (a dictionary mapping feature names
+    to lists of values), Parquet, Arrow IPC (Feather), or a 2D NumPy array (.npy, memory-mapped) with the columns in
+    the given order.
+
+    Args:
+    path_to_file (str): The file path of the file to be loaded.
+    columns (list, optional): The names of the columns to read (the columns of a NumPy array). Defaults to None (all
+        columns; the features and 'Delirium' for a NumPy array).
+
+    Returns:
+    pandas.DataFrame: A DataFrame containing the contents of the file.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    ValueError: If a NumPy array does not have one column per name.
+    """
+
+    data_format = file_format(path_to_file)
+
+    if data_format == 'csv':
+        usecols = None if columns is None else (lambda key: key in columns)
+        return pd.read_csv(path_to_file, usecols=usecols)
+
+    if data_format == 'json':
+        with open(path_to_file, 'r') as file:
+            data = pd.DataFrame(preprocess_json(json.load(file)))
+        return data if columns is None else data[[key for key in columns if key in data.columns]]
+
+    if data_format == 'npy':
+        columns = list(DEFAULT_VALUES.keys()) + ['Delirium'] if columns is None else columns
+        return pd.DataFrame(load_array(path_to_file, n_columns=len(columns)), columns=columns, copy=False)
+
+    return arrow_to_pandas(read_arrow_table(path_to_file, columns))
+
+
+def load_array(path_to_file, n_columns=len(DEFAULT_VALUES)):
+    """
+    Load a 2D NumPy array (.npy) memory-mapped, so that rows are only read when they are accessed.
+
+    Args:
+    path_to_file (str): The file path of the .npy file.
+    n_columns (int, optional): The expected number of columns. Defaults to the number of features.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    ValueError: If the array does not have the shape (n, n_columns).
+
+    Returns:
+    numpy.memmap: The array.
+    """
+
+    X = np.load(path_to_file, mmap_mode='r')
+    X = X.reshape(1, -1) if X.ndim == 1 else X
+    if X.ndim != 2 or X.shape[1] != n_columns:
+        raise ValueError(
+            f"Expected an array with shape (n, {n_columns}) in '{path_to_file}', but got shape {X.shape} instead.")
+    return X
+
+
+def load_input(path_to_file):
+    """
+    Load input data for prediction from a file, reading only the feature columns.
+
+    NumPy arrays (.npy) are returned memory-mapped, with the columns in the order of COEFFICIENTS. The columns of
+    Parquet and Arrow IPC files are handed over from Arrow without text parsing (and without a copy for numeric
+    columns without missing values). 'yes'/'no' values are converted to 1/0.
+
+    Args:
+    path_to_file (str): The file path of the input file (see FILE_FORMATS).
+
+    Returns:
+    numpy.ndarray or pandas.DataFrame: The input data.
+
+    Raises:
+    FileNotFoundError: If the file is not found at the provided path.
+    ValueError: If a NumPy array has incorrect dimensions.
+    """
+
+    if file_format(path_to_file) == 'npy':
+        return load_array(path_to_file)
+
+    data = load_file(path_to_file, columns=list(DEFAULT_VALUES.keys()))
+    if any(not pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes):
+        data = preprocess_data(data)
     return data
 
 
-def preprocess_data(data):
+def preprocess_data(data, diagnoses=None, patient_column='Patient', code_column='Code'):
     """
-    Preprocess data by converting 'yes'/'no' to 1/0.
+    Preprocess data by converting 'yes'/'no' to 1/0 and, optionally, calculating the multimorbidity score from
+    diagnoses (see multimorbidity.add_multimorbidity).
 
     Args:
     data (pandas.DataFrame): The DataFrame containing the data to be preprocessed.
+    diagnoses (pandas.DataFrame, str, or iterable, optional): A long-format table with one row per diagnosis (patient
+        ID and ICD-10 code), or the path of a file containing it. Defaults to None.
+    patient_column (str, optional): The name of the patient ID column. Defaults to 'Patient'.
+    code_column (str, optional): The name of the diagnosis code column. Defaults to 'Code'.
 
     Returns:
     pandas.DataFrame: A DataFrame containing the preprocessed data.
     """
-    # TO DO: Implement option that calculates the multimorbidity score from diagnoses.
-    data = data.replace(
-        {'yes': 1, 'Yes': 1, 'YES': 1, 'no': 0, 'No': 0, 'NO': 0})
+
+    # Only the columns given as text are converted
+    data = data.assign(**{key: map_yes_no(data[key]) for key in data.columns
+                          if not pd.api.types.is_numeric_dtype(data[key].dtype)})
+    if diagnoses is not None:
+        from pod_predictor.multimorbidity import add_multimorbidity
+        data = add_multimorbidity(data, diagnoses, patient_column, code_column)
     return data
 
 
+def preprocess_json(X_test):
+    """
+    Preprocess test data parsed from JSON by converting missing values to NaN.
+
+    Args:
+    X_test (dict): A dictionary mapping feature names to lists of values, where None denotes a missing value.
+
+    Returns:
+    dict: A dictionary containing the preprocessed test data (float arrays, or object arrays if a value is not
+          numeric, which are coerced by PODPredictor.preprocess_input).
+    """
+    for key in X_test:
+        values = [None] if X_test[key] == [] else X_test[key]
+        try:
+            # None is converted to NaN by numpy
+            X_test[key] = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            # None is treated as missing by pandas
+            X_test[key] = np.array(values, dtype=object)
+
+    return X_test
+
+
+def variant_grid(variants):
+    """
+    Build the table of variants of the input features for what-if scoring (see PODPredictor.what_if).
+
+    Args:
+    variants (dict or pandas.DataFrame): A dictionary mapping features to lists of values, whose Cartesian product is
+        the grid of variants (e.g., {'Pre-OP Benzodiazepines (Yes/No)': [0, 1], 'Estimated Cut-to-Suture Time
+        (minutes)': [60, 90, 120]} for 6 variants), or a DataFrame with one variant per row. A missing value keeps the
+        value of the patient.
+
+    Returns:
+    pandas.DataFrame: The variants, one per row, with the varied features as columns.
+    """
+
+    if isinstance(variants, pd.DataFrame):
+        return variants
+    if not variants:
+        # A single variant without changes
+        return pd.DataFrame(index=pd.RangeIndex(1))
+    return pd.MultiIndex.from_product([list(values) for values in variants.values()],
+                                      names=list(variants.keys())).to_frame(index=False)
+
+
 def load_data(path_to_file):
     """
-    Load, preprocess, and normalize data from a CSV file.
+    Load, preprocess, and normalize data from a CSV, JSON, Parquet, Arrow IPC or NumPy file (see load_file).
 
-    This function loads a CSV file, preprocesses the data by converting specified string values to integers, and returns the processed DataFrame.
+    This function loads a data file, preprocesses the data by converting specified string values to integers, and returns the processed DataFrame.
 
     Args:
-    path_to_file (str): The file path of the CSV file to be loaded.
+    path_to_file (str): The file path of the file to be loaded.
 
     Returns:
     pandas.DataFrame: A DataFrame containing the preprocessed data.
@@ -58,12 +275,36 @@ def load_data(path_to_file):
     return data
 
 
+class PreparedBatch:
+    def __init__(self, normalized, imputed, draws=None):
+        """
+        Initialize a new PreparedBatch instance.
+
+        This class holds input data that has already been validated, normalized and imputed (see
+        PODPredictor.prepare), so that it is not preprocessed again by every prediction method.
+
+        Args:
+        normalized (pandas.DataFrame): The normalized input data without imputation (used for feature importance).
+        imputed (pandas.DataFrame): The normalized input data with missing values imputed.
+        draws (numpy.ndarray, optional): The draws of a multiple imputation of shape (n_imputations, n, 15). Defaults
+            to None (single imputation).
+        """
+
+        self.normalized = normalized
+        self.imputed = imputed
+        self.draws = draws
+
+    def __len__(self):
+        return len(self.imputed)
+
+
 def preprocess(func):
     """
     Decorator to preprocess the input data before applying a method if the data is not the calibration set.
 
     This decorator checks if the input data is the calibration set (i.e., self.X). If not, it preprocesses the data using
-    `self.preprocess_input` and `self.impute` methods before applying the decorated function.
+    `self.preprocess_input` and `self.impute` methods before applying the decorated function. Input data that was
+    already prepared (i.e., a PreparedBatch) is not preprocessed again.
 
     Args:
     func: The method to be decorated.
@@ -73,7 +314,9 @@ def preprocess(func):
     """
 
     def wrapper(self, X, *args, **kwargs):
-        if not hasattr(self, 'X') or X is not self.X:
+        if isinstance(X, PreparedBatch):
+            X = X.normalized if func.__name__ == "feature_importance" else X.imputed
+        elif not hasattr(self, 'X') or X is not self.X:
             X = self.preprocess_input(X)
             if func.__name__ == "feature_importance":
                 X = self.normalize(X)
@@ -0,0 +1,43 @@
+import argparse
+from pod_predictor.registry import get_predictor
+from pod_predictor.streaming import score_file
+
+
+def main():
+    """
+    Parse the command line arguments and score a data file in chunks, printing the progress after each chunk.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Streaming POD prediction for large data files.')
+    parser.add_argument('input', help='CSV, Parquet, Arrow IPC or .npy file with the columns of '
+                                      'data/calibration_template.csv')
+    parser.add_argument('output', help='Output file (.csv) or Parquet dataset directory (.parquet)')
+    parser.add_argument('--calibration-file', default='./data/calibration.csv')
+    parser.add_argument('--calibration', default='va', choices=['none', 'platt', 'va'])
+    parser.add_argument('--imputation', default='none', choices=['none', 'knn', 'iterative'])
+    parser.add_argument('--chunksize', type=int, default=10000)
+    parser.add_argument('--start-row', type=int, default=None)
+    parser.add_argument('--checkpoint', default=None, help='Checkpoint file to save and resume the offset')
+    parser.add_argument('--id-column', default=None)
+    args = parser.parse_args()
+
+    model = get_predictor(
+        path_to_file=args.calibration_file,
+        calibration=None if args.calibration == 'none' else args.calibration,
+        imputation=None if args.imputation == 'none' else args.imputation
+    )
+
+    def print_progress(progress):
+        progress = progress.to_dict()
+        print(f"offset {progress['offset']}: {progress['rows']} rows in {progress['elapsed_s']:.1f} s "
+              f"({progress['rows_per_s']:.0f} rows/s)", flush=True)
+
+    score_file(model, args.input, args.output, chunksize=args.chunksize, start_row=args.start_row,
+               checkpoint_path=args.checkpoint, id_column=args.id_column, callback=print_progress)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pod_predictor.batching import MicroBatcher
+from pod_predictor.registry import get_predictor
+from pod_predictor.utils import preprocess_json
+
+
+def report_to_records(report):
+    """
+    Convert a report DataFrame to JSON-serializable records.
+
+    Args:
+    report (pandas.DataFrame): The report generated by PODPredictor.get_report.
+
+    Returns:
+    list: A list of dictionaries (one per patient), with missing values as None.
+    """
+
+    report = report.astype(object).where(report.notna(), None)
+    return report.to_dict(orient='records')
+
+
+def make_handler(model, batcher):
+    """
+    Create a request handler class for the scoring service.
+
+    The handler accepts POST requests to '/predict' with test data in the format of data/X_test_template.json and
+    answers with the reports of the patients. Requests are validated individually and scored in micro-batches.
+    GET '/metrics' returns the throughput and latency metrics, GET '/health' a simple status.
+
+    Args:
+    model (PODPredictor): The predictor used for validation.
+    batcher (MicroBatcher): The micro-batcher wrapping PODPredictor.get_report.
+
+    Returns:
+    type: The request handler class.
+    """
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def send_json(self, status, content):
+            body = json.dumps(content).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self.send_json(200, batcher.metrics.to_dict())
+            elif self.path == '/health':
+                self.send_json(200, {'status': 'ok'})
+            else:
+                self.send_json(404, {'error': f"Unknown path '{self.path}'."})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self.send_json(404, {'error': f"Unknown path '{self.path}'."})
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                X_test = preprocess_json(json.loads(self.rfile.read(length)))
+                X_test = model.preprocess_input(X_test)
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                self.send_json(400, {'error': str(e)})
+                return
+
+            try:
+                report = batcher(X_test)
+            except Exception as e:
+                self.send_json(500, {'error': str(e)})
+                return
+
+            self.send_json(200, {'predictions': report_to_records(report)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def make_server(host='127.0.0.1', port=8000, path_to_file='./data/calibration.csv', calibration='va',
+                imputation=None, max_batch_size=64, max_wait=0.005):
+    """
+    Create the local scoring service.
+
+    Args:
+    host (str, optional): The host to bind to. Defaults to '127.0.0.1'.
+    port (int, optional): The port to bind to (0 selects a free port). Defaults to 8000.
+    path_to_file (str, optional): The file path of the calibration dataset. Defaults to './data/calibration.csv'.
+    calibration (str, optional): The calibration method to use. Can be None, 'platt', or 'va'. Defaults to 'va'.
+    imputation (str, optional): The imputation method to use. Can be None, 'knn', or 'iterative'. Defaults to None.
+    max_batch_size (int, optional): The maximal number of patients per micro-batch. Defaults to 64.
+    max_wait (float, optional): The maximal time (in seconds) to wait for further requests. Defaults to 0.005.
+
+    Returns:
+    tuple: The HTTP server and the micro-batcher.
+    """
+
+    model = get_predictor(path_to_file=path_to_file,
+                          calibration=calibration, imputation=imputation)
+    batcher = MicroBatcher(model.get_report, max_batch_size=max_batch_size, max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), make_handler(model, batcher))
+    server.daemon_threads = True
+    return server, batcher
+
+
+def main():
+    """
+    Parse the command line arguments and run the local scoring service until interrupted.
+
+    Returns:
+    None
+    """
+
+    parser = argparse.ArgumentParser(description='Local HTTP scoring service for POD prediction.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--calibration-file', default='./data/calibration.csv')
+    parser.add_argument('--calibration', default='va', choices=['none', 'platt', 'va'])
+    parser.add_argument('--imputation', default='none', choices=['none', 'knn', 'iterative'])
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    server, batcher = make_server(
+        host=args.host,
+        port=args.port,
+        path_to_file=args.calibration_file,
+        calibration=None if args.calibration == 'none' else args.calibration,
+        imputation=None if args.imputation == 'none' else args.imputation,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000
+    )
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
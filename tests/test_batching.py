@@ -0,0 +1,35 @@
+import asyncio
+import pandas as pd
+from pod_predictor.aio import AsyncPredictor
+from pod_predictor.batching import MicroBatcher
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import load_data
+
+
+def inputs():
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(5)
+    X.index = ['a', 'b', 'c', 'd', 'e']
+    return [X.iloc[:2], X.iloc[2:]]
+
+
+def test_micro_batched_reports_keep_the_index():
+    model = PODPredictor(calibration='va')
+    batcher = MicroBatcher(model.get_report, max_batch_size=64, max_wait=0.05)
+    try:
+        futures = [batcher.submit(model.preprocess_input(X)) for X in inputs()]
+        for (X, future) in zip(inputs(), futures):
+            pd.testing.assert_frame_equal(future.result(), model.get_report(X))
+    finally:
+        batcher.close()
+    assert batcher.metrics.to_dict()['batches'] == 1
+
+
+def test_async_reports_keep_the_index():
+    model = PODPredictor(calibration='va')
+
+    async def score():
+        async with AsyncPredictor(model, max_wait=0.05) as predictor:
+            return await asyncio.gather(*(predictor.get_report(X) for X in inputs()))
+
+    for (X, report) in zip(inputs(), asyncio.run(score())):
+        pd.testing.assert_frame_equal(report, model.get_report(X))
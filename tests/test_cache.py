@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import load_data
+
+
+@pytest.mark.parametrize('calibration', [None, 'va'])
+def test_cached_report_matches_uncached_report(calibration):
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(4)
+    X.index = ['a', 'b', 'c', 'd']
+    model = PODPredictor(calibration=calibration)
+    cached = PODPredictor(calibration=calibration, cache_size=16)
+    expected = model.get_report(X)
+
+    # The first call computes all rows, the second looks them up (the other rows are mixed in to test the order)
+    pd.testing.assert_frame_equal(cached.get_report(X.iloc[[0, 2]]), expected.iloc[[0, 2]])
+    pd.testing.assert_frame_equal(cached.get_report(X), expected)
+    np.testing.assert_array_equal(cached.predict_proba(X), model.predict_proba(X))
+    assert cached.cache.hits == 2
+
+
+def test_cached_input_is_validated_once(monkeypatch):
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(4)
+    model = PODPredictor(cache_size=16)
+    calls = []
+    preprocess_input = model.preprocess_input
+    monkeypatch.setattr(model, 'preprocess_input', lambda X_test: calls.append(1) or preprocess_input(X_test))
+
+    model.get_report(X)
+    model.predict_proba(X)
+    assert len(calls) == 2
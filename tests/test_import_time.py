@@ -0,0 +1,9 @@
+import pytest
+from benchmarks.import_time import ALLOWED_MODULES, SCENARIO_CODE, measure_scenario
+
+
+@pytest.mark.parametrize('name', list(SCENARIO_CODE))
+def test_scenarios_only_import_allowed_modules(name):
+    # The time budgets depend on the machine and are checked by 'python -m benchmarks.import_time'
+    result = measure_scenario(SCENARIO_CODE[name], repeats=1)
+    assert set(result['modules']) <= set(ALLOWED_MODULES[name])
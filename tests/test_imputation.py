@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from pod_predictor.imputation import NearestNeighbourImputer
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import load_data
+
+
+def calibration_data():
+    model = PODPredictor()
+    X = model.normalize(load_data('./data/calibration.csv').drop(['Delirium'], axis=1)).to_numpy()
+    rng = np.random.default_rng(1)
+    (fit_X, X_test) = (X.copy(), X.copy())
+    fit_X[rng.random(X.shape) < 0.1] = np.nan
+    X_test[rng.random(X.shape) < 0.3] = np.nan
+    return fit_X, X_test
+
+
+def test_matches_sklearn_knn_imputer():
+    from sklearn.impute import KNNImputer
+    from sklearn.metrics.pairwise import nan_euclidean_distances
+
+    (fit_X, X_test) = calibration_data()
+    imputed = NearestNeighbourImputer(n_neighbors=5).fit(fit_X).transform(X_test)
+    expected = KNNImputer(n_neighbors=5).fit(fit_X).transform(X_test)
+
+    # sklearn breaks ties between the 5th and 6th donor arbitrarily, so these cells are not compared
+    dist = nan_euclidean_distances(X_test, fit_X)
+    compared = 0
+    for (i, j) in np.argwhere(np.isnan(X_test)):
+        donors = np.sort(dist[i, ~np.isnan(fit_X[:, j]) & ~np.isnan(dist[i])])
+        if len(donors) > 5 and donors[5] - donors[4] < 1e-6:
+            continue
+        np.testing.assert_allclose(imputed[i, j], expected[i, j], rtol=0, atol=1e-12)
+        compared += 1
+    assert compared > 0.9 * np.isnan(X_test).sum()
+
+
+def test_rows_are_imputed_independently_of_the_batch():
+    (fit_X, X_test) = calibration_data()
+    imputer = NearestNeighbourImputer(n_neighbors=5).fit(fit_X)
+
+    batch = imputer.transform(X_test)
+    single = np.vstack([imputer.transform(X_test[i:i + 1]) for i in range(len(X_test))])
+    np.testing.assert_array_equal(single, batch)
+    np.testing.assert_array_equal(imputer.transform(X_test[::-1])[::-1], batch)
+
+
+@pytest.mark.parametrize('n_rows', [1, 50])
+def test_tree_search_matches_brute_force(n_rows):
+    (fit_X, X_test) = calibration_data()
+    brute_force = NearestNeighbourImputer(n_neighbors=5).fit(fit_X)
+    tree = NearestNeighbourImputer(n_neighbors=5, brute_force_max=0).fit(fit_X)
+
+    np.testing.assert_array_equal(tree.transform(X_test[:n_rows]), brute_force.transform(X_test[:n_rows]))
+
+
+def test_ties_are_broken_by_row_index():
+    # The first three rows are at the same distance from the test row; the first two are selected
+    fit_X = np.array([[1.0, 0.0], [1.0, 2.0], [1.0, 4.0], [5.0, 8.0]])
+    for brute_force_max in (1000, 0):
+        imputer = NearestNeighbourImputer(n_neighbors=2, brute_force_max=brute_force_max).fit(fit_X)
+        assert imputer.transform(np.array([[0.0, np.nan]]))[0, 1] == 1.0
+
+
+def test_fitted_iterative_states_are_bounded(monkeypatch):
+    from pod_predictor import imputation
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("The forests are fitted in a process pool by default.")
+
+    monkeypatch.setattr(imputation, '_fitted_states', imputation.OrderedDict())
+    monkeypatch.setattr(imputation, 'ProcessPoolExecutor', no_pool)
+    X = np.random.default_rng(0).normal(size=(40, 3))
+    X[::4, 0] = np.nan
+
+    for seed in range(imputation.MAX_FITTED_STATES + 2):
+        imputation.IterativeImputer(n_imputations=2, max_iter=1, n_estimators=2, random_state=seed).fit(X)
+    assert len(imputation._fitted_states) == imputation.MAX_FITTED_STATES
+    assert [key[-1] for key in imputation._fitted_states] == [2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('calibration', ['platt', 'va'])
+def test_iterative_rows_are_imputed_independently_of_the_batch(calibration):
+    import pandas as pd
+
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(3).reset_index(drop=True)
+    X.iloc[0, 1] = np.nan  # One missing value
+    X.iloc[1, [1, 2]] = np.nan  # Two missing values
+    model = PODPredictor(calibration=calibration, imputation='iterative')
+
+    batch = model.get_report(X)
+    single = pd.concat([model.get_report(X.iloc[[i]]) for i in range(len(X))])
+    pd.testing.assert_frame_equal(single, batch)
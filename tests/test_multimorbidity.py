@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from pod_predictor.inference import PODPredictor
+from pod_predictor.multimorbidity import multimorbidity_scores
+from pod_predictor.utils import load_data, preprocess_data
+
+
+def diagnoses():
+    return pd.DataFrame({
+        'Patient': ['a', 'a', 'a', 'b', 'b', 'c'],
+        'Code': ['I21.0', 'K70.3', 'k70.4', 'E11.9', 'E11.21 G', 'Z00'],
+    })
+
+
+def test_scores_follow_the_modified_cci():
+    scores = multimorbidity_scores(diagnoses())
+    # a: myocardial infarction (1) and severe liver disease (3); b: diabetes with complications (2); c: none
+    assert scores.to_dict() == {'a': 4, 'b': 2, 'c': 0}
+
+
+def test_get_report_on_preprocessed_data():
+    data = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(3).reset_index(drop=True)
+    data.insert(0, 'Patient', ['a', 'b', 'd'])
+    data = preprocess_data(data, diagnoses())
+
+    model = PODPredictor(calibration='va')
+    report = model.get_report(data)
+
+    assert report.shape == (3, 18)
+    assert list(report.index) == ['a', 'b', 'd']
+    assert not report['Delirium Probability'].isna().any()
+    assert not report['Confidence Interval (lower bound)'].isna().any()
+    assert report['Multimorbidity (score)'].notna().all()
+    # The calculated scores are used ('d' has no diagnoses and keeps its score)
+    expected = model.get_report(data.reset_index(drop=True))
+    np.testing.assert_array_equal(report.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+    original = load_data('./data/calibration.csv')['Multimorbidity (score)'].iloc[2]
+    assert list(data['Multimorbidity (score)']) == [4, 2, original]
@@ -0,0 +1,16 @@
+import numpy as np
+from pod_predictor.inference import PODPredictor
+from pod_predictor.multisite import MultiSitePredictor
+from pod_predictor.utils import load_data
+
+
+def test_frame_keeps_the_patient_labels():
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(3)
+    X.index = ['p1', 'p2', 'p3']
+    model = MultiSitePredictor({'Ulm': './data/calibration.csv', 'Berlin': './data/calibration.csv'})
+
+    frame = model.to_frame(X)
+    assert list(frame['Patient']) == ['p1', 'p1', 'p2', 'p2', 'p3', 'p3']
+    report = PODPredictor(calibration='va').get_report(X)
+    np.testing.assert_allclose(frame.loc[frame['Site'] == 'Ulm', 'Delirium Probability'],
+                               report['Delirium Probability'], rtol=0, atol=1e-12)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pod_predictor import core
+from pod_predictor.inference import PODPredictor
+from pod_predictor.parallel import ParallelPredictor, _share_arrays
+from pod_predictor.utils import load_data
+
+
+def data_with_missing_values():
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1)
+    values = core.as_array(X)
+    rng = np.random.default_rng(0)
+    values[rng.random(values.shape) < 0.2] = np.nan
+    return pd.DataFrame(values, columns=X.columns, index=[f'patient {i}' for i in range(len(X))])
+
+
+@pytest.mark.parametrize('imputation', [None, 'knn', 'iterative'])
+@pytest.mark.parametrize('calibration', [None, 'platt', 'va'])
+def test_matches_serial_predictor(calibration, imputation):
+    X = data_with_missing_values()
+    model = PODPredictor(calibration=calibration, imputation=imputation)
+
+    with ParallelPredictor(model, n_jobs=2, chunksize=40) as parallel:
+        np.testing.assert_array_equal(parallel.predict_proba(X), model.predict_proba(X))
+        pd.testing.assert_frame_equal(parallel.get_report(X), model.get_report(X))
+
+
+def test_imputation_trees_are_not_pickled(tmp_path):
+    model = PODPredictor(imputation='knn')
+    model.imputer.brute_force_max = 0
+    model.imputer.fit(model.imputer.fit_X)
+    assert model.imputer.trees
+
+    (template, shared) = _share_arrays(model, str(tmp_path))
+    assert template.imputer.trees == {}
+    assert ('imputer', 'fit_X') in shared
+    assert model.imputer.trees
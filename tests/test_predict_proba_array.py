@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from pod_predictor import core
+from pod_predictor.artifact import load_model, save_model
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import load_data
+
+
+def data_with_missing_values():
+    X = core.as_array(load_data('./data/calibration.csv').drop(['Delirium'], axis=1))
+    rng = np.random.default_rng(0)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    return X
+
+
+@pytest.mark.parametrize('imputation', [None, 'knn'])
+@pytest.mark.parametrize('calibration', [None, 'platt', 'va'])
+def test_array_path_matches_predict_proba(calibration, imputation):
+    X = data_with_missing_values()
+    model = PODPredictor(calibration=calibration, imputation=imputation)
+
+    np.testing.assert_array_equal(model.predict_proba_array(X.copy()), model.predict_proba(X.copy()))
+
+
+@pytest.mark.parametrize('imputation', [None, 'knn'])
+@pytest.mark.parametrize('calibration', [None, 'platt', 'va'])
+def test_compiled_model_matches_predict_proba(calibration, imputation, tmp_path):
+    X = data_with_missing_values()
+    model = PODPredictor(calibration=calibration, imputation=imputation)
+    save_model(model, str(tmp_path / 'model.pod'))
+
+    compiled = load_model(str(tmp_path / 'model.pod'))
+    np.testing.assert_allclose(compiled.predict_proba(X.copy()), model.predict_proba(X.copy()), rtol=0, atol=1e-12)
+
+
+def test_normalized_default_values():
+    model = PODPredictor()
+    np.testing.assert_array_equal(model.normalized_default_array, list(model.normalized_default_values.values()))
+    np.testing.assert_array_equal(core.predict_proba(data_with_missing_values()),
+                                  model.predict_proba(data_with_missing_values()))
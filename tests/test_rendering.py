@@ -0,0 +1,37 @@
+import io
+import pandas as pd
+import pytest
+from pod_predictor.inference import PODPredictor
+from pod_predictor.rendering import render_reports, render_table
+from pod_predictor.utils import load_data
+
+
+def report(index=None):
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(3).reset_index(drop=True)
+    if index is not None:
+        X.index = index
+    return PODPredictor(calibration='va').get_report(X)
+
+
+def test_table_keeps_the_report_index():
+    assert list(render_table(report(['p1', 'p2', 'p3'])).index) == ['p1', 'p2', 'p3']
+
+
+@pytest.mark.parametrize('output_format', ['text', 'csv', 'jsonl'])
+def test_patients_are_labelled_by_the_report_index(output_format):
+    file = io.StringIO()
+    render_reports(report(pd.Index(['p1', 'p2', 'p3'], name='Patient ID')), file, output_format)
+    lines = file.getvalue().splitlines()
+
+    if output_format == 'jsonl':
+        assert [pd.read_json(io.StringIO(line), typ='series')['Patient ID'] for line in lines] == ['p1', 'p2', 'p3']
+    else:
+        assert lines[0].split()[0].startswith('Patient')
+        assert [line.lstrip().split(',' if output_format == 'csv' else ' ')[0] for line in lines[1:]] == [
+            'p1', 'p2', 'p3']
+
+
+def test_default_index_is_numbered_across_chunks():
+    file = io.StringIO()
+    render_reports([report(), report()], file, 'csv')
+    assert [line.split(',')[0] for line in file.getvalue().splitlines()] == ['Row', '0', '1', '2', '3', '4', '5']
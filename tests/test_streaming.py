@@ -0,0 +1,59 @@
+import os
+import pandas as pd
+import pytest
+from pod_predictor import streaming
+from pod_predictor.inference import PODPredictor
+from pod_predictor.streaming import score_file
+
+INPUT = './data/calibration.csv'
+
+
+class Interrupted(Exception):
+    pass
+
+
+def read_output(path):
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.parquet'])
+@pytest.mark.parametrize('after_checkpoint', [True, False])
+def test_interrupted_run_resumes_exactly(extension, after_checkpoint, tmp_path, monkeypatch):
+    model = PODPredictor(calibration='va')
+    expected_path = str(tmp_path / f'expected{extension}')
+    score_file(model, INPUT, expected_path, chunksize=40)
+    expected = read_output(expected_path)
+
+    # The run is interrupted in the third chunk, either after its checkpoint or between writing and checkpointing
+    output_path, checkpoint_path = str(tmp_path / f'report{extension}'), str(tmp_path / 'checkpoint.json')
+    write_checkpoint = streaming.write_checkpoint
+
+    def interrupt(path, progress):
+        if progress.chunks == 3 and not after_checkpoint:
+            raise Interrupted()
+        write_checkpoint(path, progress)
+        if progress.chunks == 3:
+            raise Interrupted()
+
+    monkeypatch.setattr(streaming, 'write_checkpoint', interrupt)
+    with pytest.raises(Interrupted):
+        score_file(model, INPUT, output_path, chunksize=40, checkpoint_path=checkpoint_path)
+    monkeypatch.setattr(streaming, 'write_checkpoint', write_checkpoint)
+
+    progress = score_file(model, INPUT, output_path, chunksize=40, checkpoint_path=checkpoint_path)
+    assert progress.start_offset == (120 if after_checkpoint else 80)
+
+    resumed = read_output(output_path)
+    assert len(resumed) == len(expected) == 173
+    assert list(resumed['Row']) == list(range(173))
+    pd.testing.assert_frame_equal(resumed, expected)
+
+
+def test_fresh_parquet_run_replaces_the_dataset(tmp_path):
+    model = PODPredictor()
+    output_path = str(tmp_path / 'report.parquet')
+    score_file(model, INPUT, output_path, chunksize=40)
+    score_file(model, INPUT, output_path, chunksize=100)
+
+    assert sorted(os.listdir(output_path)) == ['part-000000000000.parquet', 'part-000000000100.parquet']
+    assert len(read_output(output_path)) == 173
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pod_predictor.calibration import VennAbersIndex
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import load_data
+
+
+def new_cases(n):
+    data = load_data('./data/calibration.csv').iloc[::-1].head(n).reset_index(drop=True)
+    return data.drop(['Delirium'], axis=1), data['Delirium'].to_numpy()
+
+
+def assert_same_index(index, expected):
+    np.testing.assert_array_equal(index.c, expected.c)
+    np.testing.assert_allclose(index.weights, expected.weights, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(index.label_weights, expected.label_weights, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(index.p0, expected.p0, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(index.p1, expected.p1, rtol=0, atol=1e-12)
+
+
+def fresh_index(model):
+    # A Venn-ABERS index fitted from scratch on the retained calibration set (re-scoring the retained cases may differ
+    # from their stored scores by an ulp, which would split equal scores)
+    np.testing.assert_allclose(model.scores, model.naive_proba(model.X)[:, 1], rtol=0, atol=1e-12)
+    return VennAbersIndex(np.column_stack((1 - model.scores, model.scores)), model.y, sample_weight=model.sample_weight)
+
+
+@pytest.mark.parametrize('window, n_new', [(100, 40), (100, 150), (10, 83), (None, 30)])
+def test_window_matches_fresh_fit(window, n_new):
+    model = PODPredictor(calibration='va')
+    (X_new, y_new) = new_cases(n_new)
+    model.update(X_new, y_new, window=window)
+
+    expected_size = min(window, 173 + n_new) if window is not None else 173 + n_new
+    assert len(model.y) == len(model.X) == len(model.scores) == expected_size
+    assert model.calibrator.weights.sum() == pytest.approx(expected_size)
+    assert_same_index(model.calibrator, fresh_index(model))
+
+
+@pytest.mark.parametrize('decay', [None, 0.5])
+def test_repeated_updates_match_fresh_fit(decay):
+    data = load_data('./data/calibration.csv')
+    rng = np.random.default_rng(0)
+    model = PODPredictor(calibration='va')
+    for _ in range(4):
+        cases = data.iloc[rng.choice(len(data), 30)].reset_index(drop=True)
+        model.update(cases.drop(['Delirium'], axis=1), cases['Delirium'].to_numpy(), window=100, decay=decay)
+
+    assert len(model.y) == 100
+    assert model.calibrator.weights.sum() == pytest.approx(model.sample_weight.sum())
+    assert_same_index(model.calibrator, fresh_index(model))
+
+
+@pytest.mark.parametrize('window', [None, 100])
+def test_decay_matches_fresh_fit(window):
+    model = PODPredictor(calibration='va')
+    for n_new in (20, 30):
+        (X_new, y_new) = new_cases(n_new)
+        model.update(X_new, y_new, window=window, decay=0.5)
+
+    assert model.calibrator.weights.sum() == pytest.approx(model.sample_weight.sum())
+    assert model.calibrator.label_weights.sum() == pytest.approx(model.sample_weight[model.y.astype(bool)].sum())
+    assert_same_index(model.calibrator, fresh_index(model))
+
+
+def test_updated_predictions_match_fresh_predictor(tmp_path):
+    model = PODPredictor(calibration='va')
+    (X_new, y_new) = new_cases(50)
+    model.update(X_new, y_new, window=120)
+
+    data = pd.concat([model.data, pd.concat([X_new, pd.Series(y_new, name='Delirium')], axis=1)],
+                     ignore_index=True).tail(120)
+    data.to_csv(tmp_path / 'calibration.csv', index=False)
+    fresh = PODPredictor(path_to_file=str(tmp_path / 'calibration.csv'), calibration='va')
+
+    (X_test, _) = new_cases(60)
+    np.testing.assert_array_equal(model.predict_proba(X_test), fresh.predict_proba(X_test))
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from pod_predictor.inference import PODPredictor
+from pod_predictor.utils import load_data
+
+
+@pytest.mark.parametrize('calibration', [None, 'platt', 'va'])
+def test_variants_match_predict_proba(calibration):
+    X = load_data('./data/calibration.csv').drop(['Delirium'], axis=1).head(20).reset_index(drop=True)
+    model = PODPredictor(calibration=calibration)
+    ages = [600, 900]
+
+    (proba, p0_p1) = model.what_if(X, {'Age (months)': ages}, p0_p1_output=True)
+    assert proba.shape == (20, 2) and p0_p1.shape == (20, 2, 2)
+    for (k, age) in enumerate(ages):
+        varied = X.assign(**{'Age (months)': age})
+        np.testing.assert_allclose(proba[:, k], model.predict_proba(varied)[:, 1], rtol=0, atol=1e-9)
+        if calibration == 'va':
+            expected = model.calibrator.predict_proba(model.naive_proba(varied), p0_p1_output=True)[1]
+            np.testing.assert_allclose(p0_p1[:, k], expected, rtol=0, atol=1e-9)
+
+
+def test_venn_abers_calibrates_scores_of_any_shape():
+    model = PODPredictor(calibration='va')
+    scores = np.linspace(0.05, 0.95, 12).reshape(3, 4)
+
+    (p, p0_p1) = model.calibrator.calibrate(scores)
+    (expected, expected_p0_p1) = model.calibrator.predict_proba(
+        np.column_stack((1 - scores.ravel(), scores.ravel())), p0_p1_output=True)
+    np.testing.assert_array_equal(p, expected[:, 1].reshape(3, 4))
+    np.testing.assert_array_equal(p0_p1, expected_p0_p1.reshape(3, 4, 2))